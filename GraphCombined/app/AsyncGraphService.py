@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Callable, Tuple, Union
+
+from .DataTypes import GraphRequest, SearchFacets, SearchPage
+from .GraphService import GraphService
+from .QueryExpr import QueryExpr
+
+
+class AsyncGraphService:
+    """
+    Асинхронный интерфейс к GraphService для работы в цикле событий asyncio.
+
+    Каждый метод выполняет соответствующий метод GraphService в пуле потоков,
+    поэтому загрузки идут через тот же GraphDownloader на requests (с прокси,
+    повторами и общим пулом соединений), а дисковые операции хранилища
+    и запись архива не блокируют цикл событий. Одиночные загрузки fetch_graph
+    выполняются в отдельном пуле из workers потоков; массовые fetch_graphs и download_zip
+    распараллеливаются самим GraphDownloader.
+    """
+
+    def __init__(self, service: Optional[GraphService] = None, workers: Optional[int] = None):
+        """
+        Args:
+            service: Обёртываемый сервис (по умолчанию создаётся новый)
+            workers: Сколько графов fetch_graph скачивает одновременно
+                     (по умолчанию столько же, сколько GraphDownloader)
+        """
+        self.service = service or GraphService()
+        self.workers = max(1, workers or self.service.downloader.workers)
+        # Отдельный пул, чтобы загрузки не занимали потоки по умолчанию, нужные поиску
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="graph-fetch")
+
+    @property
+    def loaded(self) -> bool:
+        return self.service.loaded
+
+    # ========== META ДАННЫЕ ==========
+
+    async def download_meta(self) -> bool:
+        """Загружает meta файл (см. GraphService.download_meta)"""
+        return await asyncio.to_thread(self.service.download_meta)
+
+    async def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Ждёт загрузки meta, запущенной GraphService.start_loading; сама загрузку не запускает"""
+        return await asyncio.to_thread(self.service.wait_until_loaded, timeout)
+
+    # ========== ПОИСК ==========
+
+    async def search(self, request: GraphRequest) -> List[str]:
+        return await asyncio.to_thread(self.service.search, request)
+
+    async def search_expr(self, expr: Union[str, QueryExpr]) -> List[str]:
+        return await asyncio.to_thread(self.service.search_expr, expr)
+
+    async def search_page(self, request: GraphRequest, limit: Optional[int] = None,
+                          cursor: Optional[str] = None, facets: bool = False) -> SearchPage:
+        return await asyncio.to_thread(self.service.search_page, request, limit, cursor, facets)
+
+    async def search_all(self, request: GraphRequest) -> List[str]:
+        """Все найденные графы, постранично через iter_search"""
+        return await asyncio.to_thread(lambda: list(self.service.iter_search(request)))
+
+    async def search_facets(self, request: GraphRequest, top_authors: int = 10,
+                            with_names: bool = True) -> SearchFacets:
+        return await asyncio.to_thread(self.service.search_facets, request, top_authors, with_names)
+
+    async def complete_author(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        return await asyncio.to_thread(self.service.complete_author, prefix, limit)
+
+    # ========== СКАЧИВАНИЕ ==========
+
+    async def fetch_graph(self, graph_name: str) -> bytes:
+        """Содержимое файла графа (см. GraphService.fetch_graph)"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.service.fetch_graph, graph_name)
+
+    async def fetch_graphs(self, graph_names: List[str]) -> Dict[str, Union[bytes, Exception]]:
+        """Параллельно получает несколько графов (см. GraphService.fetch_graphs)"""
+        return await asyncio.to_thread(self.service.fetch_graphs, graph_names)
+
+    async def download_zip(self, graph_names: List[str], save_path: Optional[str] = None,
+                           progress: Optional[Callable[[str, Union[int, Exception]], None]] = None,
+                           zip_path: Optional[str] = None) -> str:
+        """
+        Скачивает графы и создает zip архив (см. GraphService.download_zip)
+
+        Args:
+            progress: Вызывается из рабочего потока после каждого графа
+        """
+        return await asyncio.to_thread(self.service.download_zip, graph_names, save_path, progress, zip_path)
+
+    def close(self):
+        """Останавливает пул потоков одиночных загрузок"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,115 @@
+import asyncio
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Coroutine, Optional
+
+from .config import CONFIG
+
+
+class AsyncTkBridge:
+    """
+    Цикл событий asyncio рядом с mainloop Tk.
+
+    Цикл работает в отдельном потоке. Корутины отправляются в него через submit,
+    а результаты и исключения возвращаются в поток Tk через очередь, которую
+    mainloop опрашивает по root.after. Поэтому обработчики результатов могут
+    напрямую менять виджеты: из чужих потоков Tk трогать нельзя.
+    """
+
+    def __init__(self, root, poll_interval: Optional[int] = None):
+        """
+        Args:
+            root: Любой виджет Tk, через after которого опрашивается очередь
+            poll_interval: Период опроса очереди, мс (по умолчанию CONFIG.ASYNC_POLL_INTERVAL)
+        """
+        self.root = root
+        self.poll_interval = poll_interval or CONFIG.ASYNC_POLL_INTERVAL
+        self.loop = asyncio.new_event_loop()
+        self._callbacks: 'queue.SimpleQueue[Callable[[], Any]]' = queue.SimpleQueue()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run_loop, name="asyncio-tk", daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_interval, self._poll)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _poll(self):
+        """Выполняет в потоке Tk накопившиеся обработчики и планирует следующий опрос"""
+        while True:
+            try:
+                callback = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                print(f"Ошибка в обработчике асинхронной задачи: {e}")
+        if not self._closed:
+            try:
+                self.root.after(self.poll_interval, self._poll)
+            except tk.TclError:
+                # Окно уже уничтожено
+                self._closed = True
+
+    def call_soon(self, callback: Callable[..., Any], *args):
+        """Выполняет callback(*args) в потоке Tk. Можно вызывать из любого потока"""
+        self._callbacks.put(lambda: callback(*args))
+
+    def submit(self, coro: Awaitable, on_result: Optional[Callable[[Any], Any]] = None,
+               on_error: Optional[Callable[[BaseException], Any]] = None) -> Future:
+        """
+        Запускает корутину в цикле событий
+
+        Args:
+            on_result: Вызывается в потоке Tk с результатом корутины
+            on_error: Вызывается в потоке Tk с исключением корутины
+        Returns:
+            concurrent.futures.Future с результатом корутины
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def done(future: Future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    self.call_soon(on_error, error)
+                else:
+                    self.call_soon(print, f"Ошибка асинхронной задачи: {error}")
+            elif on_result is not None:
+                self.call_soon(on_result, future.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def close(self, cleanup: Optional[Coroutine] = None, timeout: float = 5.0):
+        """
+        Останавливает цикл событий: выполняет cleanup, отменяет оставшиеся задачи
+        и ждёт завершения потока цикла не дольше timeout секунд
+        """
+        if not self.loop.is_running():
+            if cleanup is not None:
+                cleanup.close()
+            return
+        self._closed = True
+
+        async def shutdown():
+            if cleanup is not None:
+                await cleanup
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout)
+        except Exception as e:
+            print(f"Цикл событий остановлен с ошибкой: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
@@ -0,0 +1,112 @@
+import heapq
+from bisect import bisect_left
+from typing import List, Dict, Any, Set, Iterable, Tuple
+
+
+class AuthorIndex:
+    """
+    Триграммный индекс по различным именам авторов.
+
+    Имена приводятся к нижнему регистру один раз при добавлении, для каждой
+    триграммы хранится множество идентификаторов авторов. Подстрочный запрос
+    пересекает множества своих триграмм и проверяет только оставшихся кандидатов.
+    Идентификатор автора - порядковый номер его первого добавления.
+    """
+
+    GRAM = 3
+
+    def __init__(self):
+        self.authors: List[Any] = []
+        self.ids: Dict[Any, int] = {}
+        self.lowered: List[str] = []
+        self.postings: Dict[str, Set[int]] = {}
+        self.empty_ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.authors)
+
+    def add(self, author: Any) -> int:
+        """Добавляет автора (если его ещё нет) и возвращает его идентификатор"""
+        author_id = self.ids.get(author)
+        if author_id is not None:
+            return author_id
+
+        author_id = self.ids[author] = len(self.authors)
+        self.authors.append(author)
+
+        if not author:
+            # Нестрогий поиск пропускает графы без автора
+            self.lowered.append('')
+            self.empty_ids.append(author_id)
+            return author_id
+
+        lowered = author.lower()
+        self.lowered.append(lowered)
+        for start in range(len(lowered) - self.GRAM + 1):
+            self.postings.setdefault(lowered[start:start + self.GRAM], set()).add(author_id)
+        return author_id
+
+    def matching_ids(self, needle: str) -> List[int]:
+        """
+        Идентификаторы авторов, подходящих под нестрогий поиск:
+        имя пустое или содержит needle без учёта регистра
+        """
+        needle = needle.lower()
+        gram = self.GRAM
+
+        if len(needle) < gram:
+            candidates = range(len(self.lowered))
+        else:
+            posting_sets = []
+            for start in range(len(needle) - gram + 1):
+                posting = self.postings.get(needle[start:start + gram])
+                if not posting:
+                    return list(self.empty_ids)
+                posting_sets.append(posting)
+            posting_sets.sort(key=len)
+            candidates = set.intersection(*posting_sets)
+
+        lowered = self.lowered
+        matched = [author_id for author_id in candidates if lowered[author_id] and needle in lowered[author_id]]
+        return sorted(matched + self.empty_ids)
+
+    def matching(self, needle: str) -> List[Any]:
+        """Авторы, подходящие под нестрогий поиск"""
+        return [self.authors[author_id] for author_id in self.matching_ids(needle)]
+
+
+class AuthorCompletions:
+    """
+    Отсортированный массив авторов для автодополнения.
+
+    Строится один раз по meta данным и хранит число графов каждого автора.
+    Префиксный запрос находит диапазон имён двумя bisect без учёта регистра.
+    """
+
+    def __init__(self, counts: Dict[str, int]):
+        self.counts = counts
+        self.sorted_authors = sorted(counts)
+        self._by_key = sorted(counts, key=lambda author: (author.lower(), author))
+        self._keys = [author.lower() for author in self._by_key]
+
+    @classmethod
+    def build(cls, graphs: Iterable[Any]) -> 'AuthorCompletions':
+        """Считает графы каждого автора по meta записям"""
+        counts: Dict[str, int] = {}
+        for graph_data in graphs:
+            author = graph_data.get('author')
+            if author:
+                counts[author] = counts.get(author, 0) + 1
+        return cls(counts)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Авторы, чьё имя начинается с prefix (без учёта регистра),
+        с числом графов; самые плодовитые первыми
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\U0010ffff', lo=start)
+        candidates = self._by_key[start:end]
+        best = heapq.nsmallest(limit, candidates, key=lambda author: (-self.counts[author], author.lower()))
+        return [(author, self.counts[author]) for author in best]
@@ -0,0 +1,299 @@
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy не обязателен: без него доступен только битовый индекс
+    np = None
+
+from .DataTypes import GraphRequest, SearchFacets
+from .MetaIndex import TAG_NAMES
+from .AuthorIndex import AuthorIndex
+from .MetaRecords import MetaRecord, TAG_BITS
+from .RangeIndex import NUMERIC_FIELDS, numeric_values
+
+
+TAG_UNKNOWN = -1
+TAG_FALSE = 0
+TAG_TRUE = 1
+
+
+def _encode_tag(value: Any) -> int:
+    """Кодирует значение тега в трёхзначный int8"""
+    if value is None:
+        return TAG_UNKNOWN
+    return TAG_TRUE if value else TAG_FALSE
+
+
+@lru_cache(maxsize=None)
+def _mask_codes(known: int, values: int) -> Tuple[int, ...]:
+    """Коды тегов по маскам компактной записи"""
+    return tuple((TAG_TRUE if values & bit else TAG_FALSE) if known & bit else TAG_UNKNOWN
+                 for bit in TAG_BITS.values())
+
+
+def _tag_codes(graph_data: Dict[str, Any]) -> Tuple[int, ...]:
+    """Коды всех тегов графа в порядке TAG_NAMES"""
+    if type(graph_data) is MetaRecord and graph_data.extra is None:
+        return _mask_codes(graph_data.known or 0, graph_data.values)
+    graph_properties = graph_data.get('properties') or {}
+    return tuple(_encode_tag(graph_properties.get(tag)) for tag in TAG_NAMES)
+
+
+class ColumnarMetaStore:
+    """
+    Колоночное представление meta данных на NumPy.
+
+    Для каждого поля GraphTags хранится колонка int8 (-1 нет значения, 0 False, 1 True),
+    размер хранится категориальным кодом, автор - интернированным идентификатором.
+    Запрос превращается в одно векторное выражение над маской.
+    Интерфейс совпадает с MetaIndex: строки только добавляются в конец колонок,
+    удалённые графы исключаются маской живых строк, а накопленные добавления
+    дописываются к колонкам перед следующим запросом.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("Для колоночного хранилища требуется numpy")
+
+        self.names: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.authors = AuthorIndex()
+        self.sizes: List[Any] = []
+        self.size_lookup: Dict[Any, int] = {}
+
+        self.alive = np.zeros(0, dtype=bool)
+        self.author_ids = np.zeros(0, dtype=np.int32)
+        self.size_codes = np.zeros(0, dtype=np.int16)
+        self.tag_columns = np.zeros((len(TAG_NAMES), 0), dtype=np.int8)
+        # Числовые свойства: колонка float64 (NaN - нет значения), порядок сортировки и отсортированные значения
+        self.numeric: Dict[str, Any] = {field: np.zeros(0, dtype=np.float64) for field in NUMERIC_FIELDS}
+        self.numeric_order: Dict[str, Any] = {field: np.zeros(0, dtype=np.intp) for field in NUMERIC_FIELDS}
+        self.numeric_sorted: Dict[str, Any] = {field: np.zeros(0, dtype=np.float64) for field in NUMERIC_FIELDS}
+
+        self._rows_owned = True
+        self._pending_authors: List[int] = []
+        self._pending_sizes: List[int] = []
+        self._pending_tags: List[Tuple[int, ...]] = []
+        self._pending_numeric: Dict[str, List[float]] = {field: [] for field in NUMERIC_FIELDS}
+        self._pending_removed: List[int] = []
+
+    @classmethod
+    def build(cls, meta_data: Dict[str, Any]) -> 'ColumnarMetaStore':
+        """Строит колонки по словарю meta данных"""
+        store = cls()
+        for graph_name, graph_data in meta_data.items():
+            store.add(graph_name, graph_data)
+        store.flush()
+        return store
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> 'ColumnarMetaStore':
+        """
+        Колонки поверх массивов MetaSnapshot без обхода записей.
+        Имена читаются из снимка лениво, до первого изменения
+        """
+        store = cls()
+        store.names = snapshot.names
+        store._rows_owned = False
+        for author in snapshot.authors:
+            store.authors.add(author)
+        store.sizes = list(snapshot.sizes)
+        store.size_lookup = {size: code for code, size in enumerate(store.sizes)}
+        store.alive = np.ones(len(snapshot.names), dtype=bool)
+        store.author_ids = snapshot.author_ids
+        store.size_codes = snapshot.size_codes
+        store.tag_columns = snapshot.tag_columns()
+        for field in NUMERIC_FIELDS:
+            values = snapshot.arrays[f'numeric_{field}']
+            order = snapshot.arrays[f'numeric_order_{field}']
+            store.numeric[field] = values
+            store.numeric_order[field] = order
+            store.numeric_sorted[field] = values[order]
+        return store
+
+    def __len__(self) -> int:
+        return len(self.rows) if self._rows_owned else len(self.names)
+
+    @property
+    def dead_rows(self) -> int:
+        """Количество строк, оставшихся от удалённых графов"""
+        return len(self.names) - len(self)
+
+    def _own_rows(self):
+        """Перед первым изменением переводит имена снимка в список и строит словарь строк"""
+        if not self._rows_owned:
+            self.names = list(self.names)
+            self.rows = {graph_name: row for row, graph_name in enumerate(self.names)}
+            self._rows_owned = True
+
+    def add(self, graph_name: str, graph_data: Dict[str, Any]):
+        """Добавляет граф в конец колонок (существующая запись заменяется)"""
+        self._own_rows()
+        if graph_name in self.rows:
+            self.remove(graph_name)
+
+        self.rows[graph_name] = len(self.names)
+        self.names.append(graph_name)
+
+        self._pending_authors.append(self.authors.add(graph_data.get('author')))
+        self._pending_sizes.append(self.size_lookup.setdefault(graph_data.get('size'), len(self.size_lookup)))
+        self._pending_tags.append(_tag_codes(graph_data))
+        for values, value in zip(self._pending_numeric.values(), numeric_values(graph_data)):
+            values.append(np.nan if value is None else value)
+
+    def remove(self, graph_name: str) -> bool:
+        """Убирает граф. Строка остаётся в колонках, но исключается из результатов"""
+        self._own_rows()
+        row = self.rows.pop(graph_name, None)
+        if row is None:
+            return False
+        self.names[row] = None
+        self._pending_removed.append(row)
+        return True
+
+    def flush(self):
+        """Дописывает накопленные строки к колонкам и снимает отметки удалённых"""
+        if self._pending_tags:
+            count = len(self._pending_tags)
+            first_row = len(self.alive)
+            self.alive = np.concatenate((self.alive, np.ones(count, dtype=bool)))
+            self.author_ids = np.concatenate((self.author_ids, np.array(self._pending_authors, dtype=np.int32)))
+            self.size_codes = np.concatenate((self.size_codes, np.array(self._pending_sizes, dtype=np.int16)))
+            tags = np.array(self._pending_tags, dtype=np.int8).reshape(count, len(TAG_NAMES)).T
+            self.tag_columns = np.concatenate((self.tag_columns, tags), axis=1)
+            self.sizes = list(self.size_lookup.keys())
+
+            for field, pending in self._pending_numeric.items():
+                values = np.array(pending, dtype=np.float64)
+                order = np.argsort(values, kind='stable')
+                new_sorted = values[order]
+                # Новые значения вливаются в отсортированную колонку после равных старых,
+                # поэтому равные значения остаются упорядочены по строкам; NaN уходят в конец
+                positions = np.searchsorted(self.numeric_sorted[field], new_sorted, 'right')
+                self.numeric[field] = np.concatenate((self.numeric[field], values))
+                self.numeric_order[field] = np.insert(self.numeric_order[field], positions, order + first_row)
+                self.numeric_sorted[field] = np.insert(self.numeric_sorted[field], positions, new_sorted)
+
+            self._pending_authors = []
+            self._pending_sizes = []
+            self._pending_tags = []
+            self._pending_numeric = {field: [] for field in NUMERIC_FIELDS}
+
+        if self._pending_removed:
+            if not self.alive.flags.writeable:
+                self.alive = self.alive.copy()
+            self.alive[self._pending_removed] = False
+            self._pending_removed = []
+
+    def mask(self, request: GraphRequest):
+        """Возвращает булеву маску строк, подходящих под запрос"""
+        self.flush()
+        mask = self.alive.copy()
+
+        if request.author is not None:
+            if request.strict_search:
+                author_id = self.authors.ids.get(request.author)
+                matching = [] if author_id is None else [author_id]
+            else:
+                matching = self.authors.matching_ids(request.author)
+            mask &= np.isin(self.author_ids, matching)
+
+        if request.size is not None:
+            codes = [i for i, size in enumerate(self.sizes) if size == request.size.value]
+            mask &= np.isin(self.size_codes, codes)
+
+        if request.tags is not None:
+            rows = [i for i, tag in enumerate(TAG_NAMES) if getattr(request.tags, tag) is not None]
+            if rows:
+                wanted = np.array([_encode_tag(getattr(request.tags, TAG_NAMES[i])) for i in rows],
+                                  dtype=np.int8)[:, None]
+                columns = self.tag_columns[rows]
+                if request.strict_search:
+                    mask &= (columns == wanted).all(axis=0)
+                else:
+                    mask &= ((columns == wanted) | (columns == TAG_UNKNOWN)).all(axis=0)
+
+        for field, value_range in request.ranges().items():
+            sorted_values = self.numeric_sorted[field]
+            start = 0 if value_range.min is None else np.searchsorted(sorted_values, value_range.min, 'left')
+            if value_range.max is None:
+                end = len(sorted_values) - int(np.isnan(sorted_values).sum())
+            else:
+                end = np.searchsorted(sorted_values, value_range.max, 'right')
+            in_range = np.zeros(len(mask), dtype=bool)
+            in_range[self.numeric_order[field][start:end]] = True
+            if not request.strict_search:
+                in_range |= np.isnan(self.numeric[field])
+            mask &= in_range
+
+        return mask
+
+    def search(self, request: GraphRequest) -> List[str]:
+        """Ищет графы по запросу"""
+        mask = self.mask(request)
+        names = self.names
+        return [names[row] for row in np.flatnonzero(mask)]
+
+    def search_expr(self, expr) -> List[str]:
+        """Ищет графы по выражению QueryExpr: AND/OR/NOT - операции над булевыми масками"""
+        self.flush()
+        mask = expr.evaluate(self.mask, self.alive.copy())
+        names = self.names
+        return [names[row] for row in np.flatnonzero(mask)]
+
+    def page(self, request: GraphRequest, start: int, limit: int) -> Tuple[List[str], Optional[int], int]:
+        """
+        Страница результатов: не больше limit имён, начиная со строки start.
+        Возвращает имена, строку, с которой продолжать (None, если совпадений больше нет),
+        и общее число совпадений
+        """
+        mask = self.mask(request)
+        names, next_row = self._page_of(mask, start, limit)
+        return names, next_row, int(np.count_nonzero(mask))
+
+    def page_with_facets(self, request: GraphRequest, start: int, limit: int,
+                         top_authors: int = 10) -> Tuple[List[str], Optional[int], SearchFacets]:
+        """Страница результатов и счётчики фасетов по одному вычислению маски"""
+        mask = self.mask(request)
+        names, next_row = self._page_of(mask, start, limit)
+        return names, next_row, self._facets_of(mask, top_authors, with_names=False)
+
+    def _page_of(self, mask, start: int, limit: int) -> Tuple[List[str], Optional[int]]:
+        rows = np.flatnonzero(mask[start:])[:limit + 1] + start
+        names = self.names
+        result = [names[row] for row in rows[:limit]]
+        next_row = int(rows[limit - 1]) + 1 if len(rows) > limit else None
+        return result, next_row
+
+    def facets(self, request: GraphRequest, top_authors: int = 10, with_names: bool = True) -> SearchFacets:
+        """
+        Ищет графы и считает совпадения по каждому размеру, значению тега и автору.
+        with_names=False - только счётчики, без списка имён
+        """
+        return self._facets_of(self.mask(request), top_authors, with_names)
+
+    def _facets_of(self, mask, top_authors: int, with_names: bool) -> SearchFacets:
+        rows = np.flatnonzero(mask)
+        result = SearchFacets(names=[self.names[row] for row in rows] if with_names else [], total=len(rows))
+
+        size_counts = np.bincount(self.size_codes[rows], minlength=len(self.sizes))
+        for code, size in enumerate(self.sizes):
+            if size_counts[code]:
+                result.sizes[size] = int(size_counts[code])
+
+        selected = self.tag_columns[:, rows]
+        true_counts = (selected == TAG_TRUE).sum(axis=1)
+        false_counts = (selected == TAG_FALSE).sum(axis=1)
+        for column, tag in enumerate(TAG_NAMES):
+            result.tags[tag] = {True: int(true_counts[column]), False: int(false_counts[column])}
+
+        # Перебираем только авторов, встретившихся среди найденных строк
+        author_counts = np.bincount(self.author_ids[rows])
+        all_authors = self.authors.authors
+        authors = [(all_authors[author_id], int(author_counts[author_id]))
+                   for author_id in np.flatnonzero(author_counts) if all_authors[author_id]]
+        authors.sort(key=lambda item: (-item[1], item[0]))
+        result.authors = authors[:top_authors]
+        return result
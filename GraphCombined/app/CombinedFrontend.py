@@ -2,8 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 import os
+from typing import Optional
 
 from app.GraphFrontend import GraphSearchApp
+from app.GraphService import GraphService
 from app.GraphVisualizerApp import GraphVisualizerApp
 from app.ConsoleWidget import init_console, get_console
 from app.config import CONFIG
@@ -12,8 +14,11 @@ from app.config import CONFIG
 class CombinedGraphApp:
     """Объединенное приложение с вкладками"""
 
-    def __init__(self, root):
+    def __init__(self, root, graph_service: Optional[GraphService] = None):
         self.root = root
+        # Сервис поиска создаётся заранее, чтобы загрузка meta шла параллельно с построением окна
+        self.graph_service = graph_service or GraphService()
+        self.graph_service.start_loading()
         self.root.title("Graph System - Поиск и Визуализация Графов")
 
         # Устанавливаем минимальный размер окна
@@ -132,7 +137,7 @@ class CombinedGraphApp:
         self.search_frame.grid_columnconfigure(0, weight=1)
 
         # Инициализируем приложение поиска
-        self.search_app = GraphSearchApp(self.search_frame, embedded=True)
+        self.search_app = GraphSearchApp(self.search_frame, embedded=True, graph_service=self.graph_service)
 
         # Добавляем кнопку для открытия в визуализаторе
         self.add_open_in_visualizer_button()
@@ -202,15 +207,24 @@ class CombinedGraphApp:
         tab_info_label.pack(side=tk.RIGHT, fill=tk.Y, padx=5, pady=2)
 
     def load_search_data(self):
-        """Загрузка данных для поиска"""
-
-        def load_task():
-            console = get_console()
-            if console:
-                console.log_info("Загрузка meta данных для поиска...")
-
-        import threading
-        threading.Thread(target=load_task, daemon=True).start()
+        """Показывает в статус баре ход загрузки meta данных для поиска"""
+        console = get_console()
+        if console:
+            console.log_info("Загрузка meta данных для поиска...")
+        self.status_var.set("Загрузка meta данных для поиска...")
+
+        def on_loaded(future):
+            try:
+                success = future.result()
+            except Exception:
+                success = False
+            if success:
+                message = f"Данные для поиска загружены. Графов: {len(self.graph_service.meta_data)}"
+            else:
+                message = "Не удалось загрузить данные для поиска"
+            self.root.after(0, lambda: self.status_var.set(message))
+
+        self.graph_service.start_loading().add_done_callback(on_loaded)
 
     def toggle_console(self):
         """Переключение видимости консоли"""
@@ -243,6 +257,21 @@ class CombinedGraphApp:
             if len(selected_graphs) > 5:
                 console.log_info(f"... и еще {len(selected_graphs) - 5} графов")
 
+        search_app = self.search_app
+
+        def on_fetched(results):
+            failed = [name for name, result in results.items() if isinstance(result, Exception)]
+            if failed and console:
+                console.log_warning(f"Не удалось получить графы: {', '.join(failed[:5])}")
+            # Визуализатор получает уже прочитанное содержимое и не обращается к хранилищу из потока Tk
+            contents = {name: results[name] for name in selected_graphs
+                        if name in results and not isinstance(results[name], Exception)}
+            if contents:
+                self.visualizer_app.load_fetched(contents)
+
+        # Графы берутся из локального хранилища, недостающие докачиваются
+        search_app.bridge.submit(search_app.async_service.fetch_graphs(selected_graphs), on_fetched)
+
     def switch_to_visualizer_tab(self):
         """Переключиться на вкладку визуализации"""
         self.notebook.select(1)
@@ -282,19 +311,26 @@ class CombinedGraphApp:
             console.log_system("Объединенное приложение запущено")
             console.log_info("Используйте вкладки для переключения между функциями")
 
-        self.status_var.set("Система готова к работе")
+        # Пока meta загружается, в статус баре остаётся ход загрузки
+        if self.graph_service.loaded:
+            self.status_var.set("Система готова к работе")
 
 
 def run_combined_app():
     """Запуск объединенного приложения"""
+    # Meta данные начинают загружаться до создания окна
+    graph_service = GraphService()
+    graph_service.start_loading()
+
     root = tk.Tk()
-    app = CombinedGraphApp(root)
+    app = CombinedGraphApp(root, graph_service)
 
     # Обработка закрытия окна
     def on_closing():
         console = get_console()
         if console:
             console.log_system("Объединенное приложение завершено")
+        app.search_app.close()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
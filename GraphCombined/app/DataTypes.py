@@ -1,5 +1,5 @@
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple, List
+from dataclasses import dataclass, field, fields
 from enum import Enum
 
 class GraphSize(Enum):
@@ -31,15 +31,84 @@ class GraphTags:
                 setattr(tags, key, data[key])
         return tags
 
+
+TAG_NAMES: Tuple[str, ...] = tuple(f.name for f in fields(GraphTags))
+
+@dataclass
+class NumericRange:
+    """Диапазон числового свойства графа. Границы включаются, None - граница не задана"""
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return self.min is None and self.max is None
+
+    def contains(self, value: float) -> bool:
+        return (self.min is None or value >= self.min) and (self.max is None or value <= self.max)
+
 @dataclass
 class GraphRequest:
     author: Optional[str] = None
     size: Optional[GraphSize] = None
     tags: Optional[GraphTags] = None
     strict_search: bool = True
+    vertices: Optional[NumericRange] = None
+    edges: Optional[NumericRange] = None
+    density: Optional[NumericRange] = None
+
+    def ranges(self) -> Dict[str, NumericRange]:
+        """Заданные диапазоны числовых свойств: имя свойства -> диапазон"""
+        ranges = {}
+        for name in ('vertices', 'edges', 'density'):
+            value_range = getattr(self, name)
+            if value_range is not None and not value_range.is_empty():
+                ranges[name] = value_range
+        return ranges
 
     def is_empty(self) -> bool:
         """Проверяет, пустой ли запрос (все параметры None)"""
         return (self.author is None and 
                 self.size is None and 
-                self.tags is None)
\ No newline at end of file
+                self.tags is None and
+                not self.ranges())
+
+    def cache_key(self) -> Tuple:
+        """
+        Канонический хешируемый вид запроса.
+        Запросы, которые всегда дают одинаковый результат, получают одинаковый ключ
+        """
+        author = self.author
+        if author is not None and not self.strict_search:
+            author = author.lower()
+        tags = None
+        if self.tags is not None:
+            tags = tuple(getattr(self.tags, f.name) for f in fields(self.tags))
+            if all(value is None for value in tags):
+                tags = None
+        size = self.size.value if self.size is not None else None
+        ranges = tuple(sorted((name, value_range.min, value_range.max)
+                              for name, value_range in self.ranges().items()))
+        return (author, size, tags, self.strict_search, ranges)
+
+
+@dataclass
+class SearchFacets:
+    """Результат поиска вместе с количеством совпадений по каждому значению фильтров"""
+    names: List[str] = field(default_factory=list)
+    total: int = 0
+    sizes: Dict[str, int] = field(default_factory=dict)
+    tags: Dict[str, Dict[bool, int]] = field(default_factory=dict)
+    authors: List[Tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class SearchPage:
+    """
+    Страница результатов поиска.
+    cursor передаётся в следующий вызов, чтобы получить продолжение; None - результатов больше нет.
+    facets - счётчики по фильтрам, если их запросили вместе со страницей
+    """
+    names: List[str] = field(default_factory=list)
+    cursor: Optional[str] = None
+    total: int = 0
+    facets: Optional[SearchFacets] = None
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Iterator, Tuple, Union, Optional, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import CONFIG
+
+
+class GraphDownloader:
+    """
+    Движок параллельной загрузки файлов графов.
+
+    Запросы идут через общую requests.Session с пулом keep-alive соединений.
+    Одновременно выполняется не больше workers запросов, из какого бы потока
+    их ни вызвали (fetch_many, пул AsyncGraphService), поэтому пулу хватает
+    workers соединений и они не закрываются как лишние. Каждая загрузка
+    ограничена таймаутом и повторяется до retries раз при сетевых ошибках
+    и ответах 429/5xx.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, repo_url: str, workers: Optional[int] = None, timeout: Optional[float] = None,
+                 retries: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.repo_url = repo_url
+        self.workers = max(1, workers or CONFIG.DOWNLOAD_WORKERS)
+        self.timeout = timeout or CONFIG.TIMEOUT
+        self.retries = CONFIG.MAX_RETRIES if retries is None else retries
+        self.chunk_size = chunk_size or CONFIG.CHUNK_SIZE
+
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def graph_url(self, graph_name: str) -> str:
+        return f"{self.repo_url}/{graph_name}.json"
+
+    def fetch(self, graph_name: str) -> bytes:
+        """
+        Скачивает файл графа целиком
+        Raises:
+            requests.exceptions.RequestException: если все попытки неудачны
+        """
+        url = self.graph_url(graph_name)
+        for attempt in range(self.retries + 1):
+            try:
+                # Слот занят только на время запроса, паузы между повторами его не держат
+                with self._slots, self.session.get(url, timeout=self.timeout, stream=True) as response:
+                    response.raise_for_status()
+                    return b''.join(response.iter_content(self.chunk_size))
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if status not in self.RETRY_STATUSES or attempt == self.retries:
+                    raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError):
+                if attempt == self.retries:
+                    raise
+            # Экспоненциальная пауза перед повтором
+            time.sleep(0.5 * 2 ** attempt)
+
+    def fetch_many(self, graph_names: List[str],
+                   fetch: Optional[Callable[[str], bytes]] = None) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+        """
+        Скачивает графы параллельно
+        Результаты отдаются в порядке graph_names: содержимое файла или исключение.
+        Вперёд запрашивается не больше 2 * workers файлов, чтобы не копить их в памяти
+
+        Args:
+            fetch: Функция получения одного графа (по умолчанию self.fetch),
+                   например с предварительной проверкой локального хранилища
+        """
+        fetch = fetch or self.fetch
+
+        def fetch_result(graph_name: str) -> Union[bytes, Exception]:
+            try:
+                return fetch(graph_name)
+            except (requests.exceptions.RequestException, OSError) as e:
+                return e
+
+        names = iter(graph_names)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque((name, executor.submit(fetch_result, name))
+                            for name in islice(names, self.workers * 2))
+            while pending:
+                graph_name, future = pending.popleft()
+                for next_name in islice(names, 1):
+                    pending.append((next_name, executor.submit(fetch_result, next_name)))
+                yield graph_name, future.result()
+
+    def close(self):
+        self.session.close()
@@ -1,24 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import threading
 import logging
 import os
-from typing import List
+from typing import List, Dict, Tuple, Any, Optional
 
 from app.GraphService import GraphService
-from app.DataTypes import GraphRequest, GraphTags, GraphSize
+from app.AsyncGraphService import AsyncGraphService
+from app.AsyncTkBridge import AsyncTkBridge
+from app.DataTypes import GraphRequest, GraphTags, GraphSize, SearchFacets, SearchPage
+from app.QueryExpr import QuerySyntaxError
 from app.config import CONFIG
 from app.ConsoleWidget import init_console, get_console, log_info, log_success, log_warning, log_error, log_system
 
 
 class GraphSearchApp:
-    def __init__(self, root, embedded=False):
+    def __init__(self, root, embedded=False, graph_service: Optional[GraphService] = None):
         """
         Инициализация приложения поиска графов
         
         Args:
             root: Родительский виджет
             embedded: Флаг, указывающий что приложение встроено в другое
+            graph_service: Сервис с уже запущенной загрузкой meta данных (по умолчанию создаётся новый)
         """
         if embedded:
             self.root = root
@@ -46,10 +49,27 @@ class GraphSearchApp:
         # Настройка логирования
         self.setup_logging()
 
-        self.graph_service = GraphService()
+        # Загрузка meta идёт параллельно с построением виджетов
+        self.graph_service = graph_service or GraphService()
+        self.graph_service.start_loading()
+        # Поиск и скачивание выполняются в цикле событий asyncio рядом с mainloop Tk
+        self.async_service = AsyncGraphService(self.graph_service)
+        self.bridge = AsyncTkBridge(self.root)
         self.current_results: List[str] = []
         self.selected_graphs: set = set()
 
+        # Постраничная выдача: запрос, курсор следующей страницы и общее число найденных графов.
+        # results_exhausted - в current_results уже все найденные графы; курсор может пропасть
+        # и раньше, если meta данные обновились между страницами
+        self.results_request: Optional[GraphRequest] = None
+        self.results_cursor: Optional[str] = None
+        self.results_total = 0
+        self.results_exhausted = True
+        self.loading_more_results = False
+
+        # Виджеты фильтров, подписи которых дополняются числом совпадений
+        self.facet_widgets: Dict[Tuple, Tuple[Any, str]] = {}
+
         # Консоль
         self.console = None
         self.init_console()
@@ -243,6 +263,13 @@ class GraphSearchApp:
                                       width=CONFIG.UI.sizes.AUTHOR_ENTRY_WIDTH)
         self.author_entry.pack(side=tk.LEFT, padx=(0, 10))
 
+        # Подсказки авторов при вводе
+        self.author_popup = None
+        self.author_listbox = None
+        self.author_completion_names: List[str] = []
+        self.author_entry.bind('<KeyRelease>', self.on_author_typed)
+        self.author_entry.bind('<FocusOut>', lambda e: self.root.after(200, self.hide_author_completions))
+
         self.strict_search_var = tk.BooleanVar(value=True)
         strict_check = ttk.Checkbutton(author_subframe,
                                        text="Строгий поиск",
@@ -317,6 +344,7 @@ class GraphSearchApp:
                                     value=value,
                                     style='Large.TRadiobutton')
             radio.grid(row=i, column=0, sticky=tk.W, pady=2)
+            self.facet_widgets[('size', value)] = (radio, text)
 
         # Правый столбец: свойства графа
         tags_frame = ttk.LabelFrame(columns_frame,
@@ -352,85 +380,109 @@ class GraphSearchApp:
         row = 0
         col = 0
 
-        ttk.Checkbutton(tags_frame,
-                        text="Направленный",
-                        variable=self.directed_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('directed', True),
+                                   text="Направленный",
+                                   variable=self.directed_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Взвешенный",
-                        variable=self.weighted_var,
-                        command=self.on_weighted_changed,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('weighted', True),
+                                   text="Взвешенный",
+                                   variable=self.weighted_var,
+                                   command=self.on_weighted_changed,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Невзвешенный",
-                        variable=self.not_weighted_var,
-                        command=self.on_not_weighted_changed,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('weighted', False),
+                                   text="Невзвешенный",
+                                   variable=self.not_weighted_var,
+                                   command=self.on_not_weighted_changed,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Связный",
-                        variable=self.connected_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('connected', True),
+                                   text="Связный",
+                                   variable=self.connected_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
         # Второй столбец свойств
         row = 0
         col = 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Смешанный",
-                        variable=self.mixed_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('mixed', True),
+                                   text="Смешанный",
+                                   variable=self.mixed_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Полный",
-                        variable=self.full_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('full', True),
+                                   text="Полный",
+                                   variable=self.full_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Двудольный",
-                        variable=self.double_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('double', True),
+                                   text="Двудольный",
+                                   variable=self.double_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Простой",
-                        variable=self.simple_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('simple', True),
+                                   text="Простой",
+                                   variable=self.simple_var,
+                                   **checkbutton_config).grid(row=row, column=col)
 
         # Третий столбец свойств
         row = 0
         col = 2
 
-        ttk.Checkbutton(tags_frame,
-                        text="Пустой",
-                        variable=self.empty_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('empty', True),
+                                   text="Пустой",
+                                   variable=self.empty_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Планарный",
-                        variable=self.planar_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('planar', True),
+                                   text="Планарный",
+                                   variable=self.planar_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Дерево",
-                        variable=self.tree_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('tree', True),
+                                   text="Дерево",
+                                   variable=self.tree_var,
+                                   **checkbutton_config).grid(row=row, column=col)
         row += 1
 
-        ttk.Checkbutton(tags_frame,
-                        text="Псевдограф",
-                        variable=self.pseudo_var,
-                        **checkbutton_config).grid(row=row, column=col)
+        self.add_facet_checkbutton(tags_frame, ('pseudo', True),
+                                   text="Псевдограф",
+                                   variable=self.pseudo_var,
+                                   **checkbutton_config).grid(row=row, column=col)
+
+        # Нижняя строка: логическое выражение вместо полей формы
+        expr_frame = ttk.Frame(columns_frame, style='TFrame')
+        expr_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        expr_frame.columnconfigure(1, weight=1)
+
+        expr_label = ttk.Label(expr_frame,
+                               text="Выражение:",
+                               font=CONFIG.UI.fonts.LABEL,
+                               background=CONFIG.UI.colors.BACKGROUND,
+                               foreground=CONFIG.UI.colors.PRIMARY)
+        expr_label.grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+
+        self.expr_entry = ttk.Entry(expr_frame, font=CONFIG.UI.fonts.ENTRY)
+        self.expr_entry.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.expr_entry.bind('<Return>', lambda e: self.search_graphs())
+
+        expr_hint = ttk.Label(expr_frame,
+                              text="Например: (tree OR planar) AND NOT pseudo AND size in {large, huge}. "
+                                   "Если выражение задано, поля формы не используются",
+                              font=CONFIG.UI.fonts.VISUALIZER_INFO,
+                              background=CONFIG.UI.colors.BACKGROUND,
+                              foreground=CONFIG.UI.colors.SECONDARY)
+        expr_hint.grid(row=1, column=1, sticky=tk.W)
 
         # Секция результатов поиска
         results_frame = ttk.LabelFrame(main_frame,
@@ -474,13 +526,13 @@ class GraphSearchApp:
         self.results_tree.bind('<Button-1>', self.on_tree_click)
 
         # Scrollbar для Treeview
-        scrollbar = ttk.Scrollbar(results_frame,
-                                  orient=tk.VERTICAL,
-                                  command=self.results_tree.yview)
-        self.results_tree.configure(yscrollcommand=scrollbar.set)
+        self.results_scrollbar = ttk.Scrollbar(results_frame,
+                                               orient=tk.VERTICAL,
+                                               command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=self.on_results_scrolled)
 
         self.results_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.results_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
 
         # Статус бар (только если не встроено и используем статус бар)
         if self.use_status_bar:
@@ -493,6 +545,97 @@ class GraphSearchApp:
             self.status_bar.grid(row=current_row, column=0, columnspan=2,
                                  sticky=(tk.W, tk.E), pady=(5, 0))
 
+    def on_author_typed(self, event):
+        """Показывает подсказки авторов по введённому началу имени"""
+        if event.keysym == 'Escape':
+            self.hide_author_completions()
+            return
+        if event.keysym == 'Down' and self.author_completion_names:
+            self.author_listbox.focus_set()
+            self.author_listbox.selection_clear(0, tk.END)
+            self.author_listbox.selection_set(0)
+            return
+
+        prefix = self.author_entry.get().strip()
+        if not prefix:
+            self.hide_author_completions()
+            return
+
+        def on_completions(completions):
+            # Пока подсказки считались, текст в поле мог измениться
+            if self.author_entry.get().strip() != prefix:
+                return
+            if completions:
+                self.show_author_completions(completions)
+            else:
+                self.hide_author_completions()
+
+        # Подсказки считаются вне потока Tk: построение списка авторов ждёт блокировку сервиса
+        self.bridge.submit(self.async_service.complete_author(prefix), on_completions)
+
+    def show_author_completions(self, completions):
+        """Выпадающий список подсказок под полем автора"""
+        if self.author_popup is None:
+            self.author_popup = tk.Toplevel(self.author_entry)
+            self.author_popup.wm_overrideredirect(True)
+            self.author_listbox = tk.Listbox(self.author_popup,
+                                             font=CONFIG.UI.fonts.LABEL,
+                                             bg='white',
+                                             relief='flat',
+                                             activestyle='none')
+            self.author_listbox.pack(fill='both', expand=True)
+            self.author_listbox.bind('<ButtonRelease-1>', self.on_author_completion_selected)
+            self.author_listbox.bind('<Return>', self.on_author_completion_selected)
+            self.author_listbox.bind('<Escape>', lambda e: self.hide_author_completions())
+
+        self.author_completion_names = [author for author, _ in completions]
+        self.author_listbox.delete(0, tk.END)
+        for author, count in completions:
+            self.author_listbox.insert(tk.END, f"{author} ({count})")
+        self.author_listbox.config(height=len(completions))
+
+        x = self.author_entry.winfo_rootx()
+        y = self.author_entry.winfo_rooty() + self.author_entry.winfo_height()
+        self.author_popup.geometry(f"+{x}+{y}")
+        self.author_popup.deiconify()
+        self.author_popup.lift()
+
+    def hide_author_completions(self):
+        """Скрывает подсказки авторов"""
+        self.author_completion_names = []
+        if self.author_popup is not None:
+            self.author_popup.withdraw()
+
+    def on_author_completion_selected(self, event):
+        """Подставляет выбранного автора в поле поиска"""
+        selection = self.author_listbox.curselection()
+        if selection and selection[0] < len(self.author_completion_names):
+            self.author_entry.delete(0, tk.END)
+            self.author_entry.insert(0, self.author_completion_names[selection[0]])
+        self.hide_author_completions()
+        self.author_entry.focus_set()
+
+    def add_facet_checkbutton(self, parent, facet, **options):
+        """Создаёт чекбокс тега и запоминает его для подписи с числом совпадений"""
+        checkbutton = ttk.Checkbutton(parent, **options)
+        self.facet_widgets[('tag',) + facet] = (checkbutton, options['text'])
+        return checkbutton
+
+    def update_facet_labels(self, facets: Optional[SearchFacets]):
+        """
+        Дописывает к фильтрам число найденных графов с таким значением,
+        например "Планарный (1 234)". Без facets возвращает исходные подписи
+        """
+        for key, (widget, text) in self.facet_widgets.items():
+            if facets is None:
+                widget.config(text=text)
+                continue
+            if key[0] == 'size':
+                count = facets.sizes.get(key[1], 0) if key[1] else facets.total
+            else:
+                count = facets.tags.get(key[1], {}).get(key[2], 0)
+            widget.config(text=f"{text} ({count:,})".replace(',', ' '))
+
     def on_weighted_changed(self):
         """Обработчик изменения чекбокса 'Взвешенный'"""
         if self.weighted_var.get():
@@ -636,6 +779,11 @@ class GraphSearchApp:
             self.animate_process_gradient(CONFIG.UI.colors.WARNING)
         self.start_loading_animation()
 
+        expression = self.expr_entry.get().strip()
+        if expression:
+            self.search_by_expression(expression)
+            return
+
         # Проверяем взаимоисключающие свойства
         if self.weighted_var.get() and self.not_weighted_var.get():
             warning_msg = "Выбраны взаимоисключающие свойства 'Взвешенный' и 'Невзвешенный'"
@@ -703,39 +851,94 @@ class GraphSearchApp:
             strict_search=self.strict_search_var.get()
         )
 
-        def search_task():
-            try:
-                results = self.graph_service.search(request)
-                self.current_results = results
-                self.selected_graphs.clear()
-
-                # Логирование результатов
-                if results:
-                    log_success("Поиск завершен успешно!")
-                    log_info(f"Найдено графов: {len(results)}")
-                    if len(results) <= 10:
-                        log_info(f"Результаты: {', '.join(results)}")
-                    else:
-                        log_info(f"Первые 10 результатов: {', '.join(results[:10])}")
-                        log_info(f"... и ещё {len(results) - 10} графов")
+        # В таблицу сразу попадает только первая страница, остальные подгружаются при прокрутке;
+        # счётчики фасетов считаются по тому же поиску в индексе
+        async def search_task():
+            return await self.async_service.search_page(request, facets=True)
+
+        def on_found(page: SearchPage):
+            results = page.names
+            total = max(page.total, len(results))
+            self.current_results = results
+            self.results_request = request
+            self.results_cursor = page.cursor
+            self.results_total = total
+            self.results_exhausted = page.cursor is None
+            self.selected_graphs.clear()
+
+            # Логирование результатов
+            if results:
+                log_success("Поиск завершен успешно!")
+                log_info(f"Найдено графов: {total}")
+                if total <= 10:
+                    log_info(f"Результаты: {', '.join(results)}")
                 else:
-                    log_warning("Поиск не дал результатов")
+                    log_info(f"Первые 10 результатов: {', '.join(results[:10])}")
+                    log_info(f"... и ещё {total - 10} графов")
+            else:
+                log_warning("Поиск не дал результатов")
 
-                self.logger.info(f"Поиск завершен. Найдено графов: {len(results)}")
-                self.root.after(0, self.stop_loading_animation)
-                self.root.after(0, self.update_results, results)
+            self.logger.info(f"Поиск завершен. Найдено графов: {total}")
+            self.stop_loading_animation()
+            self.update_results(results)
+            self.update_facet_labels(page.facets)
 
-            except Exception as e:
-                error_msg = f"Ошибка при поиске: {e}"
-                log_error(error_msg)
-                self.logger.error(error_msg)
-                self.root.after(0, self.stop_loading_animation)
-                self.root.after(0, lambda: messagebox.showerror("Ошибка", error_msg))
+        def on_error(e: BaseException):
+            error_msg = f"Ошибка при поиске: {e}"
+            log_error(error_msg)
+            self.logger.error(error_msg)
+            self.stop_loading_animation()
+            messagebox.showerror("Ошибка", error_msg)
+            if self.use_status_bar and hasattr(self, 'status_var'):
+                self.status_var.set("Ошибка поиска")
+                self.animate_error_gradient()
+
+        if not self.graph_service.loaded:
+            log_info("Meta данные ещё загружаются, поиск выполнится после загрузки")
+        self.bridge.submit(search_task(), on_found, on_error)
+
+    def search_by_expression(self, expression: str):
+        """Поиск по логическому выражению из поля 'Выражение'"""
+        log_info(f"Поиск по выражению: {expression}")
+
+        def on_error(e: BaseException):
+            self.stop_loading_animation()
+            if isinstance(e, QuerySyntaxError):
+                warning_msg = f"Ошибка в выражении: {e}"
+                log_warning(warning_msg)
+                messagebox.showwarning("Предупреждение", warning_msg)
                 if self.use_status_bar and hasattr(self, 'status_var'):
-                    self.root.after(0, lambda: self.status_var.set("Ошибка поиска"))
-                    self.root.after(0, lambda: self.animate_error_gradient())
+                    self.status_var.set("Ошибка в выражении")
+                    self.animate_error_gradient()
+                return
+            error_msg = f"Ошибка при поиске: {e}"
+            log_error(error_msg)
+            self.logger.error(error_msg)
+            messagebox.showerror("Ошибка", error_msg)
+
+        def on_found(results: List[str]):
+            # Результат выражения приходит целиком, без курсора и счётчиков фильтров
+            self.current_results = results
+            self.results_request = None
+            self.results_cursor = None
+            self.results_total = len(results)
+            self.results_exhausted = True
+            self.selected_graphs.clear()
+
+            if results:
+                log_success("Поиск завершен успешно!")
+                log_info(f"Найдено графов: {len(results)}")
+            else:
+                log_warning("Поиск не дал результатов")
 
-        threading.Thread(target=search_task, daemon=True).start()
+            self.logger.info(f"Поиск по выражению завершен. Найдено графов: {len(results)}")
+            self.stop_loading_animation()
+            self.update_results(results)
+            self.update_facet_labels(None)
+
+        if not self.graph_service.loaded:
+            log_info("Meta данные ещё загружаются, поиск выполнится после загрузки")
+        self.bridge.submit(self.async_service.search_expr(expression), on_found, on_error)
 
     def clear_form(self):
         """Очистка формы"""
@@ -751,6 +954,7 @@ class GraphSearchApp:
 
         # Очистка полей
         self.author_entry.delete(0, tk.END)
+        self.expr_entry.delete(0, tk.END)
         self.size_var.set("")
 
         for var in [self.directed_var, self.weighted_var, self.connected_var,
@@ -758,10 +962,15 @@ class GraphSearchApp:
                     self.empty_var, self.planar_var, self.tree_var, self.pseudo_var,
                     self.not_weighted_var]:
             var.set(False)
+        self.update_facet_labels(None)
 
         # Очищаем внутренние данные
         self.current_results.clear()
         self.selected_graphs.clear()
+        self.results_request = None
+        self.results_cursor = None
+        self.results_total = 0
+        self.results_exhausted = True
 
         # Получаем количество графов для очистки
         children = list(self.results_tree.get_children())
@@ -823,16 +1032,11 @@ class GraphSearchApp:
 
         log_info(f"Добавление {len(results)} графов в таблицу...")
 
+        total = max(self.results_total, len(results))
         for i, graph_name in enumerate(results):
             graph_info = self.graph_service.get_graph_info(graph_name)
             if graph_info:
-                author = graph_info.get('author', 'Неизвестно')
-                size = graph_info.get('size', 'Неизвестно')
-
-                properties = graph_info.get('properties', {})
-                prop_list = [key for key, value in properties.items() if value is True]
-                properties_str = ", ".join(prop_list) if prop_list else "Нет свойств"
-
+                author, size, properties_str = self.result_row_values(graph_info)
                 row_tag = 'evenrow' if i % 2 == 0 else 'oddrow'
 
                 def add_row(idx=i, name=graph_name, auth=author, sz=size, props=properties_str, tag=row_tag):
@@ -844,12 +1048,65 @@ class GraphSearchApp:
                         self.results_tree.see(item_id)
                         # Градиентная анимация успешного завершения (зелёный)
                         if self.use_status_bar and hasattr(self, 'status_var'):
-                            self.status_var.set(f"Найдено графов: {len(results)}")
-                            self.animate_success_gradient(f"Найдено графов: {len(results)}")
+                            self.status_var.set(f"Найдено графов: {total}")
+                            self.animate_success_gradient(f"Найдено графов: {total}")
                         log_success(f"Добавление графов завершено: {len(results)} графов")
 
                 self.root.after(i * 30, add_row)
 
+    def result_row_values(self, graph_info) -> Tuple[str, str, str]:
+        """Автор, размер и список свойств графа для строки таблицы"""
+        author = graph_info.get('author', 'Неизвестно')
+        size = graph_info.get('size', 'Неизвестно')
+
+        properties = graph_info.get('properties', {})
+        prop_list = [key for key, value in properties.items() if value is True]
+        properties_str = ", ".join(prop_list) if prop_list else "Нет свойств"
+        return author, size, properties_str
+
+    def on_results_scrolled(self, first, last):
+        """Двигает полосу прокрутки и подгружает следующую страницу, когда таблица прокручена до конца"""
+        self.results_scrollbar.set(first, last)
+        if (float(last) >= 1.0 and self.results_cursor is not None and not self.loading_more_results
+                and len(self.results_tree.get_children()) >= len(self.current_results)):
+            self.load_more_results()
+
+    def load_more_results(self):
+        """Запрашивает следующую страницу результатов в фоне"""
+        request, cursor = self.results_request, self.results_cursor
+        self.loading_more_results = True
+
+        def on_error(e: BaseException):
+            # ValueError: meta данные обновились после поиска - продолжить по старому курсору нельзя
+            log_warning(f"{e}")
+            self.append_results(request, None)
+
+        self.bridge.submit(self.async_service.search_page(request, cursor=cursor),
+                           lambda page: self.append_results(request, page), on_error)
+
+    def append_results(self, request: GraphRequest, page: Optional[SearchPage]):
+        """Дописывает страницу результатов в конец таблицы"""
+        self.loading_more_results = False
+        if request is not self.results_request:
+            # Пока страница грузилась, начат новый поиск или форма очищена
+            return
+        if page is None:
+            # Дальше не листаем, но выдача неполная: "Скачать все" повторит поиск целиком
+            self.results_cursor = None
+            return
+
+        self.results_cursor = page.cursor
+        self.results_exhausted = page.cursor is None
+        start = len(self.current_results)
+        self.current_results.extend(page.names)
+        for i, graph_name in enumerate(page.names, start):
+            graph_info = self.graph_service.get_graph_info(graph_name)
+            if graph_info:
+                row_tag = 'evenrow' if i % 2 == 0 else 'oddrow'
+                self.results_tree.insert("", tk.END, values=("□", graph_name, *self.result_row_values(graph_info)),
+                                         tags=(row_tag,))
+        log_info(f"Подгружено ещё {len(page.names)} графов: показано {len(self.current_results)} из {self.results_total}")
+
     def download_selected(self):
         """Скачивание выбранных графов"""
         if not self.selected_graphs:
@@ -876,9 +1133,24 @@ class GraphSearchApp:
         # Анимация кнопки с градиентом
         self.animate_gradient_button(self.download_all_button)
 
-        log_info(f"Скачивание всех графов: {len(self.current_results)} графов")
-        self.logger.info(f"Скачивание всех графов: {len(self.current_results)}")
-        self.download_graphs(self.current_results)
+        def download(graph_names: List[str]):
+            log_info(f"Скачивание всех графов: {len(graph_names)} графов")
+            self.logger.info(f"Скачивание всех графов: {len(graph_names)}")
+            self.download_graphs(graph_names)
+
+        if self.results_exhausted or self.results_request is None:
+            download(self.current_results)
+            return
+
+        def on_error(e: BaseException):
+            # Скачивать только подгруженную часть выдачи нельзя - пользователь ждёт все графы
+            error_msg = f"Не удалось получить все найденные графы: {e}"
+            log_error(error_msg)
+            self.logger.error(error_msg)
+            messagebox.showerror("Ошибка", error_msg)
+
+        # В таблицу подгружены не все страницы - повторяем поиск целиком по текущим meta данным
+        self.bridge.submit(self.async_service.search(self.results_request), download, on_error)
 
     def download_graphs(self, graph_names: List[str]):
         """Скачивание указанных графов"""
@@ -912,55 +1184,63 @@ class GraphSearchApp:
             self.animate_process_gradient(CONFIG.UI.colors.SECONDARY)
         self.start_loading_animation()
 
-        def download_task():
-            try:
-                log_info("Начало скачивания файлов...")
-                zip_path_final = self.graph_service.download_zip(graph_names, zip_path)
+        def on_downloaded(zip_path_final: str):
+            success_msg = f"Скачивание завершено успешно!"
+            log_success(success_msg)
+            log_info(f"Архив создан: {zip_path_final}")
 
-                success_msg = f"Скачивание завершено успешно!"
-                log_success(success_msg)
-                log_info(f"Архив создан: {zip_path_final}")
-
-                # Получаем размер файла
-                try:
-                    file_size = os.path.getsize(zip_path_final)
-                    log_info(f"Размер архива: {file_size / 1024:.2f} KB")
-                except:
-                    log_info("Не удалось получить размер архива")
+            # Получаем размер файла
+            try:
+                file_size = os.path.getsize(zip_path_final)
+                log_info(f"Размер архива: {file_size / 1024:.2f} KB")
+            except:
+                log_info("Не удалось получить размер архива")
 
-                log_info(f"Абсолютный путь к архиву: {os.path.abspath(zip_path_final)}")
-                log_info(f"Количество файлов в архиве: {len(graph_names)}")
+            log_info(f"Абсолютный путь к архиву: {os.path.abspath(zip_path_final)}")
+            log_info(f"Количество файлов в архиве: {len(graph_names)}")
 
-                self.root.after(0, self.stop_loading_animation)
-                if self.use_status_bar and hasattr(self, 'status_var'):
-                    self.root.after(0, lambda: self.status_var.set(success_msg))
-                    self.root.after(0, lambda: self.animate_success_gradient(success_msg))
-                self.root.after(0, lambda: messagebox.showinfo(
-                    "Успех",
-                    f"Графы успешно скачаны!\n\nФайл: {os.path.basename(zip_path_final)}\nПуть: {zip_path_final}\nГрафов: {len(graph_names)}"
-                ))
-
-            except Exception as e:
-                error_msg = f"Ошибка при скачивании: {e}"
-                log_error(error_msg)
-                self.root.after(0, self.stop_loading_animation)
-                if self.use_status_bar and hasattr(self, 'status_var'):
-                    self.root.after(0, lambda: self.status_var.set("Ошибка скачивания"))
-                    self.root.after(0, lambda: self.animate_error_gradient())
-                self.root.after(0, lambda: messagebox.showerror("Ошибка", f"Не удалось скачать графы:\n{e}"))
+            self.stop_loading_animation()
+            if self.use_status_bar and hasattr(self, 'status_var'):
+                self.status_var.set(success_msg)
+                self.animate_success_gradient(success_msg)
+            messagebox.showinfo(
+                "Успех",
+                f"Графы успешно скачаны!\n\nФайл: {os.path.basename(zip_path_final)}\nПуть: {zip_path_final}\nГрафов: {len(graph_names)}"
+            )
+
+        def on_error(e: BaseException):
+            error_msg = f"Ошибка при скачивании: {e}"
+            log_error(error_msg)
+            self.stop_loading_animation()
+            if self.use_status_bar and hasattr(self, 'status_var'):
+                self.status_var.set("Ошибка скачивания")
+                self.animate_error_gradient()
+            messagebox.showerror("Ошибка", f"Не удалось скачать графы:\n{e}")
 
-        threading.Thread(target=download_task, daemon=True).start()
+        log_info("Начало скачивания файлов...")
+        # Архив собирается в рабочем потоке, окно остаётся отзывчивым
+        self.bridge.submit(self.async_service.download_zip(graph_names, zip_path), on_downloaded, on_error)
 
     def load_meta_data(self):
-        """Загрузка meta данных в отдельном потоке"""
+        """Отображение хода загрузки meta данных, запущенной GraphService.start_loading"""
         log_info("Загрузка meta данных...")
         if self.use_status_bar and hasattr(self, 'status_var'):
             self.status_var.set("Загрузка meta данных...")
             self.animate_process_gradient(CONFIG.UI.colors.SECONDARY)
         self.logger.info("Начата загрузка meta данных")
 
-        def load_task():
-            success = self.graph_service.download_meta()
+        def on_refresh(success):
+            if success:
+                log_info(f"Meta данные проверены на сервере. Графов: {len(self.graph_service.meta_data)}")
+            else:
+                log_warning("Не удалось проверить актуальность meta данных, используется локальный кэш")
+
+        def on_loaded(future):
+            try:
+                success = future.result()
+            except Exception as e:
+                log_error(f"Ошибка загрузки meta данных: {e}")
+                success = False
             if success:
                 graph_count = len(self.graph_service.meta_data)
                 message = f"Meta данные загружены успешно. Графов: {graph_count}"
@@ -979,7 +1259,7 @@ class GraphSearchApp:
                     self.root.after(0, lambda: self.animate_error_gradient())
                 self.root.after(0, lambda: messagebox.showerror("Ошибка", "Не удалось загрузить meta данные"))
 
-        threading.Thread(target=load_task, daemon=True).start()
+        self.graph_service.start_loading(on_refresh=on_refresh).add_done_callback(on_loaded)
 
     # ========== ВСПОМОГАТЕЛЬНЫЕ МЕТОДЫ ==========
 
@@ -1179,18 +1459,28 @@ class GraphSearchApp:
             base_text = current_text.rstrip('.')
             self.status_var.set(base_text)
 
+    def close(self):
+        """Останавливает цикл событий поиска и скачивания"""
+        self.bridge.close()
+        self.async_service.close()
+
 
 # Функция для отдельного запуска (оставлена для совместимости)
 def run_frontend():
     """Запуск фронтенд приложения"""
+    # Meta данные начинают загружаться до создания окна
+    graph_service = GraphService()
+    graph_service.start_loading()
+
     root = tk.Tk()
-    app = GraphSearchApp(root)
+    app = GraphSearchApp(root, graph_service=graph_service)
 
     # Обработка закрытия окна
     def on_closing():
         console = get_console()
         if console:
             console.log_system("Приложение поиска графов завершено")
+        app.close()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
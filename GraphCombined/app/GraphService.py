@@ -1,32 +1,637 @@
+import hashlib
 import json
 import requests
 import os
-import shutil
+import threading
 import zipfile
-from typing import List, Dict, Any, Optional
+from concurrent.futures import CancelledError, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Tuple, BinaryIO, Union
 
-from .DataTypes import GraphRequest, GraphTags, GraphSize
-from .config import REPO_URL, BASE_SAVE_PATH, META_FILE_URL
+from .DataTypes import GraphRequest, GraphTags, GraphSize, SearchFacets, SearchPage
+from .MetaIndex import MetaIndex
+from .RangeIndex import numeric_value
+from .QueryCompiler import ScanIndex, scan
+from .ShardedSearch import ShardedSearch
+from .QueryExpr import QueryExpr, parse_query
+from .ColumnarMeta import ColumnarMetaStore, np
+from .MetaSnapshot import MetaSnapshot, SnapshotMeta, SnapshotError
+from .MetaStream import iter_meta_entries
+from .MetaRecords import MetaRecord, MetaRecordTable
+from .QueryCache import QueryCache
+from .AuthorIndex import AuthorCompletions
+from .Downloader import GraphDownloader
+from .GraphStore import GraphStore
+from .config import CONFIG, REPO_URL, BASE_SAVE_PATH, META_FILE_URL
+
+
+# Сколько записей потокового разбора добавляется в индекс за один захват блокировки
+STREAM_BATCH_SIZE = 1000
 
 
 class GraphService:
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None, meta_url: Optional[str] = None,
+                 repo_url: Optional[str] = None, meta_cache_path: Optional[str] = None,
+                 delta_url: Optional[str] = None, compact: Optional[bool] = None,
+                 graph_cache_dir: Optional[str] = None, shards: Optional[int] = None,
+                 snapshot: Optional[bool] = None):
+        """
+        Args:
+            backend: Поисковый бэкенд - "bitmap" (битовый индекс), "columnar" (NumPy)
+                     или "scan" (без индекса, проход с скомпилированным предикатом).
+                     По умолчанию берётся из CONFIG.SEARCH_BACKEND
+            meta_url: Адрес meta файла (по умолчанию META_FILE_URL)
+            repo_url: Адрес каталога с графами (по умолчанию REPO_URL)
+            meta_cache_path: Путь локального кэша meta файла (по умолчанию CONFIG.META_FILE_PATH)
+            delta_url: Адрес дельта-синхронизации meta (по умолчанию CONFIG.META_DELTA_URL)
+            compact: Хранить meta данные компактными записями MetaRecord
+                     (по умолчанию CONFIG.COMPACT_META)
+            graph_cache_dir: Директория локального хранилища графов (по умолчанию CONFIG.GRAPH_CACHE_DIR)
+            shards: Число процессов, по которым распределяется поиск (по умолчанию CONFIG.SEARCH_SHARDS).
+                    При 0 или 1 поиск идёт по индексу в текущем процессе
+            snapshot: Писать двоичный снимок meta рядом с кэшем и запускаться с него
+                      (по умолчанию CONFIG.META_SNAPSHOT, требует numpy)
+        """
         self.meta_data: Dict[str, Any] = {}
+        self.index = None
         self.loaded = False
+        self.loading = False
+        self.meta_version: Optional[str] = None
+        self._lock = threading.RLock()
+        # Будит поиски, ждущие начальной загрузки: данные стали доступны или загрузка завершилась
+        self._meta_available = threading.Condition(self._lock)
+        self.meta_future: Optional[Future] = None
+        self._refresh_listeners: List[Callable[[bool], None]] = []
+        # Меняется всякий раз, когда номера строк индекса могут сдвинуться; курсоры поиска с другим поколением устарели
+        self._index_generation = 0
+
+        self.compact = CONFIG.COMPACT_META if compact is None else compact
+        self.meta_table = MetaRecordTable()
+        self.search_cache = QueryCache(CONFIG.SEARCH_CACHE_SIZE)
+        self._author_completions: Optional[AuthorCompletions] = None
+        self.shards = CONFIG.SEARCH_SHARDS if shards is None else shards
+        self._sharded: Optional[ShardedSearch] = None
+        self._sharded_building = False
+        # Меняется при каждом сбросе производных данных; части, собранные по старым meta данным, не подключаются
+        self._derived_generation = 0
+
+        self.meta_url = meta_url or META_FILE_URL
+        self.repo_url = repo_url or REPO_URL
+        self.meta_cache_path = Path(meta_cache_path) if meta_cache_path else CONFIG.META_FILE_PATH
+        self.delta_url = delta_url or CONFIG.META_DELTA_URL
+        self.downloader = GraphDownloader(self.repo_url)
+        self.graph_store = GraphStore(graph_cache_dir)
+        # Идущие загрузки графов по (имя, отпечаток meta записи): одновременные запросы одного графа
+        # ждут уже начатую загрузку, а не скачивают файл повторно
+        self._inflight: Dict[Tuple[str, Optional[str]], Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.snapshot = (CONFIG.META_SNAPSHOT if snapshot is None else snapshot) and np is not None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+        self.backend = backend or CONFIG.SEARCH_BACKEND
+        if self.backend == "columnar" and np is None:
+            print("numpy не установлен, используется битовый индекс")
+            self.backend = "bitmap"
+        elif self.backend not in ("bitmap", "columnar", "scan"):
+            raise ValueError(f"Неизвестный поисковый бэкенд: {self.backend}")
+
+    def _build_index(self, meta_data: Dict[str, Any]):
+        """Строит поисковый индекс выбранного бэкенда"""
+        if self.backend == "columnar":
+            return ColumnarMetaStore.build(meta_data)
+        if self.backend == "scan":
+            return ScanIndex.build(meta_data)
+        return MetaIndex.build(meta_data)
+
+    def _invalidate_derived(self):
+        """Сбрасывает всё, что вычислено по meta данным: кэш поиска, автодополнение и процессы шардов"""
+        self.search_cache.clear()
+        self._author_completions = None
+        self._derived_generation += 1
+        if self._sharded is not None:
+            self._sharded.close()
+            self._sharded = None
+
+    def clear_caches(self):
+        """Сбрасывает кэш поиска и автодополнение авторов: следующие вызовы посчитают их заново"""
+        with self._lock:
+            self.search_cache.clear()
+            self._author_completions = None
+
+    def _set_meta(self, meta_data: Dict[str, Any], version: Optional[str] = None, index=None):
+        """Подменяет meta данные целиком: индекс строится до подмены, чтобы поиск не видел полусостояния"""
+        if index is None:
+            index = self._build_index(meta_data)
+        with self._lock:
+            self._invalidate_derived()
+            self._index_generation += 1
+            self.index = index
+            self.meta_data = meta_data
+            self.meta_version = version
+            self.loaded = True
+            self._meta_available.notify_all()
+
+    def _apply_meta_delta(self, upserts: Dict[str, Any], removed: List[str], version: Optional[str] = None):
+        """Применяет изменения meta данных на месте, обновляя индекс без полной перестройки"""
+        self._own_snapshot_meta()
+        with self._lock:
+            self._invalidate_derived()
+            self._index_generation += 1
+            for graph_name in removed:
+                if self.meta_data.pop(graph_name, None) is not None:
+                    self.index.remove(graph_name)
+            for graph_name, graph_data in upserts.items():
+                # Изменённая запись переносится в конец, как и строка в индексе
+                self.meta_data.pop(graph_name, None)
+                self.meta_data[graph_name] = graph_data
+                self.index.add(graph_name, graph_data)
+            self.meta_version = version
+
+            # Удалённые строки индекса остаются дырами - при сильной фрагментации перестраиваем
+            if self.index.dead_rows > len(self.index):
+                self.index = self._build_index(self.meta_data)
+
+    def _apply_meta_diff(self, meta_data: Dict[str, Any], version: Optional[str] = None) -> int:
+        """
+        Сравнивает новые meta данные с текущими и применяет только разницу
+        Возвращает количество изменённых записей
+        """
+        current = self.meta_data
+        upserts = {name: data for name, data in meta_data.items() if current.get(name) != data}
+        removed = [name for name in current if name not in meta_data]
+        changes = len(upserts) + len(removed)
+
+        if changes > len(meta_data) // 2:
+            # Изменилась большая часть каталога - дешевле построить индекс заново
+            self._set_meta(meta_data, version)
+        else:
+            self._apply_meta_delta(upserts, removed, version)
+        return changes
+
+    def _own_snapshot_meta(self):
+        """
+        Meta данные из снимка неизменяемы: перед первым изменением копирует их в словарь.
+        Копия собирается без блокировки, поиск в это время продолжает работать по снимку
+        """
+        meta_data = self.meta_data
+        if not isinstance(meta_data, SnapshotMeta):
+            return
+        owned = dict(meta_data.items())
+        with self._lock:
+            if self.meta_data is not meta_data:
+                return
+            self.meta_data = owned
+
+    def _pack_record(self, graph_data: Any) -> Any:
+        """Переводит запись meta данных в компактный вид, если он включён"""
+        if self.compact and isinstance(graph_data, dict):
+            return MetaRecord.from_dict(graph_data, self.meta_table)
+        return graph_data
+
+    def _ingest_meta_batch(self, batch: List[Tuple[str, Any]]):
+        """Добавляет порцию разобранных записей в meta данные и индекс"""
+        with self._lock:
+            self._invalidate_derived()
+            for graph_name, graph_data in batch:
+                self.meta_data.pop(graph_name, None)
+                self.meta_data[graph_name] = graph_data
+                self.index.add(graph_name, graph_data)
+            self._meta_available.notify_all()
+
+    def _read_meta_stream(self, chunks: Iterable[bytes], cache_file: Optional[BinaryIO] = None) -> int:
+        """
+        Потоково разбирает meta файл.
+        При первой загрузке записи попадают в индекс по мере разбора, и поиск
+        сразу работает по уже загруженной части. При обновлении уже загруженных данных
+        новая версия собирается целиком и применяется разницей.
+        Возвращает количество изменённых записей (при первой загрузке - все)
+        """
+        digest = hashlib.sha1()
+
+        def tee():
+            for chunk in chunks:
+                digest.update(chunk)
+                if cache_file is not None:
+                    cache_file.write(chunk)
+                yield chunk
+
+        entries = ((graph_name, self._pack_record(graph_data))
+                   for graph_name, graph_data in iter_meta_entries(tee()))
+
+        if self.loaded:
+            meta_data = dict(entries)
+            return self._apply_meta_diff(meta_data, digest.hexdigest())
+
+        with self._lock:
+            self._invalidate_derived()
+            self._index_generation += 1
+            self.meta_data = {}
+            self.index = self._build_index({})
+            self.meta_version = None
+            self.loaded = True
+            self.loading = True
+
+        try:
+            batch = []
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) >= STREAM_BATCH_SIZE:
+                    self._ingest_meta_batch(batch)
+                    batch = []
+            self._ingest_meta_batch(batch)
+            # Сливаем буфер индекса сейчас, чтобы его не оплачивал первый поиск
+            with self._lock:
+                self.index.flush()
+        except Exception:
+            with self._lock:
+                self._invalidate_derived()
+                self._index_generation += 1
+                self.meta_data = {}
+                self.index = None
+                self.loaded = False
+            raise
+        finally:
+            self.loading = False
+
+        self.meta_version = digest.hexdigest()
+        return len(self.meta_data)
+
+    # ========== ЛОКАЛЬНЫЙ КЭШ META ФАЙЛА ==========
+
+    @property
+    def meta_cache_info_path(self) -> Path:
+        """Файл с валидаторами (ETag/Last-Modified) для кэша meta файла"""
+        return self.meta_cache_path.with_name(self.meta_cache_path.name + ".info")
+
+    def _read_cache_info(self) -> Dict[str, Any]:
+        """Читает валидаторы кэша. Валидаторы от другого адреса игнорируются"""
+        if not self.meta_cache_path.exists():
+            return {}
+        try:
+            with open(self.meta_cache_info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if info.get('url') != self.meta_url:
+            return {}
+        return info
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        """Заголовки условного GET по сохранённым валидаторам"""
+        info = self._read_cache_info()
+        headers = {}
+        if info.get('etag'):
+            headers['If-None-Match'] = info['etag']
+        if info.get('last_modified'):
+            headers['If-Modified-Since'] = info['last_modified']
+        return headers
+
+    @property
+    def _meta_cache_temp_path(self) -> Path:
+        return self.meta_cache_path.with_name(self.meta_cache_path.name + ".tmp")
+
+    def _open_meta_cache_temp(self) -> Optional[BinaryIO]:
+        """Открывает временный файл кэша для записи. None, если кэш недоступен"""
+        try:
+            self.meta_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            return open(self._meta_cache_temp_path, 'wb')
+        except OSError as e:
+            print(f"Не удалось открыть кэш meta файла {self.meta_cache_path}: {e}")
+            return None
+
+    def _save_meta_cache(self, content: bytes, response_headers: Dict[str, str]):
+        """Сохраняет meta файл и его валидаторы атомарной заменой"""
+        cache_file = self._open_meta_cache_temp()
+        if cache_file is None:
+            return
+        try:
+            with cache_file:
+                cache_file.write(content)
+        except OSError as e:
+            print(f"Не удалось сохранить кэш meta файла {self.meta_cache_path}: {e}")
+            return
+        self._commit_meta_cache(response_headers)
+
+    def _commit_meta_cache(self, response_headers: Dict[str, str]):
+        """Заменяет кэш meta файла записанным временным файлом и сохраняет валидаторы"""
+        try:
+            os.replace(self._meta_cache_temp_path, self.meta_cache_path)
+            # Новый файл уже содержит все изменения, журнал дельт к нему не относится
+            if self.meta_cache_journal_path.exists():
+                os.remove(self.meta_cache_journal_path)
+            self._write_cache_info({
+                'url': self.meta_url,
+                'version': self.meta_version,
+                'etag': response_headers.get('ETag'),
+                'last_modified': response_headers.get('Last-Modified'),
+            })
+        except OSError as e:
+            print(f"Не удалось сохранить кэш meta файла {self.meta_cache_path}: {e}")
+            return
+        self._schedule_snapshot()
+
+    def _write_cache_info(self, info: Dict[str, Any]):
+        with open(self.meta_cache_info_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+
+    @property
+    def meta_cache_journal_path(self) -> Path:
+        """Журнал дельт, применённых после записи кэша meta файла: по одной дельте JSON в строке"""
+        return self.meta_cache_path.with_name(self.meta_cache_path.name + ".journal")
+
+    def _journal_meta_delta(self, delta: Dict[str, Any], base_version: Optional[str],
+                            response_headers: Dict[str, str]):
+        """
+        Дописывает применённую дельту в журнал кэша вместо перезаписи всего meta файла.
+        Валидаторы ответа дельты описывают meta файл новой версии; если их нет, остаются прежние.
+        Когда журнал разрастается, кэш переписывается целиком и журнал сбрасывается
+        """
+        info = self._read_cache_info()
+        if not info or info.get('version') != base_version:
+            # Кэш не соответствует версии, к которой применялась дельта: дописывать не к чему
+            return
+        line = json.dumps({'version': delta.get('version'), 'added': delta.get('added', {}),
+                           'changed': delta.get('changed', {}), 'removed': delta.get('removed', [])},
+                          ensure_ascii=False)
+        try:
+            with open(self.meta_cache_journal_path, 'ab') as f:
+                f.write(line.encode('utf-8') + b'\n')
+                journal_size = f.tell()
+
+            info.update(version=self.meta_version, journal_size=journal_size,
+                        etag=response_headers.get('ETag') or info.get('etag'),
+                        last_modified=response_headers.get('Last-Modified') or info.get('last_modified'))
+            if journal_size <= self.meta_cache_path.stat().st_size * CONFIG.META_JOURNAL_COMPACT_RATIO:
+                self._write_cache_info(info)
+                self._schedule_snapshot()
+                return
+        except OSError as e:
+            print(f"Не удалось дописать журнал кэша meta {self.meta_cache_journal_path}: {e}")
+            return
+
+        with self._lock:
+            content = json.dumps(self.meta_data, ensure_ascii=False, default=MetaRecord.to_dict)
+        self._save_meta_cache(content.encode('utf-8'), {'ETag': info['etag'], 'Last-Modified': info['last_modified']})
+
+    def _replay_meta_journal(self, journal_size: int) -> bool:
+        """Применяет к загруженному кэшу записанные в журнал дельты (первые journal_size байт журнала)"""
+        if not journal_size:
+            return True
+        try:
+            with open(self.meta_cache_journal_path, 'rb') as f:
+                lines = f.read(journal_size).splitlines()
+            deltas = [json.loads(line) for line in lines]
+        except (OSError, ValueError) as e:
+            print(f"Журнал кэша meta не прочитан: {e}")
+            return False
+        for delta in deltas:
+            upserts, removed = self._unpack_delta(delta)
+            self._apply_meta_delta(upserts, removed, delta.get('version'))
+        return True
+
+    def copy_meta(self) -> Dict[str, Any]:
+        """Копия текущих meta данных: не меняется при последующих синхронизациях"""
+        with self._lock:
+            return dict(self.meta_data.items())
+
+    def iter_meta_bytes(self) -> Iterator[bytes]:
+        """
+        Текущие meta данные в виде meta файла, по кускам.
+        Если к кэшу не дописаны дельты, отдаётся сам файл кэша, иначе данные кодируются заново
+        """
+        if not self._read_cache_info().get('journal_size'):
+            with open(self.meta_cache_path, 'rb') as f:
+                yield from iter(lambda: f.read(CONFIG.CHUNK_SIZE * 16), b'')
+            return
+
+        meta_data = self.copy_meta()
+        encoder = json.JSONEncoder(ensure_ascii=False, default=MetaRecord.to_dict)
+        parts = []
+        size = 0
+        for part in encoder.iterencode(meta_data):
+            parts.append(part)
+            size += len(part)
+            if size >= CONFIG.CHUNK_SIZE * 16:
+                yield ''.join(parts).encode('utf-8')
+                parts = []
+                size = 0
+        yield ''.join(parts).encode('utf-8')
+
+    # ========== ДВОИЧНЫЙ СНИМОК META ==========
+
+    @property
+    def meta_snapshot_path(self) -> Path:
+        """Двоичный снимок meta данных, соответствующий кэшу meta файла"""
+        return self.meta_cache_path.with_name(self.meta_cache_path.name + ".snapshot")
+
+    def _load_snapshot(self, version: Optional[str]) -> bool:
+        """
+        Открывает снимок meta данных через mmap, если он записан для той же версии кэша.
+        Поиск сразу работает по колоночному индексу поверх снимка; индекс выбранного
+        бэкенда, если это не "columnar", строится в фоне и подменяет колоночный, когда готов
+        """
+        if not self.snapshot or version is None or not self.meta_snapshot_path.exists():
+            return False
+        try:
+            snapshot = MetaSnapshot.open(self.meta_snapshot_path)
+        except (OSError, SnapshotError) as e:
+            print(f"Снимок meta данных не прочитан: {e}")
+            return False
+        if snapshot.version != version or snapshot.source != self.meta_url:
+            print("Снимок meta данных устарел, загружаем meta файл")
+            snapshot.close()
+            return False
+
+        self._set_meta(snapshot.meta_data, version, ColumnarMetaStore.from_snapshot(snapshot))
+        print(f"Meta данные открыты из снимка {self.meta_snapshot_path}. Загружено {len(self.meta_data)} графов")
+        if self.backend != "columnar":
+            threading.Thread(target=self._replace_snapshot_index, daemon=True).start()
+        return True
+
+    def _replace_snapshot_index(self):
+        """
+        Строит индекс выбранного бэкенда взамен колоночного индекса снимка. Номера строк совпадают,
+        поэтому курсоры и кэш поиска остаются в силе. Если meta данные успели
+        измениться, индекс строится заново по новой версии
+        """
+        while True:
+            with self._lock:
+                if not isinstance(self.index, ColumnarMetaStore) or not self.loaded:
+                    return
+                generation = self._index_generation
+                meta_data = self.meta_data if isinstance(self.meta_data, SnapshotMeta) else dict(self.meta_data)
+            index = self._build_index(meta_data)
+            with self._lock:
+                if generation == self._index_generation:
+                    self.index = index
+                    return
+
+    def _schedule_snapshot(self):
+        """
+        Пишет снимок текущих meta данных в отдельном потоке.
+        Поток не daemon: при выходе процесс дождётся записи и не оставит временный файл
+        """
+        if not self.snapshot:
+            return
+
+        def write_task():
+            with self._snapshot_lock:
+                with self._lock:
+                    version = self.meta_version
+                    meta_data = self.meta_data if isinstance(self.meta_data, SnapshotMeta) else dict(self.meta_data)
+                if isinstance(meta_data, SnapshotMeta) and meta_data.snapshot.version == version:
+                    return
+                try:
+                    MetaSnapshot.write(self.meta_snapshot_path, meta_data.items(), version, self.meta_url)
+                except (OSError, ValueError, OverflowError) as e:
+                    print(f"Не удалось сохранить снимок meta данных {self.meta_snapshot_path}: {e}")
+
+        self._snapshot_thread = threading.Thread(target=write_task)
+        self._snapshot_thread.start()
+
+    def wait_snapshot(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ждёт окончания фоновой записи снимка meta данных.
+        Возвращает True, если запись завершена и снимок лежит на диске
+        """
+        thread = self._snapshot_thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                return False
+        return self.snapshot and self.meta_snapshot_path.exists()
+
+    def start_loading(self, on_refresh: Optional[Callable[[bool], None]] = None) -> Future:
+        """
+        Запускает load_meta в фоновом потоке. Загрузка начинается один раз,
+        повторные вызовы возвращают тот же Future с результатом load_meta.
+        Поиски, вызванные до окончания загрузки, дожидаются данных
+
+        Args:
+            on_refresh: Добавляется к получателям результата фоновой перепроверки кэша
+        """
+        with self._lock:
+            if on_refresh is not None:
+                self._refresh_listeners.append(on_refresh)
+            if self.meta_future is not None:
+                return self.meta_future
+            future = self.meta_future = Future()
+        future.set_running_or_notify_cancel()
+
+        def load_task():
+            try:
+                future.set_result(self.load_meta(on_refresh=self._notify_refresh))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._meta_available.notify_all()
+
+        threading.Thread(target=load_task, daemon=True).start()
+        return future
+
+    def _notify_refresh(self, success: bool):
+        for listener in list(self._refresh_listeners):
+            listener(success)
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ждёт, пока по meta данным можно искать: загрузка завершилась или,
+        при потоковой загрузке, в индекс попали первые записи.
+        Возвращает True, если данные доступны
+        """
+        with self._meta_available:
+            self._meta_available.wait_for(
+                lambda: self._meta_ready or self.meta_future is None or self.meta_future.done(), timeout)
+            return self.loaded
+
+    @property
+    def _meta_ready(self) -> bool:
+        """По meta данным можно искать: загрузка завершена или в индексе уже есть записи"""
+        return self.loaded and (not self.loading or len(self.meta_data) > 0)
+
+    def _await_meta(self) -> bool:
+        """Перед поиском дожидается начальной загрузки, если она ещё идёт"""
+        if self._meta_ready:
+            return True
+        future = self.meta_future
+        if future is None or future.done():
+            return False
+        print("Meta данные ещё загружаются, поиск выполнится после загрузки")
+        if self.wait_until_loaded(CONFIG.META_WAIT_TIMEOUT):
+            return True
+        if not future.done():
+            print(f"Meta данные не загрузились за {CONFIG.META_WAIT_TIMEOUT} с")
+        return False
+
+    def load_meta(self, on_refresh: Optional[Callable[[bool], None]] = None) -> bool:
+        """
+        Загружает meta данные при запуске приложения.
+        Если есть локальный кэш, он загружается сразу, а актуальность проверяется
+        условным GET в фоновом потоке. Иначе meta файл скачивается синхронно.
+
+        Args:
+            on_refresh: Вызывается из фонового потока с результатом перепроверки кэша
+        """
+        if self.meta_cache_path.exists() and (self._load_snapshot(self._read_cache_info().get('version')) or
+                                              self.load_meta_cache()):
+
+            def refresh_task():
+                success = self.sync_meta()
+                if on_refresh is not None:
+                    on_refresh(success)
+
+            threading.Thread(target=refresh_task, daemon=True).start()
+            return True
+
+        return self.download_meta()
+
+    def load_meta_cache(self) -> bool:
+        """Загружает meta данные из локального кэша meta файла с дописанными дельтами и версией и пишет по ним снимок"""
+        if not self.load_meta_from_file(str(self.meta_cache_path)):
+            return False
+        info = self._read_cache_info()
+        if not self._replay_meta_journal(info.get('journal_size', 0)):
+            return False
+        self.meta_version = info.get('version') or self.meta_version
+        self._schedule_snapshot()
+        return True
 
     def download_meta(self) -> bool:
         """
         Загружает meta-файл при запуске приложения в память
+        Если есть локальный кэш, выполняется условный GET, и при ответе 304
+        meta данные берутся из кэша без повторной загрузки
         Возвращает True при успешной загрузке, False при ошибке
         """
         try:
-            print(f"Загружаем meta файл из: {META_FILE_URL}")
-            response = requests.get(META_FILE_URL)
+            print(f"Загружаем meta файл из: {self.meta_url}")
+            response = requests.get(self.meta_url, headers=self._conditional_headers(),
+                                    timeout=CONFIG.TIMEOUT, stream=True)
+
+            if response.status_code == 304:
+                print("Meta файл не изменился, используется локальный кэш")
+                if self.loaded:
+                    return True
+                return self.load_meta_cache()
+
             response.raise_for_status()
- 
-            # Пробуем распарсить JSON
-            self.meta_data = response.json()
-            self.loaded = True
+
+            # Разбираем JSON потоково, параллельно сохраняя байты в кэш
+            refreshing = self.loaded
+            cache_file = self._open_meta_cache_temp()
+            try:
+                changes = self._read_meta_stream(response.iter_content(CONFIG.CHUNK_SIZE), cache_file)
+            finally:
+                if cache_file is not None:
+                    cache_file.close()
+            if cache_file is not None:
+                self._commit_meta_cache(response.headers)
+
+            if refreshing:
+                print(f"Meta файл обновлён. Изменено записей: {changes}")
             print(f"Meta файл успешно загружен. Загружено {len(self.meta_data)} графов")
             return True
 
@@ -43,29 +648,240 @@ class GraphService:
             print(f"Неожиданная ошибка: {e}")
             return False
 
+    def sync_meta(self) -> bool:
+        """
+        Обновляет уже загруженные meta данные.
+        Если задан delta_url и известна версия, запрашивает только изменения:
+            GET <delta_url>?since=<версия>
+            200 -> {"version": ..., "added": {...}, "changed": {...}, "removed": [...]}
+            304 -> изменений нет
+            прочие ответы -> версия неизвестна серверу, выполняется полная загрузка
+        Полная загрузка тоже применяет к индексу только разницу.
+        Возвращает True при успешной синхронизации, False при ошибке
+        """
+        if self.delta_url and self.loaded and self.meta_version:
+            result = self._download_meta_delta()
+            if result is not None:
+                return result
+        return self.download_meta()
+
+    def _unpack_delta(self, delta: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """Записи и удалённые имена из тела дельты meta"""
+        upserts = {graph_name: self._pack_record(graph_data)
+                   for part in ('added', 'changed')
+                   for graph_name, graph_data in delta.get(part, {}).items()}
+        return upserts, delta.get('removed', [])
+
+    def _download_meta_delta(self) -> Optional[bool]:
+        """Запрашивает дельту meta данных. None означает, что нужна полная загрузка"""
+        try:
+            print(f"Запрашиваем изменения meta с версии {self.meta_version}")
+            response = requests.get(self.delta_url, params={'since': self.meta_version},
+                                    timeout=CONFIG.TIMEOUT)
+            if response.status_code == 304:
+                print("Meta данные актуальны")
+                return True
+            if response.status_code != 200:
+                print(f"Дельта недоступна (HTTP {response.status_code}), выполняем полную загрузку")
+                return None
+
+            delta = response.json()
+            upserts, removed = self._unpack_delta(delta)
+            base_version = self.meta_version
+            self._apply_meta_delta(upserts, removed, delta.get('version'))
+            self._journal_meta_delta(delta, base_version, response.headers)
+            print(f"Применена дельта meta: +{len(upserts)} / -{len(removed)}. Графов: {len(self.meta_data)}")
+            return True
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Ошибка при получении дельты meta: {e}")
+            return None
+
     def search(self, request: GraphRequest) -> List[str]:
         """
         Ищет внутри мета файла по GraphRequest
         Возвращает список имён графов для скачивания
         """
-        if not self.loaded:
+        if not self._await_meta():
             print("Meta файл не загружен. Сначала вызовите download_meta()")
             return []
 
+        if self.loading:
+            print(f"Meta файл ещё загружается. Поиск по {len(self.meta_data)} загруженным графам")
+
         if request.is_empty():
             print("Пустой запрос. Возвращаем все графы.")
-            return list(self.meta_data.keys())
+            with self._lock:
+                return list(self.meta_data.keys())
+
+        if self.index is not None:
+            key = request.cache_key()
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                return cached
+            if self.shards > 1 and not self.loading:
+                results = self._search_sharded(request)
+                if results is not None:
+                    return results
+            with self._lock:
+                results = self.index.search(request)
+                # Частичные результаты во время загрузки не кэшируем
+                if not self.loading:
+                    self.search_cache.put(key, results)
+            return results
+
+        with self._lock:
+            return scan(self.meta_data, request)
+
+    def search_expr(self, expr: Union[str, QueryExpr]) -> List[str]:
+        """
+        Ищет графы по логическому выражению, например
+            (tree OR planar) AND NOT pseudo AND size in {large, huge}
+        Выражение вычисляется одним проходом алгебры множеств над индексом
+
+        Raises:
+            QuerySyntaxError: если текст выражения некорректен
+        """
+        if isinstance(expr, str):
+            expr = parse_query(expr)
+
+        if not self._await_meta() or self.index is None:
+            print("Meta файл не загружен. Сначала вызовите download_meta()")
+            return []
 
-        matching_graphs = []
+        key = ('expr', expr.key())
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            results = self.index.search_expr(expr)
+            if not self.loading:
+                self.search_cache.put(key, results)
+        return results
 
-        for graph_name, graph_data in self.meta_data.items():
-            if self._matches_request(graph_data, request):
-                matching_graphs.append(graph_name)
+    def _search_sharded(self, request: GraphRequest) -> Optional[List[str]]:
+        """
+        Ищет параллельно в процессах шардов. Процессы поднимаются в фоне при первом запросе
+        после загрузки или изменения meta данных, до их готовности поиск идёт в текущем процессе.
+        Возвращает None, если части ещё не готовы или были остановлены из-за обновления meta
+        """
+        with self._lock:
+            sharded = self._sharded
+            generation = self._index_generation
+            if sharded is None:
+                if not self._sharded_building:
+                    self._sharded_building = True
+                    meta_data = dict(self.meta_data.items())
+                    threading.Thread(target=self._build_shards, args=(meta_data, self._derived_generation),
+                                     daemon=True).start()
+                return None
 
-        return matching_graphs
+        try:
+            results = sharded.search(request)
+        except (BrokenProcessPool, CancelledError, RuntimeError):
+            return None
+
+        with self._lock:
+            if generation != self._index_generation:
+                return None
+            self.search_cache.put(request.cache_key(), results)
+        return results
+
+    def _build_shards(self, meta_data: Dict[str, Any], derived_generation: int):
+        """Запускает процессы шардов без блокировки сервиса и подключает их, если meta данные не менялись"""
+        print(f"Запуск шардированного поиска: {self.shards} процессов, {len(meta_data)} графов")
+        try:
+            sharded = ShardedSearch(meta_data, self.shards, self.backend)
+        except Exception as e:
+            print(f"Не удалось запустить шардированный поиск: {e}")
+            sharded = None
+        with self._lock:
+            self._sharded_building = False
+            if sharded is not None and derived_generation == self._derived_generation and self._sharded is None:
+                self._sharded = sharded
+                sharded = None
+        if sharded is not None:
+            sharded.close()
+
+    def search_page(self, request: GraphRequest, limit: Optional[int] = None,
+                    cursor: Optional[str] = None, facets: bool = False) -> SearchPage:
+        """
+        Ищет графы постранично, в порядке строк индекса.
+        Без cursor возвращает первую страницу, с cursor из предыдущей страницы - следующую.
+        facets=True - вместе со страницей посчитать фасеты (как search_facets без имён)
+        по тому же поиску в индексе
+
+        Raises:
+            ValueError: если курсор некорректен, выдан для другого запроса
+                        или устарел после изменения meta данных
+        """
+        limit = max(1, limit or CONFIG.SEARCH_PAGE_SIZE)
+        if not self._await_meta() or self.index is None:
+            print("Meta файл не загружен. Сначала вызовите download_meta()")
+            return SearchPage()
+
+        with self._lock:
+            start = 0 if cursor is None else self._decode_cursor(request, cursor)
+            page_facets = None
+            if facets:
+                names, next_row, page_facets = self.index.page_with_facets(request, start, limit)
+                total = page_facets.total
+            else:
+                names, next_row, total = self.index.page(request, start, limit)
+            next_cursor = None if next_row is None else self._encode_cursor(request, next_row)
+        return SearchPage(names=names, cursor=next_cursor, total=total, facets=page_facets)
+
+    def iter_search(self, request: GraphRequest, page_size: Optional[int] = None) -> Iterator[str]:
+        """Отдаёт имена найденных графов, запрашивая их страницами"""
+        cursor = None
+        while True:
+            page = self.search_page(request, page_size, cursor)
+            yield from page.names
+            if page.cursor is None:
+                return
+            cursor = page.cursor
+
+    @staticmethod
+    def _request_digest(request: GraphRequest) -> str:
+        return hashlib.sha1(repr(request.cache_key()).encode('utf-8')).hexdigest()[:8]
+
+    def _encode_cursor(self, request: GraphRequest, row: int) -> str:
+        """Курсор: поколение индекса, строка продолжения и отпечаток запроса"""
+        return f"{self._index_generation}.{row}.{self._request_digest(request)}"
+
+    def _decode_cursor(self, request: GraphRequest, cursor: str) -> int:
+        """Проверяет курсор и возвращает строку, с которой продолжать поиск"""
+        try:
+            generation, row, digest = cursor.split('.')
+            generation, row = int(generation), int(row)
+        except (AttributeError, ValueError):
+            raise ValueError(f"Некорректный курсор поиска: {cursor!r}") from None
+        if row < 0 or digest != self._request_digest(request):
+            raise ValueError("Курсор поиска выдан для другого запроса")
+        if generation != self._index_generation:
+            raise ValueError("Курсор поиска устарел: meta данные изменились, повторите поиск")
+        return row
+
+    def search_facets(self, request: GraphRequest, top_authors: int = 10,
+                      with_names: bool = True) -> SearchFacets:
+        """
+        Ищет графы и за тот же проход по индексу считает, сколько из найденных
+        приходится на каждый размер, каждое значение тега и на самых частых авторов.
+        with_names=False - только счётчики; страница имён вместе со счётчиками - search_page(facets=True)
+        """
+        if not self._await_meta() or self.index is None:
+            print("Meta файл не загружен. Сначала вызовите download_meta()")
+            return SearchFacets()
+
+        with self._lock:
+            return self.index.facets(request, top_authors, with_names)
 
     def _matches_request(self, graph_data: Dict[str, Any], request: GraphRequest) -> bool:
-        """Проверяет, соответствует ли граф критериям запроса"""
+        """
+        Проверяет, соответствует ли граф критериям запроса.
+        Поиск без индекса использует предикат из QueryCompiler.compile_request,
+        эта проверка - его эталон
+        """
         # Проверка автора
         if request.author is not None:
             if request.strict_search:
@@ -88,6 +904,15 @@ class GraphService:
             if not self._matches_properties(graph_properties, request.tags, request.strict_search):
                 return False
 
+        # Проверка числовых диапазонов
+        for field, value_range in request.ranges().items():
+            value = numeric_value(graph_data, field)
+            if value is None:
+                if request.strict_search:
+                    return False
+            elif not value_range.contains(value):
+                return False
+
         return True
 
     def _matches_properties(self, graph_properties: Dict[str, Any], request_tags: GraphTags, strict: bool) -> bool:
@@ -111,80 +936,173 @@ class GraphService:
 
         return True
 
-    def download_zip(self, graph_names: List[str], save_path: Optional[str] = None) -> str:
+    def _graph_stamp(self, graph_name: str) -> Optional[str]:
+        """Отпечаток meta записи графа: при его изменении граф скачивается заново"""
+        graph_data = self.get_graph_info(graph_name)
+        if graph_data is None:
+            return None
+        content = json.dumps(graph_data, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def fetch_graph(self, graph_name: str) -> bytes:
+        """
+        Возвращает содержимое файла графа
+        Граф берётся из локального хранилища, а скачивается только если его там нет
+        или его meta запись изменилась
+        """
+        stamp = self._graph_stamp(graph_name)
+        content = self.graph_store.get(graph_name, stamp)
+        if content is not None:
+            return content
+
+        key = (graph_name, stamp)
+        future, leader = self._begin_fetch(key)
+        if not leader:
+            return future.result()
+        try:
+            # Предыдущая загрузка могла завершиться между первой проверкой хранилища и _begin_fetch
+            content = self.graph_store.get(graph_name, stamp)
+            if content is None:
+                content = self.downloader.fetch(graph_name)
+                self.graph_store.put(graph_name, content, stamp)
+        except BaseException as e:
+            self._end_fetch(key, future, error=e)
+            raise
+        self._end_fetch(key, future, content)
+        return content
+
+    def _begin_fetch(self, key: Tuple[str, Optional[str]]) -> Tuple[Future, bool]:
+        """
+        Регистрирует загрузку графа. Если такая же загрузка уже идёт, возвращает её Future
+        и False - нужно дождаться результата. Иначе возвращает новый Future и True:
+        вызывающий скачивает граф сам и завершает Future через _end_fetch
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+        # Запущенный Future нельзя отменить: ожидающие не могут сорвать загрузку друг другу
+        future.set_running_or_notify_cancel()
+        return future, True
+
+    def _end_fetch(self, key: Tuple[str, Optional[str]], future: Future,
+                   content: Optional[bytes] = None, error: Optional[BaseException] = None):
+        """
+        Снимает загрузку с учёта и передаёт результат ожидающим.
+        Граф к этому моменту уже в хранилище, поэтому следующие запросы берут его оттуда
+        """
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(content)
+
+    def fetch_graphs(self, graph_names: List[str]) -> Dict[str, Union[bytes, Exception]]:
+        """Параллельно получает несколько графов через локальное хранилище"""
+        try:
+            return dict(self.downloader.fetch_many(graph_names, fetch=self.fetch_graph))
+        finally:
+            self.graph_store.save()
+
+    def download_zip(self, graph_names: List[str], save_path: Optional[str] = None,
+                     progress: Optional[Callable[[str, Union[int, Exception]], None]] = None,
+                     zip_path: Optional[str] = None) -> str:
         """
         Скачивает графы и создает zip архив
+        Содержимое файлов пишется в архив как есть, без повторной сериализации JSON;
+        в памяти одновременно держится не больше окна fetch_many
         Возвращает путь к созданному zip файлу
+
+        Args:
+            progress: Вызывается после каждого графа с размером файла в байтах
+                      или исключением, если граф скачать не удалось
+            zip_path: Точный путь архива. По умолчанию архив graphs_<N>_files.zip
+                      создаётся в каталоге save_path
         """
         if not graph_names:
             raise ValueError("Список графов для скачивания пуст")
 
-        if save_path is None:
-            save_path = BASE_SAVE_PATH
-        save_directory = os.path.dirname(save_path) + os.sep
+        if zip_path is not None:
+            save_directory = os.path.dirname(os.path.abspath(zip_path))
+        else:
+            if save_path is None:
+                save_path = BASE_SAVE_PATH
+            save_directory = os.path.dirname(save_path) + os.sep
+            zip_path = os.path.join(save_directory, f"graphs_{len(graph_names)}_files.zip")
 
         # Создаем директорию для сохранения, если её нет
         os.makedirs(save_directory, exist_ok=True)
-
-        # Временная директория для скачанных файлов
-        temp_dir = os.path.join(save_directory, ".temp_graphs")
-        os.makedirs(temp_dir, exist_ok=True)
-
-        downloaded_files = []
+        # Архив собирается во временном файле, чтобы при сбое не оставить битый zip
+        partial_path = zip_path + ".part"
 
         try:
-            # Скачиваем каждый граф
-            for graph_name in graph_names:
-                graph_filename = f"{graph_name}.json"
-                graph_url = f"{REPO_URL}/{graph_filename}"
-
-                try:
-                    response = requests.get(graph_url)
-                    response.raise_for_status()
+            with zipfile.ZipFile(partial_path, 'w') as zipf:
+                # Скачиваем графы параллельно, результаты приходят в исходном порядке
+                for graph_name, result in self.downloader.fetch_many(graph_names, fetch=self.fetch_graph):
+                    graph_filename = f"{graph_name}.json"
 
-                    file_path = os.path.join(temp_dir, graph_filename)
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(response.json(), f, ensure_ascii=False, indent=2)
+                    if isinstance(result, Exception):
+                        print(f"Ошибка при скачивании {graph_filename}: {result}")
+                        if progress is not None:
+                            progress(graph_name, result)
+                        continue
 
-                    downloaded_files.append(file_path)
+                    zipf.writestr(graph_filename, result)
                     print(f"Успешно скачан: {graph_filename}")
+                    if progress is not None:
+                        progress(graph_name, len(result))
 
-                except requests.exceptions.RequestException as e:
-                    print(f"Ошибка при скачивании {graph_filename}: {e}")
-
-            # Создаем zip архив
-            zip_filename = f"graphs_{len(graph_names)}_files.zip"
-            zip_path = os.path.join(save_directory, zip_filename)
-
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                for file_path in downloaded_files:
-                    zipf.write(file_path, os.path.basename(file_path))
-
-            print(f"Zip архив создан: {zip_path}")
-            return zip_path
-
-        finally:
-            # Очищаем временные файлы
+            os.replace(partial_path, zip_path)
+        except BaseException:
             try:
-                shutil.rmtree(temp_dir)
+                os.remove(partial_path)
             except OSError:
-                print(f"Не удалось удалить временную директорию {temp_dir}: {e}")
                 pass
+            raise
+        finally:
+            self.graph_store.save()
+
+        print(f"Zip архив создан: {zip_path}")
+        return zip_path
 
     def get_graph_info(self, graph_name: str) -> Optional[Dict[str, Any]]:
         """Возвращает информацию о конкретном графе"""
-        return self.meta_data.get(graph_name)
+        graph_data = self.meta_data.get(graph_name)
+        if isinstance(graph_data, MetaRecord):
+            return graph_data.to_dict()
+        return graph_data
+
+    @property
+    def author_completions(self) -> AuthorCompletions:
+        """Отсортированный список авторов с числом графов, строится один раз на версию meta"""
+        completions = self._author_completions
+        if completions is None:
+            with self._lock:
+                if isinstance(self.meta_data, SnapshotMeta):
+                    completions = AuthorCompletions(self.meta_data.snapshot.author_counts())
+                else:
+                    completions = AuthorCompletions.build(self.meta_data.values())
+                if not self.loading:
+                    self._author_completions = completions
+        return completions
 
     def get_all_authors(self) -> List[str]:
         """Возвращает список всех авторов"""
         if not self.loaded:
             return []
-        authors = set()
-        for graph_data in self.meta_data.values():
-            author = graph_data.get('author')
-            if author:
-                authors.add(author)
-        return sorted(list(authors))
+        return list(self.author_completions.sorted_authors)
+
+    def complete_author(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Подсказки авторов по началу имени: [(автор, число графов), ...]
+        Пока meta данные загружаются, подсказок нет: список авторов по неполным данным
+        не кэшируется и строился бы заново на каждое нажатие клавиши
+        """
+        if not self.loaded or self.loading:
+            return []
+        return self.author_completions.complete(prefix, limit or CONFIG.AUTHOR_COMPLETION_LIMIT)
 
     def load_meta_from_file(self, file_path: str) -> bool:
         """
@@ -192,9 +1110,8 @@ class GraphService:
         для тестирования
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                self.meta_data = json.load(f)
-            self.loaded = True
+            with open(file_path, 'rb') as f:
+                self._read_meta_stream(iter(lambda: f.read(CONFIG.CHUNK_SIZE), b''))
             print(f"Meta файл успешно загружен из {file_path}. Загружено {len(self.meta_data)} графов")
             return True
         except Exception as e:
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set
+
+from .config import CONFIG
+
+
+class GraphStore:
+    """
+    Локальное контентно-адресуемое хранилище файлов графов.
+
+    Содержимое хранится в objects/<sha256[:2]>/<sha256>, одинаковые файлы
+    под разными именами занимают место один раз. index.json связывает имя графа
+    с хешем содержимого и отпечатком его meta записи (stamp): пока запись
+    в meta не изменилась, граф берётся локально. При превышении max_bytes
+    вытесняются файлы, к которым дольше всего не обращались.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root) if root else CONFIG.GRAPH_CACHE_DIR
+        self.max_bytes = CONFIG.GRAPH_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.blobs: 'OrderedDict[str, int]' = OrderedDict()
+        self._names_by_blob: Dict[str, Set[str]] = {}
+        self.total_bytes = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+
+        self._load()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / self.INDEX_FILE
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def _load(self):
+        """Читает индекс хранилища с диска"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # Порядок blobs - от давно использованных к недавно использованным
+        for digest, size in data.get('blobs', []):
+            self.blobs[digest] = size
+            self.total_bytes += size
+        for graph_name, entry in data.get('entries', {}).items():
+            if entry.get('digest') in self.blobs:
+                self.entries[graph_name] = entry
+                self._names_by_blob.setdefault(entry['digest'], set()).add(graph_name)
+
+    def save(self):
+        """Сохраняет индекс хранилища, если он менялся"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                'entries': self.entries,
+                'blobs': [[digest, size] for digest, size in self.blobs.items()],
+            }
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+                temp_path = self.index_path.with_name(self.INDEX_FILE + ".tmp")
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_path, self.index_path)
+                self._dirty = False
+            except OSError as e:
+                print(f"Не удалось сохранить индекс хранилища графов {self.index_path}: {e}")
+
+    def names(self) -> List[str]:
+        """Имена графов, лежащих в хранилище"""
+        with self._lock:
+            return list(self.entries.keys())
+
+    def lookup(self, graph_name: str, stamp: Optional[str] = None) -> Optional[Path]:
+        """
+        Возвращает путь к файлу графа в хранилище или None.
+        Если передан stamp, граф считается найденным только при совпадении отпечатка meta
+        """
+        with self._lock:
+            entry = self.entries.get(graph_name)
+            if entry is None or (stamp is not None and entry.get('stamp') != stamp):
+                return None
+            digest = entry['digest']
+            path = self.blob_path(digest)
+            if not path.exists():
+                self._drop_blob(digest)
+                return None
+            self.blobs.move_to_end(digest)
+            self._dirty = True
+            return path
+
+    def get(self, graph_name: str, stamp: Optional[str] = None) -> Optional[bytes]:
+        """Возвращает содержимое графа из хранилища или None"""
+        path = self.lookup(graph_name, stamp)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, graph_name: str, content: bytes, stamp: Optional[str] = None) -> str:
+        """Кладёт граф в хранилище. Возвращает хеш содержимого"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.blob_path(digest)
+
+        # Файл пишется без блокировки: другие потоки тем временем читают и кладут свои графы
+        with self._lock:
+            stored = digest in self.blobs and path.exists()
+        temp_path = None if stored else self._write_temp(path, content)
+
+        with self._lock:
+            if temp_path is None and not path.exists():
+                # Файл вытеснили, пока блокировка была отпущена
+                temp_path = self._write_temp(path, content)
+            if temp_path is not None:
+                os.replace(temp_path, path)
+            if digest not in self.blobs:
+                self.blobs[digest] = len(content)
+                self.total_bytes += len(content)
+            self.blobs.move_to_end(digest)
+
+            previous = self.entries.get(graph_name)
+            if previous is not None and previous['digest'] != digest:
+                self._unlink_name(graph_name, previous['digest'])
+            self.entries[graph_name] = {'digest': digest, 'stamp': stamp}
+            self._names_by_blob.setdefault(digest, set()).add(graph_name)
+            self._dirty = True
+
+            self._evict(keep=digest)
+        return digest
+
+    @staticmethod
+    def _write_temp(path: Path, content: bytes) -> Path:
+        """Пишет содержимое во временный файл рядом с path, уникальный для потока"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        return temp_path
+
+    def _unlink_name(self, graph_name: str, digest: str):
+        """Отвязывает имя от файла; файл без имён удаляется"""
+        names = self._names_by_blob.get(digest)
+        if names is not None:
+            names.discard(graph_name)
+            if not names:
+                self._drop_blob(digest)
+
+    def _drop_blob(self, digest: str):
+        """Удаляет файл и все ссылающиеся на него имена"""
+        for graph_name in self._names_by_blob.pop(digest, ()):
+            self.entries.pop(graph_name, None)
+        self.total_bytes -= self.blobs.pop(digest, 0)
+        try:
+            os.remove(self.blob_path(digest))
+        except OSError:
+            pass
+        self._dirty = True
+
+    def _evict(self, keep: Optional[str] = None):
+        """Вытесняет давно не использованные файлы, пока размер не уложится в лимит"""
+        while self.total_bytes > self.max_bytes and self.blobs:
+            digest = next(iter(self.blobs))
+            if digest == keep:
+                break
+            self._drop_blob(digest)
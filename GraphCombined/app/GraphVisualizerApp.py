@@ -1411,9 +1411,9 @@ class GraphBrowser(ttk.Frame):
         # Настраиваем растягивание окна при изменении размера
         canvas.bind("<Configure>", lambda e: canvas.itemconfig(canvas_window, width=e.width))
 
-    def load_archive(self, path):
-        """Загружает ZIP-архив"""
-        self.explorer = GraphExplorer(path)
+    def load_archive(self, path, contents=None):
+        """Загружает ZIP-архив или уже полученные файлы графов"""
+        self.explorer = GraphExplorer(path, contents)
         files = self.explorer.list_files()
         json_files = [f for f in files if f.endswith('.json')]
 
@@ -1737,6 +1737,28 @@ class GraphVisualizerApp:
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка загрузки архива: {str(e)}")
 
+    def load_fetched(self, contents):
+        """Открывает графы, полученные через GraphService: {имя графа: содержимое файла}"""
+        try:
+            explorer = GraphExplorer("", contents)
+            files = explorer.list_files()
+            if not files:
+                messagebox.showwarning("Внимание", "Выбранные графы не получены")
+                return
+
+            graph = explorer.read_graph(files[0])
+            if graph:
+                self.set_graph(graph)
+                self.update_graph_info()
+                if len(files) > 1:
+                    self.show_browser()
+                    self.browser.load_archive("", contents)
+                else:
+                    self.hide_browser()
+
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Ошибка загрузки полученных графов: {str(e)}")
+
     def on_graph_selected_in_browser(self, event):
         """Обработчик выбора графа в браузере"""
         if self.browser:
@@ -0,0 +1,319 @@
+import heapq
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+from .DataTypes import GraphRequest, SearchFacets, TAG_NAMES
+from .AuthorIndex import AuthorIndex
+from .MetaRecords import MetaRecord, TAG_BITS
+from .RangeIndex import NUMERIC_FIELDS, SortedColumn, numeric_values
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# По сколько строк битовое множество разбирается при выдаче страницы
+PAGE_BLOCK = 4096
+PAGE_BLOCK_MASK = (1 << PAGE_BLOCK) - 1
+
+# Во сколько машинных слов пересечения битовых множеств обходится перебор одной найденной строки
+# при подсчёте авторов в фасетах (замерено на 200k записей)
+AUTHOR_ROW_COST = 64
+
+
+def _bits_from_rows(rows: List[int]) -> int:
+    """Собирает битовое множество из списка номеров строк за один проход"""
+    if not rows:
+        return 0
+    if np is not None and len(rows) > 64:
+        flags = np.zeros(max(rows) + 1, dtype=bool)
+        flags[np.fromiter(rows, dtype=np.intp, count=len(rows))] = True
+        return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+    buffer = bytearray((max(rows) >> 3) + 1)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class MetaIndex:
+    """
+    Инвертированный битовый индекс по meta данным.
+
+    Каждому графу присваивается номер строки, а для каждой пары (тег, значение),
+    каждого размера и каждого автора хранится битовое множество (int) строк.
+    Запрос отвечается пересечением битовых множеств вместо обхода всего словаря.
+    Добавления копятся в буфере и сливаются в битовые множества перед запросом,
+    поэтому индекс можно наполнять по одной записи.
+    """
+
+    def __init__(self):
+        self.names: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.alive = 0
+
+        self.tag_bits: Dict[Tuple[str, Any], int] = {}
+        self.tag_known: Dict[str, int] = {}
+        self.size_bits: Dict[Any, int] = {}
+        self.author_bits: Dict[Any, int] = {}
+        # Автор каждой строки: счётчики авторов в фасетах считаются только по найденным строкам
+        self.row_authors: List[Any] = []
+        self.authors = AuthorIndex()
+        # Числовые свойства: отсортированные колонки и строки, где значение задано
+        self.numeric: Dict[str, SortedColumn] = {field: SortedColumn() for field in NUMERIC_FIELDS}
+        self.numeric_known: Dict[str, int] = {}
+
+        # Буфер добавлений: строки, сгруппированные по автору, размеру,
+        # набору тегов и числовому полю. Живые строки - хвост с _flushed_rows
+        self._flushed_rows = 0
+        self._pending_authors: Dict[Any, List[int]] = {}
+        self._pending_sizes: Dict[Any, List[int]] = {}
+        self._pending_masks: Dict[Tuple[int, int], List[int]] = {}
+        self._pending_tags: Dict[Tuple[Tuple[str, Any], ...], List[int]] = {}
+        self._pending_numeric: Dict[str, List[int]] = {field: [] for field in NUMERIC_FIELDS}
+
+    @classmethod
+    def build(cls, meta_data: Dict[str, Any]) -> 'MetaIndex':
+        """Строит индекс по словарю meta данных"""
+        index = cls()
+        for graph_name, graph_data in meta_data.items():
+            index.add(graph_name, graph_data)
+        index.flush()
+        return index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def dead_rows(self) -> int:
+        """Количество строк, оставшихся от удалённых графов"""
+        return len(self.names) - len(self.rows)
+
+    def add(self, graph_name: str, graph_data: Dict[str, Any]):
+        """Добавляет граф в индекс (существующая запись заменяется)"""
+        if graph_name in self.rows:
+            self.remove(graph_name)
+
+        row = len(self.names)
+        self.names.append(graph_name)
+        self.rows[graph_name] = row
+
+        if type(graph_data) is MetaRecord and graph_data.extra is None:
+            # Компактная запись: поля и маски тегов читаются напрямую, без сборки словарей
+            author = graph_data.author
+            size = graph_data.size
+            self._pending_masks.setdefault((graph_data.known or 0, graph_data.values), []).append(row)
+        else:
+            author = graph_data.get('author')
+            size = graph_data.get('size')
+            graph_properties = graph_data.get('properties') or {}
+            signature = tuple((tag, graph_properties[tag]) for tag in TAG_NAMES
+                              if graph_properties.get(tag) is not None)
+            self._pending_tags.setdefault(signature, []).append(row)
+
+        self.row_authors.append(author)
+        self._pending_authors.setdefault(author, []).append(row)
+        self._pending_sizes.setdefault(size, []).append(row)
+        for field, value in zip(NUMERIC_FIELDS, numeric_values(graph_data)):
+            if value is not None:
+                self.numeric[field].add(value, row)
+                self._pending_numeric[field].append(row)
+
+    def remove(self, graph_name: str) -> bool:
+        """Убирает граф из индекса. Строка остаётся, но исключается из результатов"""
+        row = self.rows.pop(graph_name, None)
+        if row is None:
+            return False
+        self.flush()
+        self.names[row] = None
+        self.alive &= ~(1 << row)
+        return True
+
+    def flush(self):
+        """Сливает накопленные добавления в битовые множества"""
+        start, end = self._flushed_rows, len(self.names)
+        if start == end:
+            return
+        # remove() сливает буфер до удаления, поэтому все новые строки живы
+        self.alive |= ((1 << (end - start)) - 1) << start
+
+        for author, rows in self._pending_authors.items():
+            self.authors.add(author)
+            self.author_bits[author] = self.author_bits.get(author, 0) | _bits_from_rows(rows)
+        for size, rows in self._pending_sizes.items():
+            self.size_bits[size] = self.size_bits.get(size, 0) | _bits_from_rows(rows)
+
+        # Группы строк с одинаковым набором тегов раскладываются по парам (тег, значение)
+        tag_rows: Dict[Tuple[str, Any], List[int]] = {}
+        for (known, values), rows in self._pending_masks.items():
+            for tag, bit in TAG_BITS.items():
+                if known & bit:
+                    tag_rows.setdefault((tag, bool(values & bit)), []).extend(rows)
+        for signature, rows in self._pending_tags.items():
+            for key in signature:
+                tag_rows.setdefault(key, []).extend(rows)
+        for key, rows in tag_rows.items():
+            bits = _bits_from_rows(rows)
+            self.tag_bits[key] = self.tag_bits.get(key, 0) | bits
+            self.tag_known[key[0]] = self.tag_known.get(key[0], 0) | bits
+
+        for field, rows in self._pending_numeric.items():
+            if rows:
+                self.numeric_known[field] = self.numeric_known.get(field, 0) | _bits_from_rows(rows)
+            self.numeric[field].flush()
+
+        self._flushed_rows = end
+        self._pending_authors = {}
+        self._pending_sizes = {}
+        self._pending_masks = {}
+        self._pending_tags = {}
+        self._pending_numeric = {field: [] for field in NUMERIC_FIELDS}
+
+    def lookup(self, request: GraphRequest) -> int:
+        """Возвращает битовое множество строк, подходящих под запрос"""
+        self.flush()
+        result = self.alive
+
+        if request.author is not None:
+            if request.strict_search:
+                result &= self.author_bits.get(request.author, 0)
+            else:
+                authors = 0
+                for author in self.authors.matching(request.author):
+                    authors |= self.author_bits[author]
+                result &= authors
+
+        if request.size is not None:
+            result &= self.size_bits.get(request.size.value, 0)
+
+        if request.tags is not None:
+            for tag in TAG_NAMES:
+                if not result:
+                    break
+                request_value = getattr(request.tags, tag)
+                if request_value is None:
+                    continue
+                bits = self.tag_bits.get((tag, request_value), 0)
+                if not request.strict_search:
+                    # Нестрогий поиск: графы без значения тега тоже подходят
+                    bits |= self.alive & ~self.tag_known.get(tag, 0)
+                result &= bits
+
+        for field, value_range in request.ranges().items():
+            if not result:
+                break
+            bits = _bits_from_rows(self.numeric[field].rows_between(value_range.min, value_range.max))
+            if not request.strict_search:
+                # Нестрогий поиск: графы без значения свойства тоже подходят
+                bits |= self.alive & ~self.numeric_known.get(field, 0)
+            result &= bits
+
+        return result
+
+    def rows_of(self, bits: int) -> List[int]:
+        """Номера строк битового множества по возрастанию"""
+        if np is not None:
+            data = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+            return np.flatnonzero(np.unpackbits(data, bitorder='little')).tolist()
+        digits = bin(bits)[:1:-1]
+        result = []
+        row = digits.find('1')
+        while row != -1:
+            result.append(row)
+            row = digits.find('1', row + 1)
+        return result
+
+    def names_of(self, bits: int) -> List[str]:
+        """Переводит битовое множество в список имён графов в порядке добавления"""
+        names = self.names
+        digits = bin(bits)[:1:-1]
+        result = []
+        row = digits.find('1')
+        while row != -1:
+            result.append(names[row])
+            row = digits.find('1', row + 1)
+        return result
+
+    def search(self, request: GraphRequest) -> List[str]:
+        """Ищет графы по запросу"""
+        return self.names_of(self.lookup(request))
+
+    def search_expr(self, expr) -> List[str]:
+        """Ищет графы по выражению QueryExpr: AND/OR/NOT - операции над битовыми множествами"""
+        self.flush()
+        return self.names_of(expr.evaluate(self.lookup, self.alive))
+
+    def page(self, request: GraphRequest, start: int, limit: int) -> Tuple[List[str], Optional[int], int]:
+        """
+        Страница результатов: не больше limit имён, начиная со строки start.
+        Возвращает имена, строку, с которой продолжать (None, если совпадений больше нет),
+        и общее число совпадений
+        """
+        bits = self.lookup(request)
+        names, next_row = self._page_of(bits, start, limit)
+        return names, next_row, bits.bit_count()
+
+    def page_with_facets(self, request: GraphRequest, start: int, limit: int,
+                         top_authors: int = 10) -> Tuple[List[str], Optional[int], SearchFacets]:
+        """Страница результатов и счётчики фасетов по одному поиску в индексе"""
+        bits = self.lookup(request)
+        names, next_row = self._page_of(bits, start, limit)
+        return names, next_row, self._facets_of(bits, top_authors, with_names=False)
+
+    def _page_of(self, bits: int, start: int, limit: int) -> Tuple[List[str], Optional[int]]:
+        names = self.names
+        result = []
+        last = start - 1
+
+        rest = bits >> start
+        row = start
+        while rest and len(result) < limit:
+            block = rest & PAGE_BLOCK_MASK
+            if not block:
+                # Перепрыгиваем сразу к следующему совпадению
+                skip = (rest & -rest).bit_length() - 1
+                rest >>= skip
+                row += skip
+                continue
+            digits = bin(block)[:1:-1]
+            offset = digits.find('1')
+            while offset != -1 and len(result) < limit:
+                last = row + offset
+                result.append(names[last])
+                offset = digits.find('1', offset + 1)
+            rest >>= PAGE_BLOCK
+            row += PAGE_BLOCK
+
+        next_row = last + 1 if result and bits >> (last + 1) else None
+        return result, next_row
+
+    def facets(self, request: GraphRequest, top_authors: int = 10, with_names: bool = True) -> SearchFacets:
+        """
+        Ищет графы и считает совпадения по каждому размеру, значению тега и автору.
+        with_names=False - только счётчики, без списка имён
+        """
+        return self._facets_of(self.lookup(request), top_authors, with_names)
+
+    def _facets_of(self, bits: int, top_authors: int, with_names: bool) -> SearchFacets:
+        """
+        Счётчики - popcount пересечения результата с битовыми множествами индекса.
+        Авторов, если их много, а найдено мало, дешевле посчитать обходом найденных строк
+        """
+        total = bits.bit_count()
+        result = SearchFacets(names=self.names_of(bits) if with_names else [], total=total)
+
+        for size, size_bits in self.size_bits.items():
+            count = (bits & size_bits).bit_count()
+            if count:
+                result.sizes[size] = count
+
+        for tag in TAG_NAMES:
+            result.tags[tag] = {value: (bits & self.tag_bits.get((tag, value), 0)).bit_count()
+                                for value in (True, False)}
+
+        if total * AUTHOR_ROW_COST < len(self.author_bits) * (len(self.names) >> 6):
+            counts = Counter(map(self.row_authors.__getitem__, self.rows_of(bits)))
+        else:
+            counts = {author: (bits & author_bits).bit_count() for author, author_bits in self.author_bits.items()}
+        authors = [(author, count) for author, count in counts.items() if author and count]
+        result.authors = heapq.nsmallest(top_authors, authors, key=lambda item: (-item[1], item[0]))
+        return result
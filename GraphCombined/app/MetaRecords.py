@@ -0,0 +1,152 @@
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Iterator
+
+from .DataTypes import TAG_NAMES
+
+
+# Бит каждого тега в масках known/values
+TAG_BITS: Dict[str, int] = {tag: 1 << i for i, tag in enumerate(TAG_NAMES)}
+
+# Общие объекты int для всех возможных масок, чтобы записи не плодили копии
+_MASKS = tuple(range(1 << len(TAG_NAMES)))
+
+# Поля, которые хранятся в слотах записи; всё остальное уходит в extra
+_SLOT_FIELDS = ('author', 'size', 'vertices', 'edges')
+
+
+class MetaRecordTable:
+    """
+    Общая таблица интернирования для компактных записей: авторы превращаются
+    в целочисленные идентификаторы, строки размеров хранятся в одном экземпляре.
+    """
+
+    def __init__(self):
+        self.authors: List[Any] = []
+        self.author_ids: Dict[Any, int] = {}
+        self.sizes: Dict[str, str] = {}
+
+    def author_id(self, author: Any) -> int:
+        author_id = self.author_ids.get(author)
+        if author_id is None:
+            author_id = self.author_ids[author] = len(self.authors)
+            self.authors.append(author)
+        return author_id
+
+    def size(self, size: str) -> str:
+        return self.sizes.setdefault(size, size)
+
+
+class MetaRecord(Mapping):
+    """
+    Компактная запись meta данных графа.
+
+    Вместо словаря со вложенным словарём свойств хранит идентификатор автора,
+    интернированный размер и две маски тегов: known (значение задано) и values
+    (значение True). Поля, которые нельзя так упаковать, сохраняются в extra.
+    Ведёт себя как неизменяемый словарь, поэтому код, читающий meta данные
+    через get()/[], работает без изменений.
+    """
+
+    __slots__ = ('table', 'author_id', 'size', 'vertices', 'edges', 'known', 'values', 'extra')
+
+    def __init__(self, table: MetaRecordTable):
+        self.table = table
+        self.author_id: Optional[int] = None
+        self.size: Optional[str] = None
+        self.vertices: Optional[int] = None
+        self.edges: Optional[int] = None
+        self.known: Optional[int] = None
+        self.values = 0
+        self.extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], table: MetaRecordTable) -> 'MetaRecord':
+        """Упаковывает словарь meta данных графа"""
+        record = cls(table)
+        extra = {}
+
+        for key, value in data.items():
+            if key == 'author':
+                record.author_id = table.author_id(value)
+            elif key == 'size' and isinstance(value, str):
+                record.size = table.size(value)
+            elif key in ('vertices', 'edges') and type(value) is int:
+                setattr(record, key, value)
+            elif key == 'properties' and record._pack_properties(value):
+                continue
+            else:
+                extra[key] = value
+
+        if extra:
+            record.extra = extra
+        return record
+
+    def _pack_properties(self, properties: Any) -> bool:
+        """Упаковывает свойства в маски. False, если свойства не укладываются в маски"""
+        if not isinstance(properties, dict):
+            return False
+        known = values = 0
+        for tag, value in properties.items():
+            bit = TAG_BITS.get(tag)
+            if bit is None or type(value) is not bool:
+                return False
+            known |= bit
+            if value:
+                values |= bit
+        self.known = _MASKS[known]
+        self.values = _MASKS[values]
+        return True
+
+    @property
+    def author(self) -> Any:
+        return None if self.author_id is None else self.table.authors[self.author_id]
+
+    @property
+    def properties(self) -> Dict[str, bool]:
+        """Словарь свойств в исходном виде"""
+        known, values = self.known, self.values
+        return {tag: bool(values & bit) for tag, bit in TAG_BITS.items() if known & bit}
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'author' and self.author_id is not None:
+            return self.author
+        if key == 'properties' and self.known is not None:
+            return self.properties
+        if key in _SLOT_FIELDS[1:]:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self.author_id is not None:
+            yield 'author'
+        for key in _SLOT_FIELDS[1:]:
+            if getattr(self, key) is not None:
+                yield key
+        if self.known is not None:
+            yield 'properties'
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, MetaRecord):
+            return (self.author == other.author and self.size == other.size and
+                    self.vertices == other.vertices and self.edges == other.edges and
+                    self.known == other.known and self.values == other.values and
+                    self.extra == other.extra)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MetaRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Возвращает обычный словарь meta данных"""
+        return dict(self.items())
@@ -0,0 +1,387 @@
+"""
+Двоичный снимок загруженных meta данных для быстрого запуска.
+
+Файл снимка:
+    MAGIC (8 байт) | длина заголовка (uint64, little-endian) | заголовок JSON | массивы
+
+Заголовок хранит версию meta, таблицы авторов и размеров, записи с полями,
+которые не укладываются в колонки, и описание массивов (dtype, shape, смещение).
+Массивы выровнены по 64 байтам и открываются через mmap без копирования
+и разбора: имена графов - байтовый блок UTF-8 со смещениями, остальные
+поля - колонки по строкам в порядке meta данных.
+"""
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    # Без numpy снимки не пишутся и не читаются, meta загружается из JSON
+    np = None
+
+from .MetaIndex import TAG_NAMES
+from .MetaRecords import MetaRecord, MetaRecordTable, TAG_BITS, _MASKS
+from .RangeIndex import numeric_value
+
+
+MAGIC = b"GSNAP\x00\x01\x00"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Флаги присутствия полей записи в колонке present
+HAS_AUTHOR = 1
+HAS_SIZE = 2
+
+# Значение колонок vertices/edges, когда поле не задано целым числом
+MISSING_INT = -(1 << 63)
+
+
+class SnapshotError(ValueError):
+    """Файл снимка повреждён, несовместим или устарел"""
+
+
+class StringTable(Sequence):
+    """
+    Неизменяемый список строк поверх блока UTF-8 и массива смещений.
+    При первом обращении блок копируется в bytes (или str, если он ASCII), а смещения - в список
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self._data: Optional[Tuple[Union[bytes, str], List[int]]] = None
+
+    def _materialize(self) -> Tuple[Union[bytes, str], List[int]]:
+        if self._data is None:
+            data = bytes(self.blob)
+            if data.isascii():
+                # Для ASCII смещения в байтах совпадают со смещениями в символах
+                data = data.decode('ascii')
+            self._data = (data, self.offsets.tolist())
+        return self._data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        data, offsets = self._materialize()
+        value = data[offsets[row]:offsets[row + 1]]
+        return value if isinstance(value, str) else value.decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        data, offsets = self._materialize()
+        if isinstance(data, str):
+            for start, end in zip(offsets, offsets[1:]):
+                yield data[start:end]
+        else:
+            for start, end in zip(offsets, offsets[1:]):
+                yield data[start:end].decode('utf-8')
+
+
+class SnapshotMeta(Mapping):
+    """
+    Meta данные снимка как неизменяемый словарь {имя: MetaRecord}.
+    Записи собираются из колонок при обращении, словарь имён строится при первом поиске по имени
+    """
+
+    def __init__(self, snapshot: 'MetaSnapshot'):
+        self.snapshot = snapshot
+        self._rows: Optional[Dict[str, int]] = None
+
+    @property
+    def rows(self) -> Dict[str, int]:
+        if self._rows is None:
+            self._rows = {name: row for row, name in enumerate(self.snapshot.names)}
+        return self._rows
+
+    def __len__(self) -> int:
+        return self.snapshot.count
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot.names)
+
+    def __contains__(self, graph_name: Any) -> bool:
+        return graph_name in self.rows
+
+    def __getitem__(self, graph_name: str) -> MetaRecord:
+        return self.snapshot.record(self.rows[graph_name])
+
+    def items(self) -> Iterator[Tuple[str, MetaRecord]]:
+        record = self.snapshot.record
+        return ((name, record(row)) for row, name in enumerate(self.snapshot.names))
+
+    def values(self) -> Iterator[MetaRecord]:
+        record = self.snapshot.record
+        return (record(row) for row in range(self.snapshot.count))
+
+
+class MetaSnapshot:
+    """Открытый через mmap снимок meta данных"""
+
+    def __init__(self, header: Dict[str, Any], arrays: Dict[str, Any], buffer: Optional[mmap.mmap] = None):
+        self.header = header
+        self.arrays = arrays
+        self.buffer = buffer
+
+        self.count: int = header['count']
+        self.version: Optional[str] = header.get('version')
+        self.source: Optional[str] = header.get('source')
+        self.authors: List[Any] = header['authors']
+        self.sizes: List[Any] = header['sizes']
+        self.extra: Dict[int, Dict[str, Any]] = {int(row): extra for row, extra in header['extra'].items()}
+
+        self.names = StringTable(arrays['names'], arrays['name_offsets'])
+        self.present = arrays['present']
+        self.author_ids = arrays['author_ids']
+        self.size_codes = arrays['size_codes']
+        self.vertices = arrays['vertices']
+        self.edges = arrays['edges']
+        self.known = arrays['known']
+        self.values = arrays['values']
+
+        self.table = MetaRecordTable()
+        self.table.authors = list(self.authors)
+        self.table.author_ids = {author: author_id for author_id, author in enumerate(self.authors)}
+        self.table.sizes = {size: size for size in self.sizes if isinstance(size, str)}
+        self.meta_data = SnapshotMeta(self)
+
+    # ========== ЗАПИСЬ ==========
+
+    @staticmethod
+    def write(path: Union[str, Path], items: Iterable[Tuple[str, Any]], version: Optional[str] = None,
+              source: Optional[str] = None) -> int:
+        """
+        Пишет снимок meta данных атомарной заменой файла.
+        items - пары (имя, запись) в порядке meta данных.
+        Возвращает размер файла
+        """
+        if np is None:
+            raise ImportError("Для снимков meta данных требуется numpy")
+
+        table = MetaRecordTable()
+        # Нулевые элементы таблиц - None: колоночный индекс получает их для записей без поля
+        authors: Dict[Any, int] = {None: 0}
+        sizes: Dict[Any, int] = {None: 0}
+        names: List[bytes] = []
+        present, author_ids, size_codes, vertices, edges, known, values = [], [], [], [], [], [], []
+        extra: Dict[str, Dict[str, Any]] = {}
+        # Записи с полями в extra: их числовые свойства считаются по записи, а не по колонкам
+        irregular: Dict[int, MetaRecord] = {}
+
+        for row, (graph_name, graph_data) in enumerate(items):
+            record = graph_data if isinstance(graph_data, MetaRecord) else MetaRecord.from_dict(graph_data, table)
+            names.append(graph_name.encode('utf-8'))
+
+            flags = 0
+            if record.author_id is not None:
+                flags |= HAS_AUTHOR
+            if record.size is not None:
+                flags |= HAS_SIZE
+            present.append(flags)
+            author_ids.append(authors.setdefault(record.author, len(authors)))
+            size_codes.append(sizes.setdefault(record.size, len(sizes)))
+            vertices.append(MISSING_INT if record.vertices is None else record.vertices)
+            edges.append(MISSING_INT if record.edges is None else record.edges)
+            known.append(-1 if record.known is None else record.known)
+            values.append(record.values)
+            if record.extra is not None:
+                extra[str(row)] = record.extra
+                irregular[row] = record
+
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in names], out=offsets[1:])
+        arrays = {
+            'names': np.frombuffer(b''.join(names), dtype=np.uint8),
+            'name_offsets': offsets,
+            'present': np.array(present, dtype=np.uint8),
+            'author_ids': np.array(author_ids, dtype=np.int32),
+            'size_codes': np.array(size_codes, dtype=np.int16),
+            'vertices': np.array(vertices, dtype=np.int64),
+            'edges': np.array(edges, dtype=np.int64),
+            'known': np.array(known, dtype=np.int16),
+            'values': np.array(values, dtype=np.uint16),
+        }
+        for field, column_values in _numeric_columns(arrays).items():
+            for row, record in irregular.items():
+                value = numeric_value(record, field)
+                column_values[row] = np.nan if value is None else value
+            order = np.argsort(column_values, kind='stable')
+            arrays[f'numeric_{field}'] = column_values
+            arrays[f'numeric_order_{field}'] = order
+
+        header: Dict[str, Any] = {
+            'format': FORMAT_VERSION,
+            'count': len(names),
+            'version': version,
+            'source': source,
+            'tags': list(TAG_NAMES),
+            'authors': list(authors),
+            'sizes': list(sizes),
+            'extra': extra,
+            'arrays': {},
+        }
+
+        # Смещения массивов зависят от длины заголовка: кодируем, пока длина не перестанет меняться
+        header_length = 0
+        while True:
+            offset = _align(len(MAGIC) + 8 + header_length)
+            for name, array in arrays.items():
+                header['arrays'][name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+                offset = _align(offset + array.nbytes)
+            header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+            header_bytes += b' ' * (_align(len(MAGIC) + 8 + len(header_bytes)) - len(MAGIC) - 8 - len(header_bytes))
+            if len(header_bytes) == header_length:
+                break
+            header_length = len(header_bytes)
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(MAGIC)
+                f.write(struct.pack('<Q', len(header_bytes)))
+                f.write(header_bytes)
+                for name, array in arrays.items():
+                    f.seek(header['arrays'][name]['offset'])
+                    f.write(array.tobytes())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return os.path.getsize(path)
+
+    # ========== ЧТЕНИЕ ==========
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> 'MetaSnapshot':
+        """
+        Открывает снимок через mmap. Массивы - представления поверх отображённого файла.
+        Raises:
+            SnapshotError: если файл повреждён или записан в другом формате
+            OSError: если файл не читается
+        """
+        if np is None:
+            raise ImportError("Для снимков meta данных требуется numpy")
+
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(MAGIC) + 8:
+                raise SnapshotError(f"Файл снимка {path} обрезан")
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if buffer[:len(MAGIC)] != MAGIC:
+            buffer.close()
+            raise SnapshotError(f"{path} не является снимком meta данных")
+        header_length, = struct.unpack_from('<Q', buffer, len(MAGIC))
+        try:
+            header = json.loads(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length])
+            if header.get('format') != FORMAT_VERSION or header.get('tags') != list(TAG_NAMES):
+                raise SnapshotError(f"Снимок {path} записан в другом формате")
+
+            arrays = {}
+            for name, spec in header['arrays'].items():
+                dtype = np.dtype(spec['dtype'])
+                count = int(np.prod(spec['shape']))
+                if spec['offset'] + count * dtype.itemsize > size:
+                    raise SnapshotError(f"Файл снимка {path} обрезан")
+                arrays[name] = np.frombuffer(buffer, dtype=dtype, count=count,
+                                             offset=spec['offset']).reshape(spec['shape'])
+            return cls(header, arrays, buffer)
+        except (ValueError, KeyError, TypeError) as e:
+            if isinstance(e, SnapshotError):
+                raise
+            raise SnapshotError(f"Снимок {path} повреждён: {e}")
+
+    def record(self, row: int) -> MetaRecord:
+        """Собирает компактную запись строки row"""
+        record = MetaRecord(self.table)
+        flags = self.present[row]
+        if flags & HAS_AUTHOR:
+            record.author_id = int(self.author_ids[row])
+        if flags & HAS_SIZE:
+            record.size = self.sizes[self.size_codes[row]]
+        vertices = self.vertices[row]
+        if vertices != MISSING_INT:
+            record.vertices = int(vertices)
+        edges = self.edges[row]
+        if edges != MISSING_INT:
+            record.edges = int(edges)
+        known = int(self.known[row])
+        if known >= 0:
+            record.known = _MASKS[known]
+            record.values = _MASKS[int(self.values[row])]
+        record.extra = self.extra.get(row)
+        return record
+
+    def tag_columns(self):
+        """Колонки тегов для ColumnarMetaStore: int8, -1 нет значения, 0 False, 1 True"""
+        columns = np.empty((len(TAG_NAMES), self.count), dtype=np.int8)
+        known = self.known.astype(np.int32)
+        values = self.values.astype(np.int32)
+        has_properties = known >= 0
+        for column, tag in enumerate(TAG_NAMES):
+            bit = TAG_BITS[tag]
+            columns[column] = np.where(has_properties & (known & bit != 0), (values & bit) != 0, -1)
+        # Свойства, не уложившиеся в маски, лежат в extra и кодируются как в колоночном индексе
+        for row, extra in self.extra.items():
+            properties = extra.get('properties')
+            if isinstance(properties, dict):
+                for column, tag in enumerate(TAG_NAMES):
+                    value = properties.get(tag)
+                    columns[column, row] = -1 if value is None else int(bool(value))
+        return columns
+
+    def author_counts(self) -> Dict[str, int]:
+        """Число графов каждого автора, как у AuthorCompletions.build"""
+        has_author = (self.present & HAS_AUTHOR) != 0
+        counts = np.bincount(self.author_ids[has_author], minlength=len(self.authors))
+        return {author: int(counts[author_id]) for author_id, author in enumerate(self.authors)
+                if author and counts[author_id]}
+
+    def close(self):
+        self.arrays = {}
+        if self.buffer is not None:
+            try:
+                self.buffer.close()
+            except BufferError:
+                # На массивы ещё есть ссылки - отображение закроется вместе с ними
+                pass
+            self.buffer = None
+
+
+def _numeric_columns(arrays: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Колонки числовых свойств (float64, NaN - нет значения) по колонкам записей.
+    Плотность считается так же, как numeric_value, но сразу для всех строк
+    """
+    vertices = np.where(arrays['vertices'] == MISSING_INT, np.nan, arrays['vertices'].astype(np.float64))
+    edges = np.where(arrays['edges'] == MISSING_INT, np.nan, arrays['edges'].astype(np.float64))
+
+    bit = TAG_BITS['directed']
+    known = arrays['known'].astype(np.int32)
+    directed = (known >= 0) & (known & bit != 0) & (arrays['values'].astype(np.int32) & bit != 0)
+    possible = vertices * (vertices - 1)
+    possible = np.where(directed, possible, possible / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = np.where(vertices < 2, 0.0, edges / possible)
+    density[np.isnan(vertices) | np.isnan(edges)] = np.nan
+    return {'vertices': vertices, 'edges': edges, 'density': density}
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
@@ -0,0 +1,156 @@
+import codecs
+import json
+import re
+from typing import Iterable, Iterator, Tuple, Any
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+# Строки целиком, незакрытая кавычка и скобки: по ним ищется конец составного значения
+_VALUE_TOKENS = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["{}\[\]]')
+# Конец скалярного значения (числа, true, false, null)
+_SCALAR_END = re.compile(r'[,}\]\s]')
+
+
+def _skip_whitespace(buffer: str, pos: int) -> int:
+    while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def iter_meta_entries(chunks: Iterable[bytes]) -> Iterator[Tuple[str, Any]]:
+    """
+    Потоково разбирает meta файл вида {"имя": {...}, ...} по одной записи.
+
+    Байты поступают кусками (ответ requests.iter_content или чтение файла),
+    в памяти держится только ещё не разобранный хвост. Каждая пара (имя, данные)
+    отдаётся сразу после разбора, поэтому записи можно индексировать по мере загрузки.
+
+    Raises:
+        json.JSONDecodeError: если документ некорректен или оборван
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    finished = False
+
+    def more(at_least: int = 0) -> bool:
+        """
+        Дочитывает в буфер следующий кусок, а если задан at_least - куски общей длиной
+        не меньше at_least символов. False, если данные кончились
+        """
+        nonlocal buffer, pos, finished
+        if finished:
+            return False
+        parts = [buffer[pos:]]
+        read = 0
+        while True:
+            chunk = next(chunks, None)
+            if chunk is None:
+                finished = True
+                parts.append(decoder.decode(b'', final=True))
+                break
+            text = decoder.decode(chunk)
+            parts.append(text)
+            read += len(text)
+            if read >= at_least:
+                break
+        buffer = ''.join(parts)
+        pos = 0
+        return True
+
+    def expect_char() -> str:
+        """Возвращает следующий значащий символ, дочитывая данные при необходимости"""
+        nonlocal pos
+        while True:
+            pos = _skip_whitespace(buffer, pos)
+            if pos < len(buffer):
+                return buffer[pos]
+            if not more():
+                raise json.JSONDecodeError("Неожиданный конец meta файла", buffer, pos)
+
+    def read_value():
+        """
+        Дочитывает данные, пока значение с позиции pos не закроется в буфере или данные не кончатся.
+        Просматриваются только строки и скобки, и каждый кусок просматривается один раз.
+        Буфер растёт не меньше чем вдвое за раз, поэтому даже незакрытое значение
+        до конца файла копируется линейное число раз
+        """
+        scalar = buffer[pos] not in '{["'
+        depth = 0
+        scanned = 0
+        while True:
+            if scalar:
+                if _SCALAR_END.search(buffer, pos + scanned):
+                    return
+                scanned = len(buffer) - pos
+            else:
+                for match in _VALUE_TOKENS.finditer(buffer, pos + scanned):
+                    token = match.group()
+                    if token == '"':
+                        # Строка продолжается в следующем куске - просмотрим её ещё раз целиком
+                        break
+                    scanned = match.end() - pos
+                    if token[0] == '"':
+                        if depth == 0:
+                            return
+                    elif token in '{[':
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth <= 0:
+                            return
+                else:
+                    scanned = len(buffer) - pos
+            if not more(len(buffer) - pos):
+                return
+
+    def decode_value() -> Any:
+        """
+        Разбирает JSON значение, дочитывая данные, пока оно не станет полным.
+        Если полностью прочитанное значение не разбирается, документ некорректен
+        """
+        nonlocal pos
+        if buffer[pos] not in '{["' and not _SCALAR_END.search(buffer, pos):
+            # Число в конце буфера может продолжиться в следующем куске
+            read_value()
+        try:
+            value, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            read_value()
+            value, end = _decoder.raw_decode(buffer, pos)
+        pos = end
+        return value
+
+    if expect_char() != '{':
+        raise json.JSONDecodeError("Meta файл должен быть JSON объектом", buffer, pos)
+    pos += 1
+
+    if expect_char() == '}':
+        return
+
+    while True:
+        if expect_char() != '"':
+            raise json.JSONDecodeError("Ожидалось имя графа", buffer, pos)
+        graph_name = decode_value()
+
+        if expect_char() != ':':
+            raise json.JSONDecodeError("Ожидалось ':'", buffer, pos)
+        pos += 1
+        expect_char()
+        graph_data = decode_value()
+
+        yield graph_name, graph_data
+
+        separator = expect_char()
+        pos += 1
+        if separator == '}':
+            while True:
+                if _skip_whitespace(buffer, pos) < len(buffer):
+                    raise json.JSONDecodeError("Лишние данные после meta объекта", buffer, pos)
+                if not more():
+                    return
+        if separator != ',':
+            raise json.JSONDecodeError("Ожидалось ',' или '}'", buffer, pos - 1)
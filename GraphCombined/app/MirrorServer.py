@@ -0,0 +1,393 @@
+"""
+Локальное зеркало репозитория графов.
+
+Один процесс в локальной сети синхронизирует meta файл с репозиторием
+через GraphService (условный GET или дельта), скачивает файлы графов
+в своё хранилище при первом запросе и раздаёт их клиентам:
+
+    GET /meta.json            - meta файл с ETag/Last-Modified, 304 на условные запросы
+    GET /data/<имя>.json      - файл графа с ETag и Cache-Control
+    GET /delta?since=<версия> - изменения meta с указанной версии:
+                                200 {"version", "added", "changed", "removed"},
+                                304 если версия актуальна, 404 если версия неизвестна
+
+Версия meta - sha1 раздаваемого файла, та же, что вычисляет GraphService
+клиента при полной загрузке, поэтому после первой загрузки клиенты сразу
+переходят на дельты. Запуск: python mirror.py [--port 8765]
+"""
+import argparse
+import email.utils
+import hashlib
+import http.server
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple, Set, NamedTuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import requests
+
+from .GraphService import GraphService
+from .GraphStore import GraphStore
+from .MetaRecords import MetaRecord
+from .config import CONFIG
+
+
+class MetaChange(NamedTuple):
+    """Переход meta данных от версии base к версии version"""
+    base: str
+    version: str
+    added: Set[str]
+    changed: Set[str]
+    removed: Set[str]
+
+
+class MetaHistory:
+    """Журнал последних переходов между версиями meta для ответов дельта-синхронизации"""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.changes: 'deque[MetaChange]' = deque(maxlen=limit or CONFIG.MIRROR_DELTA_HISTORY)
+
+    def record(self, change: MetaChange):
+        self.changes.append(change)
+
+    def changes_since(self, version: str) -> Optional[Tuple[Set[str], Set[str], Set[str]]]:
+        """
+        Суммарные изменения с версии version: (добавлено, изменено, удалено).
+        None, если версия уже вытеснена из журнала или никогда не раздавалась
+        """
+        changes = list(self.changes)
+        start = next((i for i, change in enumerate(changes) if change.base == version), None)
+        if start is None:
+            return None
+
+        # Для каждого затронутого графа: был ли он в версии version и есть ли он сейчас
+        existed: Dict[str, bool] = {}
+        present: Dict[str, bool] = {}
+        for change in changes[start:]:
+            for graph_name in change.removed:
+                existed.setdefault(graph_name, True)
+                present[graph_name] = False
+            for graph_name in change.added:
+                existed.setdefault(graph_name, False)
+                present[graph_name] = True
+            for graph_name in change.changed:
+                existed.setdefault(graph_name, True)
+                present[graph_name] = True
+
+        added, changed, removed = set(), set(), set()
+        for graph_name, is_present in present.items():
+            if is_present:
+                (changed if existed[graph_name] else added).add(graph_name)
+            elif existed[graph_name]:
+                removed.add(graph_name)
+        return added, changed, removed
+
+
+class GraphMirror:
+    """
+    Состояние зеркала: сервис с meta данными и хранилищем графов,
+    текущая раздаваемая версия meta и журнал версий
+    """
+
+    def __init__(self, service: GraphService, sync_interval: Optional[float] = None):
+        self.service = service
+        self.sync_interval = CONFIG.MIRROR_SYNC_INTERVAL if sync_interval is None else sync_interval
+        self.history = MetaHistory()
+
+        self.version: Optional[str] = None
+        self.meta_size = 0
+        self.last_modified = 0.0
+        # Снимок записей раздаваемой версии: с ним сравнивается следующая версия
+        self._records: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.version is not None
+
+    def start(self) -> bool:
+        """
+        Загружает meta из локального кэша, если он есть, и синхронизирует его с репозиторием.
+        Возвращает False, если meta данных нет ни в кэше, ни в репозитории
+        """
+        service = self.service
+        # Кэш читается вместе с журналом дельт и версией: иначе условный GET с новым ETag
+        # получит 304, и зеркало продолжит раздавать каталог без дописанных дельт
+        if service.meta_cache_path.exists():
+            service.load_meta_cache()
+        if not service.sync_meta() and not service.loaded:
+            return False
+        self._publish()
+
+        self._sync_thread = threading.Thread(target=self._sync_loop, daemon=True)
+        self._sync_thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        self.service.graph_store.save()
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"Ошибка синхронизации зеркала: {e}")
+
+    def sync(self) -> bool:
+        """Один цикл синхронизации: обновляет meta и сохраняет индекс хранилища графов"""
+        self.service.graph_store.save()
+        if not self.service.sync_meta():
+            return False
+        self._publish()
+        return True
+
+    @property
+    def meta_path(self):
+        """Раздаваемая копия meta файла: синхронизация сервиса подменяет кэш, не трогая её"""
+        cache_path = self.service.meta_cache_path
+        return cache_path.with_name(cache_path.name + ".mirror")
+
+    def _publish(self):
+        """Делает текущие meta данные сервиса раздаваемой версией и записывает переход в журнал"""
+        cache_path = self.service.meta_cache_path
+        temp_path = cache_path.with_name(cache_path.name + ".mirror.tmp")
+        digest = hashlib.sha1()
+        with open(temp_path, 'wb') as target:
+            for chunk in self.service.iter_meta_bytes():
+                digest.update(chunk)
+                target.write(chunk)
+        version = digest.hexdigest()
+        if version == self.version:
+            os.remove(temp_path)
+            return
+
+        records = self.service.copy_meta()
+        previous = self._records
+        added = {name for name in records if name not in previous}
+        changed = {name for name, data in records.items() if name in previous and previous[name] != data}
+        removed = {name for name in previous if name not in records}
+
+        with self._lock:
+            os.replace(temp_path, self.meta_path)
+            if self.version is not None:
+                self.history.record(MetaChange(self.version, version, added, changed, removed))
+                print(f"Зеркало: новая версия meta {version[:12]}: "
+                      f"+{len(added)} ~{len(changed)} -{len(removed)}")
+            else:
+                print(f"Зеркало: раздаётся meta версии {version[:12]}, графов: {len(records)}")
+            self.version = version
+            self.meta_size = os.path.getsize(self.meta_path)
+            self.last_modified = time.time() if previous else os.path.getmtime(cache_path)
+            self._records = records
+
+    def open_meta(self):
+        """Открывает раздаваемый meta файл. Возвращает (файл, версия, размер, время изменения)"""
+        with self._lock:
+            # Файл открывается под блокировкой: следующая публикация не затронет открытый дескриптор
+            return open(self.meta_path, 'rb'), self.version, self.meta_size, self.last_modified
+
+    def delta(self, since: str) -> Optional[Dict[str, Any]]:
+        """Тело ответа дельта-синхронизации или None, если версия since неизвестна"""
+        with self._lock:
+            version = self.version
+            changes = self.history.changes_since(since)
+            records = self._records
+        if changes is None:
+            return None
+        added, changed, removed = changes
+
+        def entries(names: Set[str]) -> Dict[str, Any]:
+            return {name: records[name].to_dict() if isinstance(records[name], MetaRecord) else records[name]
+                    for name in sorted(names)}
+
+        return {'version': version, 'added': entries(added), 'changed': entries(changed),
+                'removed': sorted(removed)}
+
+    def graph_content(self, graph_name: str) -> Optional[bytes]:
+        """Содержимое файла графа из хранилища зеркала или репозитория. None для неизвестного графа"""
+        if graph_name not in self._records:
+            return None
+        return self.service.fetch_graph(graph_name)
+
+
+class MirrorRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'GraphMirror'
+    mirror: GraphMirror
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"{self.address_string()} - {format % args}\n")
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head: bool = False):
+        if not self.mirror.ready:
+            self.send_error(503, explain="Meta данные ещё не загружены")
+            return
+
+        url = urlsplit(self.path)
+        path = unquote(url.path)
+        if path == '/meta.json':
+            self.send_meta(head)
+        elif path == '/delta':
+            self.send_delta(parse_qs(url.query).get('since', [''])[0], head)
+        elif path.startswith('/data/') and path.endswith('.json'):
+            self.send_graph(path[len('/data/'):-len('.json')], head)
+        else:
+            self.send_error(404)
+
+    def not_modified(self, etag: str, modified: Optional[float] = None) -> bool:
+        """Проверяет условные заголовки запроса. If-None-Match важнее If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if modified is None or not if_modified_since:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(modified) <= since
+
+    def send_body_headers(self, status: int, length: int, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(length))
+
+    def send_not_modified(self, etag: str, cache_control: str):
+        self.send_response(304)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+
+    def send_meta(self, head: bool):
+        meta_file, version, size, modified = self.mirror.open_meta()
+        with meta_file:
+            etag = f'"{version}"'
+            # Клиенты всегда перепроверяют meta: ответ 304 почти бесплатен
+            cache_control = 'no-cache'
+            if self.not_modified(etag, modified):
+                self.send_not_modified(etag, cache_control)
+                return
+            self.send_body_headers(200, size)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', email.utils.formatdate(modified, usegmt=True))
+            self.send_header('Cache-Control', cache_control)
+            self.end_headers()
+            if not head:
+                shutil.copyfileobj(meta_file, self.wfile, CONFIG.CHUNK_SIZE * 8)
+
+    def send_delta(self, since: str, head: bool):
+        if since == self.mirror.version:
+            self.send_not_modified(f'"{since}"', 'no-cache')
+            return
+        delta = self.mirror.delta(since) if since else None
+        if delta is None:
+            self.send_error(404, explain="Версия meta неизвестна зеркалу")
+            return
+        body = json.dumps(delta, ensure_ascii=False).encode('utf-8')
+        self.send_body_headers(200, len(body))
+        # Валидаторы meta файла той версии, к которой приводит дельта
+        self.send_header('ETag', f'"{delta["version"]}"')
+        self.send_header('Last-Modified', email.utils.formatdate(self.mirror.last_modified, usegmt=True))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def send_graph(self, graph_name: str, head: bool):
+        if not graph_name or '/' in graph_name:
+            self.send_error(404)
+            return
+        try:
+            content = self.mirror.graph_content(graph_name)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            self.send_error(404 if status == 404 else 502, explain=f"Ответ репозитория: {e}")
+            return
+        except (requests.exceptions.RequestException, OSError) as e:
+            self.send_error(502, explain=f"Репозиторий недоступен: {e}")
+            return
+        if content is None:
+            self.send_error(404, explain="Граф не найден в meta данных")
+            return
+
+        etag = '"%s"' % hashlib.sha256(content).hexdigest()
+        cache_control = f'max-age={CONFIG.MIRROR_GRAPH_MAX_AGE}'
+        if self.not_modified(etag):
+            self.send_not_modified(etag, cache_control)
+            return
+        self.send_body_headers(200, len(content))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        if not head:
+            self.wfile.write(content)
+
+
+class MirrorHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def create_server(mirror: GraphMirror, host: Optional[str] = None,
+                  port: Optional[int] = None) -> MirrorHTTPServer:
+    """HTTP сервер зеркала; порт 0 - любой свободный"""
+    handler = type('Handler', (MirrorRequestHandler,), {'mirror': mirror})
+    return MirrorHTTPServer((CONFIG.MIRROR_HOST if host is None else host,
+                             CONFIG.MIRROR_PORT if port is None else port), handler)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="mirror.py", description="Локальное зеркало репозитория графов")
+    parser.add_argument('--host', default=CONFIG.MIRROR_HOST, help="Адрес, на котором слушает зеркало")
+    parser.add_argument('--port', type=int, default=CONFIG.MIRROR_PORT, help="Порт зеркала")
+    parser.add_argument('--meta-url', help="Адрес meta файла в репозитории")
+    parser.add_argument('--repo-url', help="Адрес каталога с файлами графов в репозитории")
+    parser.add_argument('--delta-url', help="Адрес дельта-синхронизации вышестоящего зеркала")
+    parser.add_argument('--cache-dir', default=str(CONFIG.DOWNLOAD_DIR / "mirror"),
+                        help="Каталог кэша meta файла и хранилища графов")
+    parser.add_argument('--cache-max-bytes', type=int, help="Лимит хранилища графов в байтах")
+    parser.add_argument('--sync-interval', type=float, default=CONFIG.MIRROR_SYNC_INTERVAL,
+                        help="Период проверки обновлений meta, секунды")
+    args = parser.parse_args(argv)
+
+    service = GraphService(meta_url=args.meta_url, repo_url=args.repo_url, delta_url=args.delta_url,
+                           meta_cache_path=os.path.join(args.cache_dir, "meta.json"),
+                           graph_cache_dir=os.path.join(args.cache_dir, "graphs"))
+    if args.cache_max_bytes is not None:
+        service.graph_store = GraphStore(os.path.join(args.cache_dir, "graphs"), args.cache_max_bytes)
+
+    mirror = GraphMirror(service, args.sync_interval)
+    if not mirror.start():
+        print("Не удалось загрузить meta данные, зеркало не запущено")
+        return 1
+
+    server = create_server(mirror, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Зеркало запущено на http://{host}:{port}\n"
+          f"  REPO_URL       = http://<адрес>:{port}/data\n"
+          f"  META_FILE_URL  = http://<адрес>:{port}/meta.json\n"
+          f"  META_DELTA_URL = http://<адрес>:{port}/delta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nЗеркало остановлено")
+    finally:
+        server.server_close()
+        mirror.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Hashable, Tuple
+
+
+class QueryCache:
+    """
+    LRU кэш результатов поиска.
+
+    Ключ - канонический вид запроса (GraphRequest.cache_key), значение - кортеж имён.
+    При переполнении вытесняется запрос, к которому дольше всего не обращались.
+    Счётчики hits/misses позволяют подобрать размер кэша.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[str, ...]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[List[str]]:
+        """Возвращает копию закэшированного результата или None"""
+        with self._lock:
+            names = self._entries.get(key)
+            if names is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(names)
+
+    def put(self, key: Hashable, names: List[str]):
+        """Сохраняет результат запроса"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = tuple(names)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Сбрасывает результаты (счётчики сохраняются)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика кэша для подбора размера"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,190 @@
+import heapq
+from collections import Counter
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from .DataTypes import GraphRequest, SearchFacets
+from .MetaIndex import TAG_NAMES, _bits_from_rows
+from .RangeIndex import numeric_value
+
+
+GraphPredicate = Callable[[Dict[str, Any]], bool]
+
+
+def _accept_all(graph_data: Dict[str, Any]) -> bool:
+    return True
+
+
+def compile_request(request: GraphRequest) -> GraphPredicate:
+    """
+    Компилирует GraphRequest в функцию-предикат над записью meta данных.
+
+    Один раз на запрос определяется, какие поля ограничены и в каком режиме
+    (строгий или нестрогий), и по ним генерируется исходный код функции,
+    в которой остаются только нужные проверки, без обхода всех полей GraphTags
+    и без ветвлений по режиму для каждого графа.
+    Результат совпадает с GraphService._matches_request
+    """
+    if request.is_empty():
+        return _accept_all
+
+    strict = request.strict_search
+    constants: Dict[str, Any] = {'numeric_value': numeric_value}
+    lines: List[str] = ["def predicate(graph_data):"]
+
+    if request.author is not None:
+        if strict:
+            constants['author'] = request.author
+            lines.append("    if graph_data.get('author') != author: return False")
+        else:
+            constants['needle'] = request.author.lower()
+            lines.append("    graph_author = graph_data.get('author', '')")
+            lines.append("    if graph_author and needle not in graph_author.lower(): return False")
+
+    if request.size is not None:
+        constants['size'] = request.size.value
+        lines.append("    if graph_data.get('size') != size: return False")
+
+    if request.tags is not None:
+        constrained = [(tag, getattr(request.tags, tag)) for tag in TAG_NAMES
+                       if getattr(request.tags, tag) is not None]
+        if constrained:
+            lines.append("    properties = graph_data.get('properties') or {}")
+        for tag, value in constrained:
+            constants[f'tag_{tag}'] = value
+            if strict:
+                lines.append(f"    if properties.get({tag!r}) != tag_{tag}: return False")
+            else:
+                lines.append(f"    value = properties.get({tag!r})")
+                lines.append(f"    if value is not None and value != tag_{tag}: return False")
+
+    for field, value_range in request.ranges().items():
+        lines.append(f"    value = numeric_value(graph_data, {field!r})")
+        bounds = []
+        if value_range.min is not None:
+            constants[f'min_{field}'] = value_range.min
+            bounds.append(f"value < min_{field}")
+        if value_range.max is not None:
+            constants[f'max_{field}'] = value_range.max
+            bounds.append(f"value > max_{field}")
+        out_of_range = " or ".join(bounds)
+        if strict:
+            lines.append(f"    if value is None or {out_of_range}: return False")
+        else:
+            lines.append(f"    if value is not None and ({out_of_range}): return False")
+
+    lines.append("    return True")
+
+    exec(compile("\n".join(lines), "<compiled GraphRequest>", "exec"), constants)
+    return constants['predicate']
+
+
+def scan(meta_data: Dict[str, Any], request: GraphRequest) -> List[str]:
+    """Полный проход по meta данным с предикатом, скомпилированным один раз"""
+    predicate = compile_request(request)
+    return [graph_name for graph_name, graph_data in meta_data.items() if predicate(graph_data)]
+
+
+class ScanIndex:
+    """
+    Поиск без индекса (бэкенд "scan"): каждый запрос - полный проход по записям
+    с предикатом compile_request. Памяти сверх самих записей не требует,
+    изменения применяются мгновенно, зато запрос стоит O(N).
+    Интерфейс и нумерация строк совпадают с MetaIndex, поэтому курсоры
+    постраничного поиска работают так же
+    """
+
+    def __init__(self):
+        self.names: List[Optional[str]] = []
+        self.records: List[Optional[Dict[str, Any]]] = []
+        self.rows: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, meta_data: Dict[str, Any]) -> 'ScanIndex':
+        index = cls()
+        for graph_name, graph_data in meta_data.items():
+            index.add(graph_name, graph_data)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def dead_rows(self) -> int:
+        """Количество строк, оставшихся от удалённых графов"""
+        return len(self.names) - len(self.rows)
+
+    def add(self, graph_name: str, graph_data: Dict[str, Any]):
+        """Добавляет граф в конец (существующая запись заменяется)"""
+        if graph_name in self.rows:
+            self.remove(graph_name)
+        self.rows[graph_name] = len(self.names)
+        self.names.append(graph_name)
+        self.records.append(graph_data)
+
+    def remove(self, graph_name: str) -> bool:
+        row = self.rows.pop(graph_name, None)
+        if row is None:
+            return False
+        self.names[row] = None
+        self.records[row] = None
+        return True
+
+    def flush(self):
+        """Буфера нет: записи доступны поиску сразу после add"""
+
+    def matching_rows(self, request: GraphRequest) -> List[int]:
+        """Строки живых графов, подходящих под запрос"""
+        predicate = compile_request(request)
+        return [row for row, graph_data in enumerate(self.records)
+                if graph_data is not None and predicate(graph_data)]
+
+    def search(self, request: GraphRequest) -> List[str]:
+        names = self.names
+        return [names[row] for row in self.matching_rows(request)]
+
+    def search_expr(self, expr) -> List[str]:
+        """Ищет по выражению QueryExpr: множества строк листьев собираются в битовые множества"""
+        universe = _bits_from_rows([row for row, graph_data in enumerate(self.records) if graph_data is not None])
+        bits = expr.evaluate(lambda request: _bits_from_rows(self.matching_rows(request)), universe)
+        names = self.names
+        return [names[row] for row, bit in enumerate(bin(bits)[:1:-1]) if bit == '1']
+
+    def page(self, request: GraphRequest, start: int, limit: int) -> Tuple[List[str], Optional[int], int]:
+        """Страница результатов: не больше limit имён, начиная со строки start (см. MetaIndex.page)"""
+        rows = self.matching_rows(request)
+        names, next_row = self._page_of(rows, start, limit)
+        return names, next_row, len(rows)
+
+    def page_with_facets(self, request: GraphRequest, start: int, limit: int,
+                         top_authors: int = 10) -> Tuple[List[str], Optional[int], SearchFacets]:
+        rows = self.matching_rows(request)
+        names, next_row = self._page_of(rows, start, limit)
+        return names, next_row, self._facets_of(rows, top_authors, with_names=False)
+
+    def _page_of(self, rows: List[int], start: int, limit: int) -> Tuple[List[str], Optional[int]]:
+        rows = [row for row in rows if row >= start]
+        names = self.names
+        next_row = rows[limit - 1] + 1 if len(rows) > limit else None
+        return [names[row] for row in rows[:limit]], next_row
+
+    def facets(self, request: GraphRequest, top_authors: int = 10, with_names: bool = True) -> SearchFacets:
+        """Ищет графы и считает совпадения по каждому размеру, значению тега и автору"""
+        return self._facets_of(self.matching_rows(request), top_authors, with_names)
+
+    def _facets_of(self, rows: List[int], top_authors: int, with_names: bool) -> SearchFacets:
+        names = self.names
+        result = SearchFacets(names=[names[row] for row in rows] if with_names else [], total=len(rows))
+        records = [self.records[row] for row in rows]
+
+        result.sizes = dict(Counter(graph_data.get('size') for graph_data in records))
+        tag_counts = Counter((tag, bool(value))
+                             for graph_data in records
+                             for tag, value in (graph_data.get('properties') or {}).items()
+                             if value in (True, False))
+        for tag in TAG_NAMES:
+            result.tags[tag] = {value: tag_counts[(tag, value)] for value in (True, False)}
+
+        authors = [(author, count) for author, count in
+                   Counter(graph_data.get('author') for graph_data in records).items() if author]
+        result.authors = heapq.nsmallest(top_authors, authors, key=lambda item: (-item[1], item[0]))
+        return result
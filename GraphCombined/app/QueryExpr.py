@@ -0,0 +1,303 @@
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Tuple, Any, Callable, Optional
+
+from .DataTypes import GraphRequest, GraphTags, GraphSize, NumericRange
+from .MetaIndex import TAG_NAMES
+from .RangeIndex import NUMERIC_FIELDS
+
+
+class QuerySyntaxError(ValueError):
+    """Ошибка в тексте поискового выражения"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (позиция {position + 1})")
+        self.position = position
+
+
+class QueryExpr(ABC):
+    """
+    Узел поискового выражения.
+
+    Выражение вычисляется алгеброй множеств строк индекса: листья (Term) -
+    обычные GraphRequest, которые индекс умеет искать, AND/OR/NOT -
+    пересечение, объединение и дополнение их битовых множеств (или масок).
+    """
+
+    @abstractmethod
+    def evaluate(self, lookup: Callable[[GraphRequest], Any], universe: Any) -> Any:
+        """
+        Вычисляет множество строк выражения
+        Args:
+            lookup: Множество строк индекса для GraphRequest
+            universe: Множество всех живых строк, нужно для NOT
+        """
+
+    @abstractmethod
+    def key(self) -> Tuple:
+        """Хешируемый вид выражения для кэша поиска"""
+
+
+@dataclass
+class Term(QueryExpr):
+    request: GraphRequest
+
+    def evaluate(self, lookup, universe):
+        return lookup(self.request)
+
+    def key(self) -> Tuple:
+        return ('term', self.request.cache_key())
+
+
+@dataclass
+class And(QueryExpr):
+    children: List[QueryExpr]
+
+    def evaluate(self, lookup, universe):
+        result = universe
+        for child in self.children:
+            result = result & child.evaluate(lookup, universe)
+        return result
+
+    def key(self) -> Tuple:
+        return ('and',) + tuple(child.key() for child in self.children)
+
+
+@dataclass
+class Or(QueryExpr):
+    children: List[QueryExpr]
+
+    def evaluate(self, lookup, universe):
+        result = self.children[0].evaluate(lookup, universe)
+        for child in self.children[1:]:
+            result = result | child.evaluate(lookup, universe)
+        return result
+
+    def key(self) -> Tuple:
+        return ('or',) + tuple(child.key() for child in self.children)
+
+
+@dataclass
+class Not(QueryExpr):
+    child: QueryExpr
+
+    def evaluate(self, lookup, universe):
+        return universe & ~self.child.evaluate(lookup, universe)
+
+    def key(self) -> Tuple:
+        return ('not', self.child.key())
+
+
+# ========== ТЕКСТОВЫЙ СИНТАКСИС ==========
+
+_TOKEN = re.compile(r'''
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op><=|>=|!=|[()=<>~{},])
+      | (?P<word>[^\s()=<>~{},!"']+)
+    )''', re.VERBOSE)
+
+_BOOLEANS = {'true': True, 'yes': True, 'да': True, 'false': False, 'no': False, 'нет': False}
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any, int]]:
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        if text[pos:].strip() == '':
+            break
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            rest = text[pos:].lstrip()
+            raise QuerySyntaxError(f"Непонятный символ {rest[0]!r}", len(text) - len(rest))
+        kind = match.lastgroup
+        value = match.group(kind)
+        start = match.start(kind)
+        if kind == 'number':
+            value = float(value) if any(c in value for c in '.eE') else int(value)
+        elif kind == 'string':
+            value = value[1:-1]
+        tokens.append((kind, value, start))
+        pos = match.end()
+    tokens.append(('end', None, len(text)))
+    return tokens
+
+
+class _Parser:
+    """
+    Рекурсивный спуск по грамматике:
+        expr      := and_expr (OR and_expr)*
+        and_expr  := not_expr (AND not_expr)*
+        not_expr  := NOT not_expr | atom
+        atom      := '(' expr ')' | predicate
+        predicate := TAG ['=' BOOL]
+                   | size '=' SIZE | size in '{' SIZE (',' SIZE)* '}'
+                   | author '=' STRING | author '~' STRING
+                   | (vertices|edges|density) ('<'|'<='|'>'|'>='|'='|'!=') NUMBER
+    """
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    @property
+    def current(self) -> Tuple[str, Any, int]:
+        return self.tokens[self.index]
+
+    def advance(self) -> Tuple[str, Any, int]:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def error(self, message: str) -> QuerySyntaxError:
+        return QuerySyntaxError(message, self.current[2])
+
+    def keyword(self, *words: str) -> bool:
+        kind, value, _ = self.current
+        return kind == 'word' and value.lower() in words
+
+    def expect_op(self, op: str):
+        kind, value, _ = self.current
+        if kind != 'op' or value != op:
+            raise self.error(f"Ожидалось '{op}'")
+        self.advance()
+
+    def parse(self) -> QueryExpr:
+        if self.current[0] == 'end':
+            raise self.error("Пустое выражение")
+        expr = self.parse_or()
+        if self.current[0] != 'end':
+            raise self.error("Лишний текст в конце выражения")
+        return expr
+
+    def parse_or(self) -> QueryExpr:
+        children = [self.parse_and()]
+        while self.keyword('or', 'или'):
+            self.advance()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self) -> QueryExpr:
+        children = [self.parse_not()]
+        while self.keyword('and', 'и'):
+            self.advance()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_not(self) -> QueryExpr:
+        if self.keyword('not', 'не'):
+            self.advance()
+            return Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> QueryExpr:
+        kind, value, _ = self.current
+        if kind == 'op' and value == '(':
+            self.advance()
+            expr = self.parse_or()
+            self.expect_op(')')
+            return expr
+        if kind != 'word':
+            raise self.error("Ожидалось свойство графа или '('")
+
+        name = value.lower()
+        if name in TAG_NAMES:
+            self.advance()
+            return self.parse_tag(name)
+        if name == 'size':
+            self.advance()
+            return self.parse_size()
+        if name == 'author':
+            self.advance()
+            return self.parse_author()
+        if name in NUMERIC_FIELDS:
+            self.advance()
+            return self.parse_numeric(name)
+        raise self.error(f"Неизвестное свойство '{value}'")
+
+    def parse_tag(self, tag: str) -> QueryExpr:
+        value = True
+        if self.current[:2] == ('op', '='):
+            self.advance()
+            kind, word, _ = self.current
+            if kind != 'word' or word.lower() not in _BOOLEANS:
+                raise self.error("Ожидалось true или false")
+            self.advance()
+            value = _BOOLEANS[word.lower()]
+        return Term(GraphRequest(tags=GraphTags(**{tag: value})))
+
+    def parse_size_value(self) -> GraphSize:
+        kind, word, _ = self.current
+        try:
+            size = GraphSize(str(word).lower())
+        except ValueError:
+            raise self.error(f"Неизвестный размер: ожидалось одно из {', '.join(s.value for s in GraphSize)}")
+        self.advance()
+        return size
+
+    def parse_size(self) -> QueryExpr:
+        if self.keyword('in'):
+            self.advance()
+            self.expect_op('{')
+            sizes = [self.parse_size_value()]
+            while self.current[:2] == ('op', ','):
+                self.advance()
+                sizes.append(self.parse_size_value())
+            self.expect_op('}')
+            terms = [Term(GraphRequest(size=size)) for size in sizes]
+            return terms[0] if len(terms) == 1 else Or(terms)
+        self.expect_op('=')
+        return Term(GraphRequest(size=self.parse_size_value()))
+
+    def parse_author(self) -> QueryExpr:
+        kind, op, _ = self.current
+        if kind != 'op' or op not in ('=', '~'):
+            raise self.error("Ожидалось '=' (точное совпадение) или '~' (подстрока)")
+        self.advance()
+        kind, author, _ = self.current
+        if kind not in ('string', 'word'):
+            raise self.error("Ожидалось имя автора")
+        self.advance()
+        return Term(GraphRequest(author=author, strict_search=op == '='))
+
+    def parse_numeric(self, field: str) -> QueryExpr:
+        kind, op, _ = self.current
+        if kind != 'op' or op not in ('<', '<=', '>', '>=', '=', '!='):
+            raise self.error("Ожидалось сравнение: <, <=, >, >=, = или !=")
+        self.advance()
+        kind, number, _ = self.current
+        if kind != 'number':
+            raise self.error("Ожидалось число")
+        self.advance()
+
+        def term(low: Optional[float], high: Optional[float]) -> Term:
+            return Term(GraphRequest(**{field: NumericRange(low, high)}))
+
+        # Диапазоны индекса включают границы, строгие сравнения исключают равенство
+        if op == '<=':
+            return term(None, number)
+        if op == '>=':
+            return term(number, None)
+        if op == '=':
+            return term(number, number)
+        if op == '<':
+            return And([term(None, number), Not(term(number, number))])
+        if op == '>':
+            return And([term(number, None), Not(term(number, number))])
+        return And([Or([term(None, number), term(number, None)]), Not(term(number, number))])
+
+
+def parse_query(text: str) -> QueryExpr:
+    """
+    Разбирает текстовое выражение, например
+        (tree OR planar) AND NOT pseudo AND size in {large, huge}
+    Ключевые слова AND/OR/NOT не зависят от регистра, значения тегов - true/false.
+    Условия на свойства строгие: графы без значения свойства не подходят,
+    кроме author ~ "...", который работает как нестрогий поиск по автору.
+
+    Raises:
+        QuerySyntaxError: если выражение некорректно
+    """
+    return _Parser(text).parse()
@@ -0,0 +1,100 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+
+from .MetaRecords import MetaRecord, TAG_BITS
+
+# Числовые свойства графа, по которым можно задавать диапазоны
+NUMERIC_FIELDS: Tuple[str, ...] = ('vertices', 'edges', 'density')
+
+_DIRECTED_BIT = TAG_BITS['directed']
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def density(vertices: Optional[float], edges: Optional[float], directed: bool) -> Optional[float]:
+    """
+    Плотность графа: доля от максимально возможного числа рёбер
+    (для направленного графа - v*(v-1), иначе v*(v-1)/2)
+    """
+    if vertices is None or edges is None:
+        return None
+    if vertices < 2:
+        return 0.0
+    possible = vertices * (vertices - 1)
+    if not directed:
+        possible /= 2
+    return edges / possible
+
+
+def numeric_value(graph_data: Dict[str, Any], field: str) -> Optional[float]:
+    """
+    Значение числового свойства графа или None, если оно не задано.
+    Плотность вычисляется по числу вершин и рёбер (см. density)
+    """
+    if field != 'density':
+        return _number(graph_data.get(field))
+
+    return density(_number(graph_data.get('vertices')), _number(graph_data.get('edges')),
+                   (graph_data.get('properties') or {}).get('directed') is True)
+
+
+def numeric_values(graph_data: Dict[str, Any]) -> Tuple[Optional[float], ...]:
+    """Значения всех NUMERIC_FIELDS графа; компактная запись читается без сборки словаря свойств"""
+    if type(graph_data) is MetaRecord and graph_data.extra is None:
+        vertices, edges = graph_data.vertices, graph_data.edges
+        return vertices, edges, density(vertices, edges, bool(graph_data.values & _DIRECTED_BIT))
+    return tuple(numeric_value(graph_data, field) for field in NUMERIC_FIELDS)
+
+
+class SortedColumn:
+    """
+    Значения одного числового свойства, отсортированные вместе с номерами строк.
+
+    Диапазон значений находится двумя bisect, поэтому запрос стоит O(log n)
+    плюс число попавших строк. Добавления копятся в буфере и вливаются
+    слиянием перед следующим запросом. Строки удалённых графов остаются
+    в колонке - их отсекает маска живых строк индекса.
+    """
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.rows: List[int] = []
+        self._pending_values: List[float] = []
+        self._pending_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.values) + len(self._pending_values)
+
+    def add(self, value: float, row: int):
+        self._pending_values.append(value)
+        self._pending_rows.append(row)
+
+    def flush(self):
+        """Вливает накопленные значения в отсортированные массивы"""
+        if not self._pending_values:
+            return
+        values, rows = self._pending_values, self._pending_rows
+        self._pending_values, self._pending_rows = [], []
+        # Сортировка по ключу устойчива, а строки добавляются по возрастанию,
+        # поэтому равные значения остаются упорядочены по строкам
+        order = sorted(range(len(values)), key=values.__getitem__)
+        values = [values[i] for i in order]
+        rows = [rows[i] for i in order]
+        if self.values:
+            merged = list(heapq.merge(zip(self.values, self.rows), zip(values, rows)))
+            values = [value for value, _ in merged]
+            rows = [row for _, row in merged]
+        self.values = values
+        self.rows = rows
+
+    def rows_between(self, low: Optional[float], high: Optional[float]) -> List[int]:
+        """Строки, значение которых лежит в [low, high]; None - граница не задана"""
+        self.flush()
+        start = 0 if low is None else bisect_left(self.values, low)
+        end = len(self.values) if high is None else bisect_right(self.values, high)
+        return self.rows[start:end]
@@ -0,0 +1,78 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from .DataTypes import GraphRequest
+
+
+# Индекс шарда, который держит процесс-исполнитель
+_shard_index = None
+
+
+def _load_shard(meta_data: Dict[str, Any], backend: str):
+    """Инициализатор процесса: строит индекс своей части meta данных"""
+    global _shard_index
+    if backend == "columnar":
+        from .ColumnarMeta import ColumnarMetaStore
+        _shard_index = ColumnarMetaStore.build(meta_data)
+    elif backend == "scan":
+        from .QueryCompiler import ScanIndex
+        _shard_index = ScanIndex.build(meta_data)
+    else:
+        from .MetaIndex import MetaIndex
+        _shard_index = MetaIndex.build(meta_data)
+
+
+def _shard_size() -> int:
+    return len(_shard_index)
+
+
+def _search_shard(request: GraphRequest) -> List[str]:
+    return _shard_index.search(request)
+
+
+class ShardedSearch:
+    """
+    Поиск, распределённый по нескольким процессам.
+
+    Meta данные режутся на shards непрерывных частей, каждую держит свой
+    постоянный процесс со своим индексом. Запрос отправляется во все процессы
+    сразу, результаты склеиваются в порядке частей, поэтому порядок совпадает
+    с поиском в одном процессе. Набор частей неизменяем: после изменения
+    meta данных создаётся новый ShardedSearch.
+    Процессы запускаются через spawn: fork копировал бы процесс с потоками
+    Tk, asyncio и загрузчиков вместе с захваченными ими блокировками.
+    """
+
+    def __init__(self, meta_data: Dict[str, Any], shards: int, backend: str = "bitmap",
+                 mp_context: Optional[multiprocessing.context.BaseContext] = None):
+        items = list(meta_data.items())
+        shard_size = -(-len(items) // max(1, shards)) or 1
+        mp_context = mp_context or multiprocessing.get_context('spawn')
+
+        self.executors: List[ProcessPoolExecutor] = []
+        for start in range(0, len(items), shard_size):
+            part = dict(items[start:start + shard_size])
+            self.executors.append(ProcessPoolExecutor(max_workers=1, mp_context=mp_context,
+                                                      initializer=_load_shard, initargs=(part, backend)))
+
+        # Процессы запускаются лениво - дожидаемся, пока все части будут проиндексированы
+        self.sizes = [future.result() for future in
+                      [executor.submit(_shard_size) for executor in self.executors]]
+
+    def __len__(self) -> int:
+        return sum(self.sizes)
+
+    def search(self, request: GraphRequest) -> List[str]:
+        """Ищет во всех частях параллельно и склеивает результаты в исходном порядке"""
+        futures = [executor.submit(_search_shard, request) for executor in self.executors]
+        results: List[str] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def close(self, wait: bool = False):
+        """Останавливает процессы частей"""
+        for executor in self.executors:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        self.executors = []
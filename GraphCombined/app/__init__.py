@@ -6,18 +6,45 @@ __version__ = "2.0.0"
 __author__ = "Graph Systems Team"
 __description__ = "Объединенная система поиска и визуализации графов"
 
+import importlib
+
 # Экспортируем основные классы для удобного импорта
-from .GraphFrontend import GraphSearchApp
-from .GraphVisualizerApp import GraphVisualizerApp, GraphCanvas
-from .CombinedFrontend import CombinedGraphApp, run_combined_app
-from .ConsoleWidget import ConsoleWidget, get_console, log_info, log_success, log_warning, log_error, log_system
 from .GraphService import GraphService
+from .AsyncGraphService import AsyncGraphService
 from .DataTypes import GraphRequest, GraphTags, GraphSize
 from .graph_models import Graph, GraphProperties
 from .explorer import GraphExplorer
-from .graph_drawer import GraphDrawer
 from .config import CONFIG
 
+# Классы интерфейса загружаются при первом обращении к имени, поэтому
+# консольный режим, импортирующий только сервис, не тянет Tk, matplotlib и networkx
+_GUI_EXPORTS = {
+    'GraphSearchApp': '.GraphFrontend',
+    'GraphVisualizerApp': '.GraphVisualizerApp',
+    'GraphCanvas': '.GraphVisualizerApp',
+    'CombinedGraphApp': '.CombinedFrontend',
+    'run_combined_app': '.CombinedFrontend',
+    'ConsoleWidget': '.ConsoleWidget',
+    'get_console': '.ConsoleWidget',
+    'log_info': '.ConsoleWidget',
+    'log_success': '.ConsoleWidget',
+    'log_warning': '.ConsoleWidget',
+    'log_error': '.ConsoleWidget',
+    'log_system': '.ConsoleWidget',
+    'GraphDrawer': '.graph_drawer',
+    'AsyncTkBridge': '.AsyncTkBridge',
+}
+
+
+def __getattr__(name):
+    module_name = _GUI_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
 __all__ = [
     'GraphSearchApp',
     'GraphVisualizerApp',
@@ -32,6 +59,8 @@ __all__ = [
     'log_error',
     'log_system',
     'GraphService',
+    'AsyncGraphService',
+    'AsyncTkBridge',
     'GraphRequest',
     'GraphTags',
     'GraphSize',
@@ -0,0 +1,220 @@
+"""
+Консольный режим: поиск графов и сборка архивов без графического интерфейса.
+
+Импортирует только GraphService и типы данных, поэтому работает на серверах
+без дисплея и без Tk, matplotlib и networkx. Имена найденных графов печатаются
+в stdout по одному в строке по мере получения страниц поиска, журнал сервиса
+и прогресс скачивания уходят в stderr.
+
+Примеры:
+    python cli.py --author "Иванов" --size large --tag planar --tag weighted=false
+    python cli.py --expr "(tree OR planar) AND NOT pseudo" --count
+    python cli.py --size small --no-strict --download graphs.zip --workers 16
+"""
+import argparse
+import contextlib
+import hashlib
+import os
+import sys
+import time
+from typing import List, Optional, Union
+
+from .DataTypes import GraphRequest, GraphTags, GraphSize, NumericRange
+from .Downloader import GraphDownloader
+from .GraphService import GraphService
+from .MetaIndex import TAG_NAMES
+from .QueryExpr import QuerySyntaxError, parse_query
+from .config import CONFIG
+
+
+_BOOLEANS = {'true': True, '1': True, 'yes': True, 'false': False, '0': False, 'no': False}
+
+
+def _tag_argument(text: str):
+    """Разбирает --tag NAME или --tag NAME=true|false"""
+    name, _, value = text.partition('=')
+    name = name.strip().lower()
+    if name not in TAG_NAMES:
+        raise argparse.ArgumentTypeError(f"неизвестный тег '{name}', допустимые: {', '.join(TAG_NAMES)}")
+    if not value:
+        return name, True
+    if value.lower() not in _BOOLEANS:
+        raise argparse.ArgumentTypeError(f"значение тега должно быть true или false, получено '{value}'")
+    return name, _BOOLEANS[value.lower()]
+
+
+def _range_argument(text: str) -> NumericRange:
+    """Разбирает диапазон MIN:MAX, любую из границ можно опустить"""
+    low, separator, high = text.partition(':')
+    if not separator:
+        raise argparse.ArgumentTypeError("диапазон задаётся как MIN:MAX, например 500:2000 или :10000")
+    try:
+        return NumericRange(float(low) if low else None, float(high) if high else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"некорректный диапазон '{text}'")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Поиск графов и сборка архивов без графического интерфейса",
+        epilog="Имена найденных графов печатаются в stdout, журнал и прогресс - в stderr")
+
+    query = parser.add_argument_group("запрос")
+    query.add_argument('--author', help="Автор графа (при --no-strict - подстрока без учёта регистра)")
+    query.add_argument('--size', choices=[size.value for size in GraphSize], help="Размер графа")
+    query.add_argument('--tag', dest='tags', action='append', type=_tag_argument, default=[],
+                       metavar='NAME[=true|false]', help="Тег графа; можно указывать несколько раз")
+    query.add_argument('--vertices', type=_range_argument, metavar='MIN:MAX', help="Диапазон числа вершин")
+    query.add_argument('--edges', type=_range_argument, metavar='MIN:MAX', help="Диапазон числа рёбер")
+    query.add_argument('--density', type=_range_argument, metavar='MIN:MAX', help="Диапазон плотности")
+    query.add_argument('--no-strict', dest='strict', action='store_false',
+                       help="Нестрогий поиск: графы без значения свойства тоже подходят")
+    query.add_argument('--expr', help="Логическое выражение вместо полей запроса, "
+                                      "например \"(tree OR planar) AND NOT pseudo\"")
+
+    source = parser.add_argument_group("источник meta данных")
+    source.add_argument('--meta-file', help="Локальный meta.json вместо загрузки из репозитория")
+    source.add_argument('--meta-url', help="Адрес meta файла")
+    source.add_argument('--repo-url', help="Адрес каталога с файлами графов")
+    source.add_argument('--cache-dir', help="Каталог кэша meta файла и хранилища графов. По умолчанию "
+                                            "кэш приложения, а для другого --meta-url/--repo-url - "
+                                            "отдельный каталог этого каталога графов")
+
+    output = parser.add_argument_group("вывод")
+    output.add_argument('--limit', type=int, help="Не больше LIMIT результатов")
+    output.add_argument('--count', action='store_true', help="Напечатать только число найденных графов")
+    output.add_argument('--download', metavar='ZIP_PATH', help="Скачать найденные графы в zip архив")
+    output.add_argument('--workers', type=int, help="Число параллельных загрузок")
+    return parser
+
+
+def cache_dir(args: argparse.Namespace) -> Optional[str]:
+    """
+    Каталог кэша для запуска. Кэш приложения используется только для репозитория по умолчанию:
+    meta другого каталога графов не должна подменять его
+    """
+    if args.cache_dir:
+        return args.cache_dir
+    meta_url = args.meta_url or CONFIG.META_FILE_URL
+    repo_url = args.repo_url or CONFIG.REPO_URL
+    if (meta_url, repo_url) == (CONFIG.META_FILE_URL, CONFIG.REPO_URL):
+        return None
+    digest = hashlib.sha1(f"{meta_url}\n{repo_url}".encode('utf-8')).hexdigest()[:12]
+    return str(CONFIG.DOWNLOAD_DIR / "catalogues" / digest)
+
+
+def build_request(args: argparse.Namespace) -> GraphRequest:
+    tags = None
+    if args.tags:
+        tags = GraphTags(**dict(args.tags))
+    return GraphRequest(author=args.author,
+                        size=GraphSize(args.size) if args.size else None,
+                        tags=tags,
+                        strict_search=args.strict,
+                        vertices=args.vertices,
+                        edges=args.edges,
+                        density=args.density)
+
+
+class DownloadProgress:
+    """Строка прогресса скачивания в stderr и итоговая статистика"""
+
+    def __init__(self, total: int, stream=sys.stderr):
+        self.total = total
+        self.stream = stream
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    def __call__(self, graph_name: str, result: Union[int, Exception]):
+        self.done += 1
+        if isinstance(result, Exception):
+            self.failed += 1
+        else:
+            self.bytes += result
+        percent = self.done * 100 / self.total
+        self.stream.write(f"\r[{self.done}/{self.total}] {percent:5.1f}%  "
+                          f"{self.bytes / 2 ** 20 / self.elapsed:7.2f} МБ/с  ошибок: {self.failed}")
+        self.stream.flush()
+
+    def summary(self) -> str:
+        elapsed = self.elapsed
+        return (f"Скачано графов: {self.done - self.failed} из {self.total}, ошибок: {self.failed}\n"
+                f"Объём: {self.bytes / 2 ** 20:.2f} МБ за {elapsed:.2f} с "
+                f"({(self.done - self.failed) / elapsed:.1f} графов/с, {self.bytes / 2 ** 20 / elapsed:.2f} МБ/с)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    expr = None
+    if args.expr:
+        try:
+            expr = parse_query(args.expr)
+        except QuerySyntaxError as e:
+            parser.error(f"--expr: {e}")
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit должен быть положительным")
+    if args.download:
+        # Архив пишется во временный файл рядом с ZIP_PATH и затем переименовывается в него
+        directory = os.path.dirname(os.path.abspath(args.download))
+        if os.path.isdir(args.download) or args.download.endswith(('/', os.sep)):
+            parser.error(f"--download: {args.download} - каталог, укажите путь к zip файлу")
+        if os.path.exists(directory) and not os.path.isdir(directory):
+            parser.error(f"--download: {directory} - не каталог")
+
+    stdout = sys.stdout
+    # Сообщения сервиса идут в stderr, чтобы stdout можно было передать дальше по конвейеру
+    with contextlib.redirect_stdout(sys.stderr):
+        catalogue_dir = cache_dir(args)
+        service = GraphService(meta_url=args.meta_url, repo_url=args.repo_url,
+                               meta_cache_path=os.path.join(catalogue_dir, "meta.json") if catalogue_dir else None,
+                               graph_cache_dir=os.path.join(catalogue_dir, "graphs") if catalogue_dir else None)
+        if args.workers:
+            service.downloader.close()
+            service.downloader = GraphDownloader(service.repo_url, workers=args.workers)
+
+        loaded = service.load_meta_from_file(args.meta_file) if args.meta_file else service.download_meta()
+        if not loaded:
+            print("Не удалось загрузить meta данные")
+            return 1
+
+        if expr is not None:
+            names = iter(service.search_expr(expr))
+        else:
+            names = service.iter_search(build_request(args))
+
+        found: List[str] = []
+        for graph_name in names:
+            if args.limit is not None and len(found) >= args.limit:
+                break
+            found.append(graph_name)
+            if not args.count:
+                stdout.write(graph_name + "\n")
+        if args.count:
+            stdout.write(f"{len(found)}\n")
+        stdout.flush()
+
+        if args.download:
+            if not found:
+                print("Нечего скачивать: графы не найдены")
+                return 0
+            progress = DownloadProgress(len(found))
+            zip_path = service.download_zip(found, progress=progress, zip_path=os.path.abspath(args.download))
+            sys.stderr.write("\n")
+            print(progress.summary())
+            print(f"Архив: {zip_path}")
+            return 0 if progress.failed == 0 else 2
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
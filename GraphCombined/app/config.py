@@ -12,6 +12,7 @@ class AppConfig:
     REPO_URL = "https://raw.githubusercontent.com/EternityRadiance/Graphs/main/data"
     BASE_SAVE_PATH = "./downloads"
     META_FILE_URL = "https://raw.githubusercontent.com/EternityRadiance/Graphs/main/meta.json"
+    META_DELTA_URL = None  # Адрес дельта-синхронизации meta (например, локального зеркала)
     
     # UI конфигурация
     UI = UI_CONFIG
@@ -20,6 +21,29 @@ class AppConfig:
     MAX_RETRIES = 3
     TIMEOUT = 10
     CHUNK_SIZE = 8192
+    DOWNLOAD_WORKERS = 8  # Сколько графов скачивается одновременно
+    ASYNC_POLL_INTERVAL = 50  # Как часто окно забирает результаты асинхронных задач, мс
+    GRAPH_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Лимит локального хранилища графов
+    SEARCH_BACKEND = "bitmap"  # "bitmap", "columnar" (требует numpy) или "scan" (без индекса)
+    COMPACT_META = True  # Хранить meta данные компактными записями
+    META_SNAPSHOT = True  # Писать двоичный снимок meta рядом с кэшем и запускаться с него (требует numpy)
+    SEARCH_CACHE_SIZE = 128  # Сколько результатов поиска хранить в LRU кэше
+    SEARCH_PAGE_SIZE = 200  # Сколько результатов поиска отдавать за одну страницу
+    META_WAIT_TIMEOUT = 120  # Сколько поиск ждёт начальной загрузки meta данных, секунды
+    # Дельты дописываются в журнал рядом с кэшем meta; когда журнал больше этой доли кэша, кэш переписывается целиком
+    META_JOURNAL_COMPACT_RATIO = 0.5
+    # Число процессов шардированного поиска; 0 или 1 - поиск в текущем процессе. Выключено по умолчанию:
+    # на каталоге 200k записей поиск в процессе быстрее (0.015 с против 0.030 с у шардов)
+    SEARCH_SHARDS = 0
+    AUTHOR_COMPLETION_LIMIT = 8  # Сколько подсказок автора показывать
+
+    # Локальное зеркало репозитория (python mirror.py). Чтобы клиенты ходили через него, укажите
+    # REPO_URL = "http://<зеркало>:8765/data", META_FILE_URL = ".../meta.json", META_DELTA_URL = ".../delta"
+    MIRROR_HOST = "0.0.0.0"
+    MIRROR_PORT = 8765
+    MIRROR_SYNC_INTERVAL = 300  # Как часто зеркало проверяет обновления meta, секунды
+    MIRROR_DELTA_HISTORY = 32  # Сколько последних версий meta зеркало помнит для дельта-синхронизации
+    MIRROR_GRAPH_MAX_AGE = 3600  # Cache-Control max-age для файлов графов, секунды
     
     # Пути для визуализатора
     RECENT_FILES_PATH = "./recent_files.json"
@@ -36,6 +60,10 @@ class AppConfig:
     @property
     def META_FILE_PATH(self):
         return self.DOWNLOAD_DIR / "meta.json"
+
+    @property
+    def GRAPH_CACHE_DIR(self):
+        return self.DOWNLOAD_DIR / "graph_cache"
     
     @property
     def VISUALIZER_TEMP_DIR(self):
@@ -5,17 +5,21 @@ from typing import List, Optional, Dict, Any
 from .graph_models import Graph
 class GraphExplorer:
     """
-    Класс для работы с файлами в директориях и ZIP-архивах.
+    Класс для работы с файлами в директориях, ZIP-архивах
+    и с уже полученными файлами графов.
     """
 
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, contents: Optional[Dict[str, bytes]] = None) -> None:
         """
         Инициализирует объект для работы с директорией или ZIP-архивом.
 
         Args:
             path: Путь к директории или ZIP-архиву
+            contents: Файлы графов, уже полученные через GraphService: {имя графа: содержимое}.
+                      Если заданы, path не используется
         """
         self.path = path
+        self.contents = contents
 
     def list_files(self) -> List[str]:
         """
@@ -24,6 +28,9 @@ class GraphExplorer:
         Returns:
             Список имён файлов (без директорий)
         """
+        if self.contents is not None:
+            return [f"{name}.json" for name in self.contents]
+
         if self.path.endswith('.zip'):
             try:
                 with zipfile.ZipFile(self.path, 'r') as zip_file:
@@ -60,6 +67,11 @@ class GraphExplorer:
             Содержимое JSON-файла в виде словаря или None при ошибке
         """
         try:
+            if self.contents is not None:
+                graph_name = filename[:-len('.json')] if filename.endswith('.json') else filename
+                content = self.contents.get(graph_name)
+                return json.loads(content) if content is not None else None
+
             if self.path.endswith('.zip'):
                 with zipfile.ZipFile(self.path, 'r') as zf:
                     for name in zf.namelist():
@@ -0,0 +1,67 @@
+"""
+Микробенчмарк поиска без индекса: интерпретирующая проверка
+GraphService._matches_request против предиката из compile_request.
+
+Запуск из каталога GraphCombined:
+    python -m benchmarks.predicate_bench [--entries 1000000] [--repeat 3]
+"""
+import argparse
+import time
+from typing import List, Tuple
+
+from app.DataTypes import GraphRequest, GraphTags, GraphSize, NumericRange
+from app.GraphService import GraphService
+from app.QueryCompiler import scan
+from benchmarks.synthetic import SyntheticCatalogue
+
+
+def benchmark_requests(catalogue: SyntheticCatalogue) -> List[Tuple[str, GraphRequest]]:
+    top_author = catalogue.authors[0]
+    return [
+        ("автор (строго)", GraphRequest(author=top_author)),
+        ("автор (нестрого)", GraphRequest(author=top_author[:4].lower(), strict_search=False)),
+        ("размер + 2 тега", GraphRequest(size=GraphSize.LARGE, tags=GraphTags(directed=True, planar=False))),
+        ("5 тегов (нестрого)", GraphRequest(tags=GraphTags(directed=True, weighted=False, connected=True,
+                                                            simple=True, tree=False), strict_search=False)),
+        ("вершины 500..2000", GraphRequest(vertices=NumericRange(500, 2000))),
+    ]
+
+
+def measure(function, repeat: int) -> float:
+    """Лучшее время из repeat запусков, в секундах"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1_000_000, help="Число графов в синтетическом meta")
+    parser.add_argument('--repeat', type=int, default=3, help="Сколько раз повторять каждый замер")
+    args = parser.parse_args()
+
+    print(f"Генерация синтетического meta на {args.entries} графов...")
+    catalogue = SyntheticCatalogue(args.entries)
+    meta_data = dict(catalogue)
+    service = GraphService()
+
+    print(f"{'запрос':<22}{'найдено':>10}{'интерпретация, с':>20}{'компиляция, с':>18}{'ускорение':>12}")
+    for title, request in benchmark_requests(catalogue):
+        def interpreted():
+            return [name for name, data in meta_data.items() if service._matches_request(data, request)]
+
+        expected = interpreted()
+        compiled_result = scan(meta_data, request)
+        assert compiled_result == expected, f"Результаты разошлись для запроса '{title}'"
+
+        interpreted_time = measure(interpreted, args.repeat)
+        compiled_time = measure(lambda: scan(meta_data, request), args.repeat)
+        print(f"{title:<22}{len(expected):>10}{interpreted_time:>20.3f}{compiled_time:>18.3f}"
+              f"{interpreted_time / compiled_time:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Локальный HTTP стенд вместо GitHub: отдаёт файлы каталога с ETag/Last-Modified,
+отвечает 304 на условные запросы и может добавлять задержку к каждому ответу,
+чтобы имитировать удалённый сервер.
+"""
+import email.utils
+import functools
+import hashlib
+import http.server
+import os
+import threading
+import time
+from typing import Tuple
+
+
+class StandInHandler(http.server.SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        if self.latency:
+            time.sleep(self.latency)
+
+        stat = os.stat(path)
+        etag = '"%s"' % hashlib.sha1(f"{stat.st_size}-{stat.st_mtime_ns}".encode()).hexdigest()
+        last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        with open(path, 'rb') as f:
+            self.copyfile(f, self.wfile)
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def serve(directory: str, latency: float = 0.0) -> Tuple[StandInServer, str]:
+    """Запускает стенд в фоновом потоке. Возвращает сервер и его базовый адрес"""
+    handler = type('Handler', (StandInHandler,), {'latency': latency})
+    server = StandInServer(('127.0.0.1', 0), functools.partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
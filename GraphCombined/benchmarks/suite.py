@@ -0,0 +1,199 @@
+"""
+Бенчмарк GraphService на синтетических каталогах.
+
+Для каждого размера каталога генерирует meta.json и файлы графов, поднимает
+локальный HTTP стенд и замеряет download_meta (холодную загрузку и повторную
+проверку с 304), load_meta_from_file, запуск с двоичного снимка meta, матрицу
+строгих и нестрогих запросов search, search_expr, get_all_authors и download_zip
+(с пустым и заполненным локальным хранилищем). Результат печатается в stdout как JSON, журнал сервиса
+уходит в stderr.
+
+Запуск из каталога GraphCombined:
+    python -m benchmarks.suite --entries 10000 100000 --downloads 100 --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Tuple, Callable
+
+from app.DataTypes import GraphRequest, GraphTags, GraphSize, NumericRange
+from app.GraphService import GraphService
+from benchmarks.standin import serve
+from benchmarks.synthetic import SyntheticCatalogue, write_meta, sample_names, write_graph_files
+
+
+def timed(function: Callable[[], Any], repeat: int = 1) -> Tuple[float, Any]:
+    """Лучшее время из repeat запусков и результат последнего"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def request_matrix(catalogue: SyntheticCatalogue) -> List[Tuple[str, GraphRequest]]:
+    """Набор запросов, каждый - в строгом и нестрогом варианте"""
+    top_author = catalogue.authors[0]
+    shapes = [
+        ("author", dict(author=top_author)),
+        ("author_substring", dict(author=top_author[:4].lower())),
+        ("size", dict(size=GraphSize.LARGE)),
+        ("one_tag", dict(tags=GraphTags(tree=True))),
+        ("three_tags", dict(tags=GraphTags(directed=True, weighted=False, planar=True))),
+        ("author_size_tags", dict(author=top_author, size=GraphSize.SMALL, tags=GraphTags(connected=True))),
+        ("vertex_range", dict(vertices=NumericRange(500, 2000))),
+        ("empty", dict()),
+    ]
+    matrix = []
+    for strict in (True, False):
+        for title, fields in shapes:
+            matrix.append((f"{title}/{'strict' if strict else 'non_strict'}",
+                           GraphRequest(strict_search=strict, **fields)))
+    return matrix
+
+
+EXPRESSIONS = [
+    "(tree OR planar) AND NOT pseudo AND size in {large, huge}",
+    "directed AND NOT weighted AND edges < 1000",
+]
+
+
+def run_catalogue(entries: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Все замеры для одного размера каталога"""
+    workdir = tempfile.mkdtemp(prefix="graph_bench_")
+    www = os.path.join(workdir, "www")
+    os.makedirs(www)
+    result: Dict[str, Any] = {'entries': entries}
+
+    try:
+        catalogue = SyntheticCatalogue(entries, seed=args.seed)
+        meta_path = os.path.join(www, "meta.json")
+        seconds, meta_bytes = timed(lambda: write_meta(meta_path, catalogue))
+        result['generate_meta'] = {'seconds': seconds, 'bytes': meta_bytes}
+
+        server, base_url = serve(www, latency=args.latency)
+        try:
+            def make_service(cache_name: str) -> GraphService:
+                return GraphService(backend=args.backend,
+                                    meta_url=f"{base_url}/meta.json",
+                                    repo_url=f"{base_url}/data",
+                                    meta_cache_path=os.path.join(workdir, "cache", "meta.json"),
+                                    graph_cache_dir=os.path.join(workdir, cache_name))
+
+            service = make_service("graphs_cold")
+            seconds, ok = timed(service.download_meta)
+            result['download_meta'] = {'seconds': seconds, 'ok': ok,
+                                       'mb_per_second': meta_bytes / seconds / 2 ** 20}
+
+            revalidating = make_service("graphs_cold")
+            seconds, ok = timed(revalidating.download_meta)
+            result['download_meta_not_modified'] = {'seconds': seconds, 'ok': ok}
+            del revalidating
+
+            reloading = make_service("graphs_cold")
+            seconds, ok = timed(lambda: reloading.load_meta_from_file(meta_path))
+            result['load_meta_from_file'] = {'seconds': seconds, 'ok': ok}
+            del reloading
+
+            if service.wait_snapshot():
+                starting = make_service("graphs_cold")
+                # Запуск с двоичного снимка: load_meta открывает его, перепроверка кэша идёт в фоне
+                seconds, ok = timed(starting.load_meta)
+                first_search, _ = timed(lambda: starting.search(GraphRequest(tags=GraphTags(tree=True))))
+                result['load_meta_snapshot'] = {'seconds': seconds, 'ok': ok, 'first_search_seconds': first_search,
+                                                'bytes': os.path.getsize(starting.meta_snapshot_path)}
+                del starting
+
+            searches = {}
+            for title, request in request_matrix(catalogue):
+                def cold_search():
+                    service.search_cache.clear()
+                    return service.search(request)
+                cold, names = timed(cold_search, args.repeat)
+                warm, _ = timed(lambda: service.search(request), args.repeat)
+                searches[title] = {'seconds': cold, 'cached_seconds': warm, 'results': len(names)}
+            result['search'] = searches
+
+            expressions = {}
+            for expression in EXPRESSIONS:
+                def cold_expr():
+                    service.search_cache.clear()
+                    return service.search_expr(expression)
+                seconds, names = timed(cold_expr, args.repeat)
+                expressions[expression] = {'seconds': seconds, 'results': len(names)}
+            result['search_expr'] = expressions
+
+            def all_authors():
+                service.clear_caches()
+                return service.get_all_authors()
+            seconds, authors = timed(all_authors, args.repeat)
+            result['get_all_authors'] = {'seconds': seconds, 'authors': len(authors)}
+
+            if args.downloads:
+                names = sample_names(service.meta_data, args.downloads)
+                graph_bytes = write_graph_files(os.path.join(www, "data"), service.meta_data, names, args.seed)
+                save_path = os.path.join(workdir, "archives", "graphs.zip")
+                downloads = {'graphs': len(names), 'bytes': graph_bytes}
+                for label in ('cold', 'warm'):
+                    # Второй прогон берёт графы из локального хранилища, заполненного первым
+                    seconds, zip_path = timed(lambda: service.download_zip(names, save_path))
+                    downloads[label] = {'seconds': seconds,
+                                        'graphs_per_second': len(names) / seconds,
+                                        'mb_per_second': graph_bytes / seconds / 2 ** 20,
+                                        'zip_bytes': os.path.getsize(zip_path)}
+                result['download_zip'] = downloads
+        finally:
+            server.shutdown()
+            server.server_close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, nargs='+', default=[10_000, 100_000],
+                        help="Размеры синтетических каталогов (от 10k до 10M)")
+    parser.add_argument('--downloads', type=int, default=100, help="Сколько графов скачивать в download_zip")
+    parser.add_argument('--backend', choices=['bitmap', 'columnar', 'scan'], default=None, help="Поисковый бэкенд")
+    parser.add_argument('--repeat', type=int, default=3, help="Повторы каждого замера поиска")
+    parser.add_argument('--latency', type=float, default=0.0, help="Задержка стенда на ответ, секунды")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    parser.add_argument('--output', help="Файл для JSON результатов (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'arguments': vars(args),
+        'runs': [],
+    }
+    for entries in args.entries:
+        print(f"Каталог на {entries} графов...", file=sys.stderr)
+        # Сообщения сервиса не должны попадать в JSON на stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            report['runs'].append(run_catalogue(entries, args))
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Результаты сохранены в {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
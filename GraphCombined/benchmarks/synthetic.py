@@ -0,0 +1,184 @@
+"""
+Генератор синтетических каталогов графов для бенчмарков.
+
+Создаёт meta.json с правдоподобными распределениями (авторы по закону Ципфа,
+мелких графов больше, чем огромных, согласованные теги: дерево связно
+и планарно, пустой граф без рёбер и т.д.) и файлы графов в формате
+репозитория (vertices, edges, edges_list) для выбранных записей.
+"""
+import json
+import os
+import random
+from itertools import accumulate
+from typing import Dict, Any, Iterator, Tuple, List, Optional
+
+from app.DataTypes import GraphSize
+
+
+SIZE_WEIGHTS = {
+    GraphSize.SMALL: 0.45,
+    GraphSize.MEDIUM: 0.30,
+    GraphSize.LARGE: 0.18,
+    GraphSize.HUGE: 0.07,
+}
+
+# Диапазон числа вершин для каждого размера
+VERTEX_RANGES = {
+    GraphSize.SMALL: (2, 50),
+    GraphSize.MEDIUM: (51, 500),
+    GraphSize.LARGE: (501, 5000),
+    GraphSize.HUGE: (5001, 20000),
+}
+
+# Доля записей, у которых тег не указан вовсе
+UNKNOWN_TAG_RATE = 0.1
+
+_AUTHOR_STEMS = ["Иванов", "Петрова", "Smith", "Kowalski", "Müller", "Сидоров", "Garcia", "Кузнецова",
+                 "Tanaka", "Nguyen", "Орлов", "Brown", "Rossi", "Волкова", "Dubois", "Lee"]
+
+
+def author_names(count: int) -> List[str]:
+    """Различные имена авторов: основы с порядковым номером"""
+    return [f"{_AUTHOR_STEMS[i % len(_AUTHOR_STEMS)]}_{i}" for i in range(count)]
+
+
+class SyntheticCatalogue:
+    """
+    Генератор записей meta данных.
+    Число авторов растёт вместе с каталогом, вклад авторов распределён по Ципфу
+    """
+
+    def __init__(self, entries: int, seed: int = 0, authors: Optional[int] = None):
+        self.entries = entries
+        self.seed = seed
+        self.authors = author_names(authors or max(20, entries // 200))
+        self._author_weights = list(accumulate(1.0 / (rank + 1) ** 1.1 for rank in range(len(self.authors))))
+        self._sizes = list(SIZE_WEIGHTS)
+        self._size_weights = list(accumulate(SIZE_WEIGHTS.values()))
+
+    @staticmethod
+    def graph_name(i: int) -> str:
+        return f"graph_{i:08d}"
+
+    def __iter__(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rnd = random.Random(self.seed)
+        for i in range(self.entries):
+            yield self.graph_name(i), self._entry(rnd)
+
+    def _entry(self, rnd: random.Random) -> Dict[str, Any]:
+        size = rnd.choices(self._sizes, cum_weights=self._size_weights)[0]
+        vertices = rnd.randint(*VERTEX_RANGES[size])
+        directed = rnd.random() < 0.35
+
+        tree = rnd.random() < 0.15
+        empty = not tree and rnd.random() < 0.02
+        full = not tree and not empty and size == GraphSize.SMALL and rnd.random() < 0.1
+        pseudo = not (tree or empty or full) and rnd.random() < 0.05
+
+        if tree:
+            edges = vertices - 1
+        elif empty:
+            edges = 0
+        elif full:
+            edges = vertices * (vertices - 1) // (1 if directed else 2)
+        else:
+            edges = rnd.randint(vertices - 1, vertices * 4)
+
+        properties = {
+            'directed': directed,
+            'weighted': rnd.random() < 0.5,
+            'connected': tree or full or (not empty and rnd.random() < 0.6),
+            'mixed': directed and rnd.random() < 0.1,
+            'full': full,
+            'double': tree or (not full and rnd.random() < 0.2),
+            'simple': not pseudo,
+            'empty': empty,
+            'planar': tree or empty or (vertices < 5 and full) or (not full and rnd.random() < 0.4),
+            'tree': tree,
+            'pseudo': pseudo,
+        }
+        for tag in list(properties):
+            if rnd.random() < UNKNOWN_TAG_RATE:
+                del properties[tag]
+
+        return {
+            'author': self.authors[rnd.choices(range(len(self.authors)), cum_weights=self._author_weights)[0]],
+            'size': size.value,
+            'vertices': vertices,
+            'edges': edges,
+            'properties': properties,
+        }
+
+
+def write_meta(path: str, catalogue: SyntheticCatalogue) -> int:
+    """Потоково пишет meta.json, не держа каталог в памяти. Возвращает размер файла"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for i, (graph_name, graph_data) in enumerate(catalogue):
+            if i:
+                f.write(', ')
+            f.write(json.dumps(graph_name))
+            f.write(': ')
+            f.write(json.dumps(graph_data, ensure_ascii=False))
+        f.write('}')
+    return os.path.getsize(path)
+
+
+def synthetic_graph(graph_data: Dict[str, Any], seed: int = 0) -> Dict[str, Any]:
+    """Файл графа в формате репозитория: рёбра между вершинами 1..vertices"""
+    rnd = random.Random(seed)
+    vertices = graph_data['vertices']
+    properties = graph_data.get('properties', {})
+    weighted = properties.get('weighted', False)
+
+    if properties.get('tree'):
+        pairs = [(rnd.randint(1, target - 1), target) for target in range(2, vertices + 1)]
+    elif properties.get('full'):
+        directed = properties.get('directed', False)
+        pairs = [(source, target) for source in range(1, vertices + 1) for target in range(1, vertices + 1)
+                 if source != target and (directed or source < target)]
+    else:
+        pairs = [(rnd.randint(1, vertices), rnd.randint(1, vertices)) for _ in range(graph_data['edges'])]
+
+    edges_list = []
+    for source, target in pairs:
+        edge = {'source': source, 'target': target}
+        if weighted:
+            edge['weight'] = rnd.randint(1, 100)
+        edges_list.append(edge)
+
+    return dict(graph_data, edges_list=edges_list)
+
+
+def sample_names(meta_data: Dict[str, Any], count: int) -> List[str]:
+    """Выборка графов для скачивания: поровну из каждого размера, пока хватает записей"""
+    by_size: Dict[str, List[str]] = {size.value: [] for size in GraphSize}
+    for graph_name, graph_data in meta_data.items():
+        bucket = by_size.get(graph_data.get('size'))
+        if bucket is not None and len(bucket) < count:
+            bucket.append(graph_name)
+        if all(len(bucket) >= count for bucket in by_size.values()):
+            break
+
+    names: List[str] = []
+    buckets = [iter(bucket) for bucket in by_size.values()]
+    while len(names) < count and buckets:
+        for bucket in list(buckets):
+            graph_name = next(bucket, None)
+            if graph_name is None:
+                buckets.remove(bucket)
+            elif len(names) < count:
+                names.append(graph_name)
+    return names
+
+
+def write_graph_files(directory: str, meta_data: Dict[str, Any], graph_names: List[str], seed: int = 0) -> int:
+    """Пишет файлы графов <directory>/<имя>.json. Возвращает суммарный размер"""
+    os.makedirs(directory, exist_ok=True)
+    total = 0
+    for i, graph_name in enumerate(graph_names):
+        path = os.path.join(directory, f"{graph_name}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(synthetic_graph(meta_data[graph_name], seed + i), f, ensure_ascii=False)
+        total += os.path.getsize(path)
+    return total
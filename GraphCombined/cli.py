@@ -0,0 +1,10 @@
+import sys
+
+from app.cli import main
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nПрервано пользователем", file=sys.stderr)
+        sys.exit(130)
@@ -0,0 +1,114 @@
+"""
+Общие заготовки тестов: синтетический каталог, локальный HTTP стенд вместо GitHub
+и фабрика GraphService, которая держит кэши во временной директории.
+"""
+import functools
+import json
+import threading
+from collections import Counter
+
+import pytest
+
+from app.GraphService import GraphService
+from app.MirrorServer import GraphMirror, create_server
+from benchmarks.standin import StandInHandler, StandInServer
+from benchmarks.synthetic import SyntheticCatalogue
+
+
+def make_meta(entries: int = 1500, seed: int = 7):
+    """
+    Синтетический каталог с крайними случаями, которых нет в генераторе бенчмарков:
+    без автора, с пустым автором, без тегов и без числа рёбер
+    """
+    meta = dict(SyntheticCatalogue(entries, seed=seed, authors=30))
+    for i, graph_data in enumerate(meta.values()):
+        if i % 41 == 0:
+            del graph_data['author']
+        elif i % 43 == 0:
+            graph_data['author'] = ''
+        if i % 47 == 0:
+            del graph_data['properties']
+        if i % 53 == 0:
+            del graph_data['edges']
+    return meta
+
+
+class StandIn:
+    """Стенд с каталогом www: считает запросы и коды ответов по путям и отвечает 304 на условные GET"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = Counter()
+        self.statuses = []
+        self.latency = 0.0
+        stand = self
+
+        class Handler(StandInHandler):
+            def do_GET(self):
+                stand.hits[self.path] += 1
+                self.latency = stand.latency
+                super().do_GET()
+
+            def send_response(self, code, message=None):
+                stand.statuses.append((self.path, code))
+                super().send_response(code, message)
+
+        self.server = StandInServer(('127.0.0.1', 0), functools.partial(Handler, directory=str(directory)))
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def publish(self, meta):
+        (self.directory / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def meta():
+    return make_meta()
+
+
+@pytest.fixture
+def meta_file(tmp_path, meta):
+    path = tmp_path / "meta.json"
+    path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def standin(tmp_path, meta):
+    www = tmp_path / "www"
+    (www / "data").mkdir(parents=True)
+    stand = StandIn(www)
+    stand.publish(meta)
+    yield stand
+    stand.close()
+
+
+@pytest.fixture
+def make_service(tmp_path, standin):
+    """Фабрика сервисов, смотрящих на стенд. Сервисы с одним cache делят кэш meta и хранилище графов"""
+    def make(cache: str = "cache", **kwargs) -> GraphService:
+        kwargs.setdefault('snapshot', False)
+        kwargs.setdefault('meta_url', f"{standin.url}/meta.json")
+        kwargs.setdefault('repo_url', f"{standin.url}/data")
+        return GraphService(meta_cache_path=str(tmp_path / cache / "meta.json"),
+                            graph_cache_dir=str(tmp_path / cache / "graphs"),
+                            **kwargs)
+    return make
+
+
+@pytest.fixture
+def mirror(tmp_path, standin, make_service):
+    """Зеркало со своим кэшем, синхронизируемое со стендом вручную"""
+    mirror = GraphMirror(make_service("mirror"), sync_interval=3600)
+    assert mirror.start()
+    server = create_server(mirror, '127.0.0.1', 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    mirror.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield mirror
+    server.shutdown()
+    server.server_close()
+    mirror.stop()
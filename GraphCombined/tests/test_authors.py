@@ -0,0 +1,82 @@
+import json
+import threading
+from collections import Counter
+
+import pytest
+
+from app.AuthorIndex import AuthorCompletions
+from app.GraphService import GraphService
+
+from .conftest import make_meta
+
+
+def expected_completions(meta, prefix, limit):
+    counts = Counter(graph_data['author'] for graph_data in meta.values() if graph_data.get('author'))
+    matching = [(author, count) for author, count in counts.items() if author.lower().startswith(prefix.lower())]
+    return sorted(matching, key=lambda item: (-item[1], item[0].lower()))[:limit]
+
+
+@pytest.fixture
+def meta():
+    return make_meta(3000)
+
+
+@pytest.fixture
+def service(tmp_path, meta):
+    path = tmp_path / "meta.json"
+    path.write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8')
+    service = GraphService(meta_cache_path=str(tmp_path / "cache" / "meta.json"),
+                           graph_cache_dir=str(tmp_path / "graphs"), snapshot=False)
+    assert service.load_meta_from_file(str(path))
+    return service
+
+
+@pytest.mark.parametrize('prefix', ['S', 'smi', 'SMITH_1', 'Иван', 'и', 'Müller', 'нет такого'])
+@pytest.mark.parametrize('limit', [1, 5, 100])
+def test_completions_match_counts(meta, prefix, limit):
+    completions = AuthorCompletions.build(meta.values())
+    assert completions.complete(prefix, limit) == expected_completions(meta, prefix, limit)
+
+
+def test_service_completions_follow_deltas(service, meta):
+    assert service.complete_author('Smith', 100) == expected_completions(meta, 'Smith', 100)
+    assert service.get_all_authors() == sorted({graph_data['author'] for graph_data in meta.values()
+                                                if graph_data.get('author')})
+
+    names = list(meta)
+    upserts = {name: service._pack_record(dict(meta[name], author='Smith_новый')) for name in names[:7]}
+    service._apply_meta_delta(upserts, names[7:20], 'v2')
+    for name in names[:7]:
+        meta[name] = dict(meta[name], author='Smith_новый')
+    for name in names[7:20]:
+        del meta[name]
+    assert service.complete_author('smith', 100) == expected_completions(meta, 'smith', 100)
+    assert ('Smith_новый', 7) in service.complete_author('smith_н')
+
+
+def test_no_completions_while_loading(tmp_path, meta):
+    raw = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    half_read = threading.Event()
+    resume = threading.Event()
+
+    def chunks():
+        middle = len(raw) // 2
+        yield raw[:middle]
+        half_read.set()
+        resume.wait(10)
+        yield raw[middle:]
+
+    service = GraphService(meta_cache_path=str(tmp_path / "meta.json"), graph_cache_dir=str(tmp_path / "graphs"),
+                           snapshot=False)
+    loader = threading.Thread(target=service._read_meta_stream, args=(chunks(),))
+    loader.start()
+    try:
+        assert half_read.wait(10)
+        assert service.loaded and service.loading
+        assert service.complete_author('S') == []
+    finally:
+        resume.set()
+        loader.join()
+
+    assert not service.loading
+    assert service.complete_author('S', 100) == expected_completions(meta, 'S', 100)
@@ -0,0 +1,62 @@
+import json
+import zipfile
+
+import pytest
+
+from app import cli
+from benchmarks.synthetic import write_graph_files
+
+
+@pytest.fixture
+def graphs(standin, meta):
+    names = [name for name, graph_data in meta.items()
+             if graph_data.get('size') == 'small' and 'edges' in graph_data][:5]
+    write_graph_files(str(standin.directory / "data"), meta, names)
+    return names
+
+
+def run(capsys, *argv):
+    code = cli.main(list(argv))
+    out = capsys.readouterr().out
+    return code, out.split()
+
+
+def test_search_uses_own_cache_for_other_catalogue(standin, meta, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    code, names = run(capsys, '--meta-url', f"{standin.url}/meta.json", '--repo-url', f"{standin.url}/data",
+                      '--size', 'small', '--tag', 'tree')
+
+    assert code == 0
+    assert names == [name for name, graph_data in meta.items() if graph_data.get('size') == 'small'
+                     and graph_data.get('properties', {}).get('tree') is True]
+    # Meta другого каталога не попадает в кэш приложения
+    assert not (tmp_path / "downloads" / "meta.json").exists()
+    caches = list((tmp_path / "downloads" / "catalogues").glob("*/meta.json"))
+    assert len(caches) == 1 and json.loads(caches[0].read_bytes()) == meta
+
+
+def test_count_and_expression(standin, meta, tmp_path, capsys):
+    source = ('--meta-url', f"{standin.url}/meta.json", '--cache-dir', str(tmp_path / "cache"))
+    code, output = run(capsys, *source, '--expr', 'tree AND NOT directed', '--count')
+    # NOT - дополнение: графы без тега directed тоже подходят
+    expected = sum(graph_data.get('properties', {}).get('tree') is True
+                   and graph_data.get('properties', {}).get('directed') is not True for graph_data in meta.values())
+    assert code == 0 and output == [str(expected)]
+
+    # Второй запуск берёт meta из кэша по условному GET
+    code, output = run(capsys, *source, '--size', 'huge', '--limit', '3')
+    assert code == 0 and len(output) == 3
+    assert [code for path, code in standin.statuses if path == '/meta.json'] == [200, 304]
+
+
+def test_download(standin, graphs, tmp_path, capsys):
+    archive = tmp_path / "out" / "graphs.zip"
+    code, output = run(capsys, '--meta-url', f"{standin.url}/meta.json", '--repo-url', f"{standin.url}/data",
+                       '--cache-dir', str(tmp_path / "cache"), '--size', 'small', '--edges', '0:',
+                       '--limit', '5', '--download', str(archive))
+    assert code == 0
+    assert output == graphs
+    with zipfile.ZipFile(archive) as zf:
+        assert sorted(zf.namelist()) == sorted(f"{name}.json" for name in graphs)
+        for name in graphs:
+            assert zf.read(f"{name}.json") == (standin.directory / "data" / f"{name}.json").read_bytes()
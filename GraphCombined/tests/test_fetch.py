@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.AsyncGraphService import AsyncGraphService
+from app.Downloader import GraphDownloader
+from benchmarks.synthetic import write_graph_files
+
+
+@pytest.fixture
+def graphs(standin, meta):
+    names = [name for name, graph_data in meta.items() if 'edges' in graph_data][:12]
+    write_graph_files(str(standin.directory / "data"), meta, names)
+    standin.latency = 0.2
+    return names
+
+
+@pytest.fixture
+def service(make_service):
+    service = make_service()
+    assert service.download_meta()
+    return service
+
+
+def graph_hits(standin, names):
+    return [standin.hits[f"/data/{name}.json"] for name in names]
+
+
+def graph_bytes(standin, name):
+    return (standin.directory / "data" / f"{name}.json").read_bytes()
+
+
+def test_concurrent_fetch_downloads_once(standin, service, graphs):
+    name = graphs[0]
+    with ThreadPoolExecutor(6) as executor:
+        results = list(executor.map(lambda _: service.fetch_graph(name), range(6)))
+
+    assert results == [graph_bytes(standin, name)] * 6
+    assert graph_hits(standin, [name]) == [1]
+    assert not service._inflight
+
+    # Следующий запрос берёт граф из хранилища
+    assert service.fetch_graph(name) == results[0]
+    assert graph_hits(standin, [name]) == [1]
+
+
+def test_overlapping_batches_download_each_graph_once(standin, service, graphs):
+    with ThreadPoolExecutor(2) as executor:
+        first = executor.submit(service.fetch_graphs, graphs[:8])
+        second = executor.submit(service.fetch_graphs, graphs[4:])
+        results = {**first.result(), **second.result()}
+
+    assert results == {name: graph_bytes(standin, name) for name in graphs}
+    assert graph_hits(standin, graphs) == [1] * len(graphs)
+
+
+def test_failure_is_shared(standin, service, graphs):
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(lambda _: service.fetch_graphs(['нет_такого'])['нет_такого'], range(4)))
+
+    assert all(isinstance(result, Exception) for result in results)
+    assert not service._inflight
+
+
+def test_async_fetch_coalesces_with_sync(standin, service, graphs):
+    async_service = AsyncGraphService(service)
+
+    async def fetch():
+        return await asyncio.gather(*(async_service.fetch_graph(graphs[0]) for _ in range(3)),
+                                    asyncio.to_thread(service.fetch_graph, graphs[0]))
+
+    try:
+        results = asyncio.run(fetch())
+    finally:
+        async_service.close()
+    assert results == [graph_bytes(standin, graphs[0])] * 4
+    assert graph_hits(standin, graphs[:1]) == [1]
+
+
+def test_connection_pool_fits_concurrency(standin, service, graphs, caplog):
+    """Одновременные загрузки из пула AsyncGraphService и fetch_many не выходят за пул соединений"""
+    service.downloader.close()
+    service.downloader = GraphDownloader(service.repo_url, workers=2)
+    async_service = AsyncGraphService(service)
+    standin.latency = 0.05
+
+    async def fetch():
+        return await asyncio.gather(async_service.fetch_graphs(graphs[:6]),
+                                    *(async_service.fetch_graph(name) for name in graphs[6:]))
+
+    try:
+        with caplog.at_level(logging.WARNING, logger='urllib3'):
+            asyncio.run(fetch())
+    finally:
+        async_service.close()
+    assert not [record for record in caplog.records if 'pool is full' in record.getMessage()]
+    assert graph_hits(standin, graphs) == [1] * len(graphs)
+
+
+def test_async_wait_does_not_start_loading(make_service):
+    service = make_service()
+    async_service = AsyncGraphService(service)
+    try:
+        assert asyncio.run(async_service.wait_until_loaded(1)) is False
+        assert service.meta_future is None and not service.loaded
+
+        service.start_loading()
+        assert asyncio.run(async_service.wait_until_loaded(10)) is True
+    finally:
+        async_service.close()
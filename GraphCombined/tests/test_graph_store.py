@@ -0,0 +1,62 @@
+import threading
+
+from app.GraphStore import GraphStore
+from app.explorer import GraphExplorer
+
+
+def test_put_get_and_stamp(tmp_path):
+    store = GraphStore(str(tmp_path), max_bytes=1 << 20)
+    digest = store.put('a', b'{"vertices": 1}', 'v1')
+    store.put('b', b'{"vertices": 1}', 'v1')
+
+    assert store.get('a', 'v1') == b'{"vertices": 1}'
+    assert store.get('a', 'v2') is None
+    assert store.blob_path(digest).exists()
+    # Одинаковое содержимое хранится один раз
+    assert store.total_bytes == len(b'{"vertices": 1}')
+
+    store.save()
+    reopened = GraphStore(str(tmp_path), max_bytes=1 << 20)
+    assert sorted(reopened.names()) == ['a', 'b']
+    assert reopened.get('b', 'v1') == b'{"vertices": 1}'
+
+
+def test_evicts_least_recently_used(tmp_path):
+    store = GraphStore(str(tmp_path), max_bytes=250)
+    store.put('a', b'a' * 100)
+    store.put('b', b'b' * 100)
+    assert store.get('a') == b'a' * 100
+    store.put('c', b'c' * 100)
+
+    assert store.get('b') is None
+    assert store.get('a') == b'a' * 100 and store.get('c') == b'c' * 100
+    assert store.total_bytes == 200
+    assert not list((tmp_path / "objects").rglob("*.tmp"))
+
+
+def test_concurrent_puts(tmp_path):
+    store = GraphStore(str(tmp_path), max_bytes=1 << 20)
+    barrier = threading.Barrier(8)
+
+    def put(i):
+        barrier.wait()
+        for j in range(20):
+            store.put(f'g{i}_{j}', f'{j}'.encode() * 10)
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store.names()) == 160
+    assert all(store.get(f'g{i}_{j}') == f'{j}'.encode() * 10 for i in range(8) for j in range(20))
+    assert store.total_bytes == sum(len(f'{j}'.encode() * 10) for j in range(20))
+    assert not list((tmp_path / "objects").rglob("*.tmp"))
+
+
+def test_explorer_reads_fetched_contents():
+    explorer = GraphExplorer("", {'x': b'{"vertices": 2, "edges": 1, "edges_list": [[1, 2]]}', 'y': b'{}'})
+    assert explorer.list_files() == ['x.json', 'y.json']
+    assert explorer.read_file('x.json')['vertices'] == 2
+    assert explorer.read_file('missing.json') is None
@@ -0,0 +1,86 @@
+import json
+import time
+
+import pytest
+
+from app.MetaStream import iter_meta_entries
+
+from .conftest import make_meta
+
+
+def chunked(raw: bytes, size: int):
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+def parse(raw: bytes, size: int):
+    return dict(iter_meta_entries(chunked(raw, size)))
+
+
+DOCUMENT = {
+    'a "quoted" \\ name': {'author': 'Иван "}{" \\', 'size': 'small', 'vertices': 123456789, 'edges': -1.5e-3,
+                           'properties': {'tree': True, 'nested': [1, {'y': None}]}},
+    'number': 12.75,
+    'string': 'str}',
+    'flag': True,
+    'list': [],
+    'object': {},
+    'null': None,
+}
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 4096])
+@pytest.mark.parametrize('indent', [None, 3])
+def test_stream_matches_json_loads(size, indent):
+    raw = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent).encode('utf-8')
+    assert parse(raw, size) == DOCUMENT
+
+
+def test_stream_catalogue():
+    meta = make_meta(300)
+    raw = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    assert list(iter_meta_entries(chunked(raw, 100))) == list(meta.items())
+
+
+@pytest.mark.parametrize('size', [1, 3, 100])
+@pytest.mark.parametrize('raw', [
+    b'{"a": {"x": 1 "y": 2}, "b": {}}',
+    b'{"a": {"x": tru}, "b": 1}',
+    b'{"a": [1,,2], "b": 1}',
+    b'{"a": 1 "b": 2}',
+    b'{"a": }',
+    b'{"a": "\\u12"}',
+    b'{"a": {"x": 1}} trailing',
+    b'[1, 2]',
+])
+def test_malformed_raises(raw, size):
+    with pytest.raises(json.JSONDecodeError):
+        parse(raw, size)
+
+
+@pytest.mark.parametrize('size', [1, 3, 100])
+@pytest.mark.parametrize('raw', [
+    b'{"a": {"x": 1}',
+    b'{"a": {"x": "abc',
+    b'{"a": 12',
+    b'{"a": {"x": 1}, "b":',
+    b'',
+])
+def test_truncated_raises(raw, size):
+    with pytest.raises(json.JSONDecodeError):
+        parse(raw, size)
+
+
+def test_unclosed_value_is_linear():
+    """Незакрытое большое значение дочитывается до конца один раз, а не разбирается заново на каждом куске"""
+    body = b'{"a": [' + b'{"x": 1}, ' * 200000
+    valid = body + b'{"x": 1}]}'
+
+    started = time.perf_counter()
+    json.loads(valid)
+    loads = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with pytest.raises(json.JSONDecodeError):
+        parse(body, 8192)
+    assert time.perf_counter() - started < 30 * loads + 1
+    assert len(parse(valid, 8192)['a']) == 200001
@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+
+import requests
+
+from app.DataTypes import GraphRequest, GraphSize
+from app.MirrorServer import GraphMirror, MetaHistory
+
+
+def snapshot(service):
+    return {name: service.get_graph_info(name) for name in service.meta_data}
+
+
+def meta_statuses(standin):
+    return [code for path, code in standin.statuses if path == '/meta.json']
+
+
+def test_download_meta_streams_into_cache(standin, make_service, meta):
+    service = make_service()
+    assert service.download_meta()
+    assert snapshot(service) == meta
+    assert json.loads(service.meta_cache_path.read_bytes()) == meta
+    assert meta_statuses(standin) == [200]
+
+
+def test_not_modified_uses_cache(standin, make_service, meta):
+    assert make_service().download_meta()
+    service = make_service()
+    assert service.download_meta()
+
+    assert meta_statuses(standin) == [200, 304]
+    assert snapshot(service) == meta
+
+    # Уже загруженный сервис на 304 ничего не перечитывает
+    generation = service._index_generation
+    assert service.download_meta()
+    assert meta_statuses(standin) == [200, 304, 304]
+    assert service._index_generation == generation
+
+
+def test_changed_meta_is_downloaded_again(standin, make_service, meta):
+    service = make_service()
+    assert service.download_meta()
+
+    names = list(meta)
+    changed = {name: graph_data for name, graph_data in meta.items() if name not in names[:10]}
+    changed[names[20]] = dict(meta[names[20]], author='Другой автор')
+    changed['graph_new'] = meta[names[30]]
+    standin.publish(changed)
+
+    assert service.sync_meta()
+    assert meta_statuses(standin) == [200, 200]
+    assert snapshot(service) == changed
+    assert service.search_expr('author = "Другой автор"') == [names[20]]
+
+    restarted = make_service()
+    assert restarted.download_meta()
+    assert meta_statuses(standin) == [200, 200, 304]
+    assert snapshot(restarted) == changed
+
+
+def test_load_meta_revalidates_in_background(standin, make_service, meta):
+    assert make_service().download_meta()
+    service = make_service()
+    refreshed = threading.Event()
+    results = []
+
+    def on_refresh(success):
+        results.append(success)
+        refreshed.set()
+
+    assert service.load_meta(on_refresh=on_refresh)
+    assert snapshot(service) == meta
+    assert refreshed.wait(10)
+    assert results == [True]
+    assert meta_statuses(standin) == [200, 304]
+
+
+def test_start_loading_runs_once(standin, make_service, meta):
+    assert make_service().download_meta()
+    service = make_service()
+    results = []
+    refreshed = threading.Event()
+
+    def on_refresh(success):
+        results.append(success)
+        if len(results) == 2:
+            refreshed.set()
+
+    future = service.start_loading(on_refresh=on_refresh)
+    assert service.start_loading(on_refresh=on_refresh) is future
+    assert future.result(10) is True
+    assert service.start_loading() is future
+    assert snapshot(service) == meta
+
+    # Оба получателя узнают результат одной фоновой перепроверки кэша
+    assert refreshed.wait(10)
+    assert results == [True, True]
+    assert meta_statuses(standin) == [200, 304]
+
+
+def test_search_waits_for_loading(standin, make_service, meta):
+    standin.latency = 0.5
+    service = make_service()
+    future = service.start_loading()
+    assert not future.done()
+
+    # Поиск дожидается первых записей и ищет по уже загруженной части meta
+    request = GraphRequest(size=GraphSize.SMALL)
+    expected = [name for name, graph_data in meta.items() if graph_data.get('size') == 'small']
+    found = service.search(request)
+    assert service.loaded and found
+    assert found == expected[:len(found)]
+
+    # Частичный результат не попадает в кэш: после загрузки поиск видит все графы
+    assert future.result(10) is True
+    assert service.search(request) == expected
+
+
+def test_wait_until_loaded(standin, make_service):
+    service = make_service()
+    # Загрузка не запускалась: ждать нечего
+    started = time.monotonic()
+    assert service.wait_until_loaded(10) is False
+    assert time.monotonic() - started < 5
+    assert service.meta_future is None
+
+    standin.latency = 0.5
+    service.start_loading()
+    assert service.wait_until_loaded(0.05) is False
+    assert service.wait_until_loaded(10) is True
+    assert service.wait_until_loaded(0) is True
+
+    # Неудачная загрузка завершает ожидание сразу, а не по таймауту
+    broken = make_service("broken", meta_url=f"{standin.url}/нет.json")
+    future = broken.start_loading()
+    started = time.monotonic()
+    assert broken.wait_until_loaded(10) is False
+    assert time.monotonic() - started < 5
+    assert future.result() is False
+
+
+def test_delta_applied_and_journaled(standin, make_service, mirror, meta):
+    def client():
+        return make_service("client", meta_url=f"{mirror.url}/meta.json",
+                            repo_url=f"{mirror.url}/data", delta_url=f"{mirror.url}/delta")
+
+    service = client()
+    assert service.download_meta()
+    assert service.meta_version == mirror.version
+    cache_stat = service.meta_cache_path.stat()
+
+    for step in range(3):
+        names = list(meta)
+        meta = {name: graph_data for name, graph_data in meta.items() if name not in names[step * 10:step * 10 + 5]}
+        meta[f'graph_new_{step}'] = meta[names[100]]
+        meta[names[50]] = dict(meta[names[50]], author=f'Автор {step}')
+        standin.publish(meta)
+        assert mirror.sync()
+
+        delta_calls = standin.hits.copy()
+        assert service.sync_meta()
+        # Клиент получил дельту от зеркала, а не meta файл целиком
+        assert service.meta_version == mirror.version
+        assert snapshot(service) == meta
+        assert standin.hits == delta_calls
+
+        # Дельта дописана в журнал, сам кэш meta не переписан
+        assert service.meta_cache_journal_path.exists()
+        assert service.meta_cache_path.stat().st_mtime_ns == cache_stat.st_mtime_ns
+
+        restarted = client()
+        assert restarted.load_meta_cache()
+        assert restarted.meta_version == mirror.version
+        assert snapshot(restarted) == meta
+
+        # Валидаторы в кэше клиента соответствуют версии, которую раздаёт зеркало
+        response = requests.get(f"{mirror.url}/meta.json", headers=restarted._conditional_headers())
+        assert response.status_code == 304
+
+
+def test_restarted_mirror_replays_journal(standin, make_service, mirror, meta):
+    """Зеркало, получающее дельты от вышестоящего зеркала, после перезапуска раздаёт каталог с дельтами"""
+    def downstream():
+        return GraphMirror(make_service("downstream", meta_url=f"{mirror.url}/meta.json",
+                                        repo_url=f"{mirror.url}/data", delta_url=f"{mirror.url}/delta"),
+                           sync_interval=3600)
+
+    first = downstream()
+    assert first.start()
+    names = list(meta)
+    meta = {name: graph_data for name, graph_data in meta.items() if name != names[0]}
+    meta['graph_new'] = meta[names[10]]
+    standin.publish(meta)
+    assert mirror.sync() and first.sync()
+    assert first.service.meta_cache_journal_path.exists()
+    first.stop()
+    # Вышестоящее зеркало перезапущено и не помнит старых версий: дельты нет, остаётся условный GET
+    mirror.history = MetaHistory()
+
+    restarted = downstream()
+    assert restarted.start()
+    assert snapshot(restarted.service) == meta
+    assert restarted.service.meta_version == mirror.version
+    assert restarted.version == first.version
+    restarted.stop()
@@ -0,0 +1,81 @@
+import pytest
+
+from app.DataTypes import GraphRequest, GraphTags
+from app.QueryCache import QueryCache
+
+from .test_search import BACKENDS, load, reference
+
+
+def test_evicts_least_recently_used():
+    cache = QueryCache(maxsize=2)
+    cache.put('a', ['1'])
+    cache.put('b', ['2'])
+    assert cache.get('a') == ['1']
+    cache.put('c', ['3'])
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == ['1']
+    assert cache.get('c') == ['3']
+
+    # Повторная запись обновляет значение и освежает ключ
+    cache.put('a', ['4'])
+    cache.put('d', ['5'])
+    assert cache.get('c') is None
+    assert cache.get('a') == ['4']
+
+
+def test_results_are_copies():
+    cache = QueryCache()
+    names = ['x', 'y']
+    cache.put('key', names)
+    names.append('z')
+    result = cache.get('key')
+    result.append('w')
+    assert cache.get('key') == ['x', 'y']
+
+
+def test_stats():
+    cache = QueryCache(maxsize=3)
+    assert cache.stats() == {'size': 0, 'maxsize': 3, 'hits': 0, 'misses': 0, 'hit_rate': 0.0}
+
+    assert cache.get('a') is None
+    cache.put('a', [])
+    assert cache.get('a') == []
+    assert cache.get('a') == []
+    assert cache.stats() == {'size': 1, 'maxsize': 3, 'hits': 2, 'misses': 1, 'hit_rate': 2 / 3}
+
+    # Очистка сбрасывает записи, но не счётчики
+    cache.clear()
+    assert cache.get('a') is None
+    assert cache.stats() == {'size': 0, 'maxsize': 3, 'hits': 2, 'misses': 2, 'hit_rate': 0.5}
+
+
+def test_disabled():
+    cache = QueryCache(maxsize=0)
+    cache.put('a', ['1'])
+    assert len(cache) == 0
+    assert cache.get('a') is None
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_service_cache_follows_deltas(meta_file, tmp_path, backend):
+    service = load(meta_file, tmp_path, backend)
+    request = GraphRequest(tags=GraphTags(tree=True), author='а', strict_search=False)
+    expected = reference(service, request)
+
+    assert service.search(request) == expected
+    found = service.search_expr('tree AND author ~ а')
+    assert found
+    hits = service.search_cache.hits
+    # Запрос и выражение с тем же каноническим видом берутся из кэша
+    assert service.search(GraphRequest(tags=GraphTags(tree=True), author='А', strict_search=False)) == expected
+    assert service.search_expr('(tree) and author ~ "А"') == found
+    assert service.search_cache.hits == hits + 2
+
+    # Изменение meta данных сбрасывает кэш: удалённый граф пропадает из результатов
+    removed = found[0]
+    service._apply_meta_delta({}, [removed], 'v2')
+    assert len(service.search_cache) == 0
+    assert service.search(request) == [name for name in expected if name != removed]
+    assert service.search_expr('tree AND author ~ а') == found[1:]
@@ -0,0 +1,84 @@
+import pytest
+
+from app.DataTypes import GraphRequest, GraphSize, GraphTags, NumericRange
+from app.QueryExpr import And, Not, Or, QuerySyntaxError, Term, parse_query
+
+from .test_search import BACKENDS, load, reference
+
+
+def tag(name, value=True):
+    return Term(GraphRequest(tags=GraphTags(**{name: value})))
+
+
+def vertices(low, high):
+    return Term(GraphRequest(vertices=NumericRange(low, high)))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('tree', tag('tree')),
+    ('tree = false', tag('tree', False)),
+    ('Tree = Нет', tag('tree', False)),
+    # AND связывает сильнее OR, NOT - сильнее AND
+    ('tree OR planar AND NOT pseudo', Or([tag('tree'), And([tag('planar'), Not(tag('pseudo'))])])),
+    ('tree AND planar OR pseudo', Or([And([tag('tree'), tag('planar')]), tag('pseudo')])),
+    ('(tree OR planar) AND NOT pseudo', And([Or([tag('tree'), tag('planar')]), Not(tag('pseudo'))])),
+    ('NOT (tree или planar)', Not(Or([tag('tree'), tag('planar')]))),
+    ('не не tree', Not(Not(tag('tree')))),
+    ('((tree))', tag('tree')),
+    ('tree and planar AND pseudo', And([tag('tree'), tag('planar'), tag('pseudo')])),
+    ('size in {small, large}', Or([Term(GraphRequest(size=GraphSize.SMALL)), Term(GraphRequest(size=GraphSize.LARGE))])),
+    ('size = huge', Term(GraphRequest(size=GraphSize.HUGE))),
+    ('author = "Иван Петров"', Term(GraphRequest(author='Иван Петров', strict_search=True))),
+    ('author ~ ivan', Term(GraphRequest(author='ivan', strict_search=False))),
+    ('vertices >= 10', vertices(10, None)),
+    ('vertices <= 2.5e1', vertices(None, 25.0)),
+    ('vertices < 10', And([vertices(None, 10), Not(vertices(10, 10))])),
+    ('vertices != -3', And([Or([vertices(None, -3), vertices(-3, None)]), Not(vertices(-3, -3))])),
+])
+def test_parse(text, expected):
+    assert parse_query(text) == expected
+
+
+@pytest.mark.parametrize('text, position', [
+    ('', 0),
+    ('   ', 3),
+    ('tree AND', 8),
+    ('(tree OR planar', 15),
+    ('tree planar', 5),
+    ('tree)', 4),
+    ('colour = red', 0),
+    ('tree = maybe', 7),
+    ('size = gigantic', 7),
+    ('size in {small large}', 15),
+    ('author > "x"', 7),
+    ('vertices >= many', 12),
+    ('edges', 5),
+    ('tree AND !planar', 9),
+    ('author = "без конца', 9),
+])
+def test_syntax_error_position(text, position):
+    with pytest.raises(QuerySyntaxError) as error:
+        parse_query(text)
+    assert error.value.position == position
+    assert f"позиция {position + 1}" in str(error.value)
+
+
+def test_equal_expressions_share_key():
+    assert parse_query('(tree) and NOT planar').key() == parse_query('tree AND не planar').key()
+    assert parse_query('tree OR planar').key() != parse_query('planar OR tree').key()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_expression_matches_reference(meta_file, tmp_path, backend):
+    service = load(meta_file, tmp_path, backend)
+
+    def rows(**kwargs):
+        return set(reference(service, GraphRequest(**kwargs)))
+
+    everything = set(service.meta_data)
+    tree, planar, pseudo = (rows(tags=GraphTags(**{name: True})) for name in ('tree', 'planar', 'pseudo'))
+    large = rows(size=GraphSize.LARGE)
+    expected = ((tree | planar) & (everything - pseudo)) | (large & (everything - rows(vertices=NumericRange(None, 500))))
+
+    found = service.search_expr('(tree OR planar) AND NOT pseudo OR size = large AND vertices > 500')
+    assert found == [name for name in service.meta_data if name in expected]
@@ -0,0 +1,202 @@
+import json
+import random
+import time
+
+import pytest
+
+from app.DataTypes import GraphRequest, GraphSize, GraphTags, NumericRange, TAG_NAMES
+from app.GraphService import GraphService
+from app.ShardedSearch import ShardedSearch
+
+BACKENDS = ['bitmap', 'columnar', 'scan']
+
+
+def random_range(rnd: random.Random, low: float, high: float, kind=int):
+    bounds = sorted(kind(rnd.uniform(low, high)) for _ in range(2))
+    return NumericRange(rnd.choice([None, bounds[0]]), rnd.choice([None, bounds[1]]))
+
+
+def random_requests(count: int, authors, seed: int = 3):
+    rnd = random.Random(seed)
+    requests = [GraphRequest(), GraphRequest(strict_search=False)]
+    for _ in range(count):
+        tags = None
+        if rnd.random() < 0.7:
+            tags = GraphTags(**{tag: rnd.choice([None, None, True, False]) for tag in TAG_NAMES})
+        author = rnd.choice([None, None, rnd.choice(authors), rnd.choice(authors)[:3].lower(), 'нет такого'])
+        requests.append(GraphRequest(
+            author=author,
+            size=rnd.choice([None, *GraphSize]),
+            tags=tags,
+            strict_search=rnd.random() < 0.5,
+            vertices=rnd.choice([None, random_range(rnd, 0, 3000)]),
+            edges=rnd.choice([None, random_range(rnd, 0, 10000)]),
+            density=rnd.choice([None, random_range(rnd, 0, 0.2, float)]),
+        ))
+    return requests
+
+
+def reference(service: GraphService, request: GraphRequest):
+    """Поиск полным проходом по эталонному _matches_request"""
+    if request.is_empty():
+        return list(service.meta_data)
+    return [name for name, graph_data in service.meta_data.items()
+            if service._matches_request(service.get_graph_info(name), request)]
+
+
+def load(meta_file, tmp_path, backend):
+    service = GraphService(backend=backend, meta_cache_path=str(tmp_path / "cache" / "meta.json"),
+                           graph_cache_dir=str(tmp_path / "graphs"), snapshot=False)
+    assert service.load_meta_from_file(str(meta_file))
+    return service
+
+
+@pytest.fixture
+def requests_sample(meta_file):
+    meta = json.loads(meta_file.read_text(encoding='utf-8'))
+    authors = sorted({graph_data['author'] for graph_data in meta.values() if graph_data.get('author')})
+    return random_requests(120, authors)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_matches_reference(meta_file, tmp_path, requests_sample, backend):
+    service = load(meta_file, tmp_path, backend)
+    found = 0
+    for request in requests_sample:
+        expected = reference(service, request)
+        assert service.search(request) == expected, request
+        found += len(expected)
+    assert found
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_matches_reference_after_delta(meta_file, tmp_path, requests_sample, backend):
+    service = load(meta_file, tmp_path, backend)
+    names = list(service.meta_data)
+    upserts = {name: service._pack_record({'author': 'Новый автор', 'size': 'small', 'vertices': 7, 'edges': 3,
+                                           'properties': {'tree': False, 'directed': True}})
+               for name in names[:100] + ['added_1', 'added_2']}
+    service._apply_meta_delta(upserts, names[100:200], 'v2')
+
+    assert service.meta_version == 'v2'
+    assert 'added_1' in service.meta_data and names[150] not in service.meta_data
+    for request in requests_sample + [GraphRequest(author='Новый автор')]:
+        assert service.search(request) == reference(service, request), request
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_facets_match_reference(meta_file, tmp_path, requests_sample, backend):
+    service = load(meta_file, tmp_path, backend)
+    for request in requests_sample[:30]:
+        expected = reference(service, request)
+        facets = service.search_facets(request, top_authors=5)
+        assert facets.total == len(expected)
+        assert sorted(facets.names) == sorted(expected)
+        sizes = {size: sum(service.get_graph_info(name).get('size') == size for name in expected)
+                 for size in facets.sizes}
+        assert facets.sizes == sizes
+        assert sum(sizes.values()) == len(expected)
+        for author, count in facets.authors:
+            assert count == sum(service.get_graph_info(name).get('author') == author for name in expected)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cursor_paging(meta_file, tmp_path, requests_sample, backend):
+    service = load(meta_file, tmp_path, backend)
+    for request in requests_sample[:20]:
+        expected = service.search(request)
+        names, cursor, pages = [], None, 0
+        while True:
+            page = service.search_page(request, limit=97, cursor=cursor)
+            assert page.total == len(expected)
+            assert len(page.names) <= 97
+            names += page.names
+            pages += 1
+            if page.cursor is None:
+                break
+            cursor = page.cursor
+        assert names == expected
+        assert pages == max(1, -(-len(expected) // 97))
+        assert list(service.iter_search(request, page_size=50)) == expected
+
+        page = service.search_page(request, limit=10, facets=True)
+        assert page.facets is not None and page.facets.total == len(expected)
+        assert page.names == expected[:10]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_cursor_rejected(meta_file, tmp_path, backend):
+    service = load(meta_file, tmp_path, backend)
+    request = GraphRequest(strict_search=False)
+    page = service.search_page(request, limit=10)
+    assert page.cursor is not None
+
+    with pytest.raises(ValueError):
+        service.search_page(GraphRequest(size=GraphSize.SMALL), limit=10, cursor=page.cursor)
+    with pytest.raises(ValueError):
+        service.search_page(request, limit=10, cursor='мусор')
+
+    name = next(iter(service.meta_data))
+    service._apply_meta_delta({}, [name], 'v2')
+    with pytest.raises(ValueError):
+        service.search_page(request, limit=10, cursor=page.cursor)
+
+
+@pytest.mark.parametrize('backend, shards', [('bitmap', 2), ('columnar', 3), ('scan', 4)])
+def test_sharded_matches_single(meta_file, tmp_path, requests_sample, backend, shards):
+    service = load(meta_file, tmp_path, backend)
+    sharded = ShardedSearch(service.meta_data, shards, backend)
+    try:
+        assert len(sharded.executors) == shards
+        assert sharded.sizes == [len(service.meta_data) // shards] * shards
+        for request in requests_sample[:40]:
+            assert sharded.search(request) == service.index.search(request), request
+    finally:
+        sharded.close(wait=True)
+
+
+def test_sharded_more_shards_than_graphs(meta_file, tmp_path):
+    service = load(meta_file, tmp_path, 'bitmap')
+    meta_data = dict(list(service.meta_data.items())[:3])
+    sharded = ShardedSearch(meta_data, 4)
+    try:
+        assert sharded.sizes == [1, 1, 1]
+        assert sharded.search(GraphRequest(strict_search=False)) == list(meta_data)
+    finally:
+        sharded.close(wait=True)
+
+
+def test_service_searches_in_shards(meta_file, tmp_path, requests_sample, monkeypatch):
+    service = GraphService(meta_cache_path=str(tmp_path / "cache" / "meta.json"),
+                           graph_cache_dir=str(tmp_path / "graphs"), snapshot=False, shards=3)
+    assert service.load_meta_from_file(str(meta_file))
+    try:
+        # Первый запрос запускает процессы шардов в фоне и выполняется в текущем процессе
+        assert service.search(requests_sample[2]) == reference(service, requests_sample[2])
+        deadline = time.monotonic() + 60
+        while service._sharded is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert service._sharded is not None
+
+        def unexpected(request):
+            raise AssertionError("поиск должен идти в процессах шардов")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(service.index, 'search', unexpected)
+            service.clear_caches()
+            for request in requests_sample[2:30]:
+                assert service.search(request) == reference(service, request), request
+
+        # Изменение meta данных останавливает шарды, поиск продолжается по новому индексу
+        names = list(service.meta_data)
+        service._apply_meta_delta({}, names[:50], 'v2')
+        assert service._sharded is None
+        for request in requests_sample[2:30]:
+            assert service.search(request) == reference(service, request), request
+    finally:
+        # Дожидаемся перезапуска шардов по новым данным, чтобы остановить и их процессы
+        deadline = time.monotonic() + 60
+        while service._sharded_building and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if service._sharded is not None:
+            service._sharded.close(wait=True)
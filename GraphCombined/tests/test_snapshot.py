@@ -0,0 +1,118 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.MetaSnapshot import MAGIC, MetaSnapshot, SnapshotError, SnapshotMeta
+
+from .conftest import make_meta
+from .test_meta_sync import snapshot
+
+
+def irregular_meta():
+    """Каталог с записями, поля которых не укладываются в колонки снимка"""
+    meta = make_meta(300)
+    meta['graph_irregular'] = {'author': 'Автор', 'vertices': '12', 'edges': 3.5, 'note': 'заметка',
+                               'properties': {'directed': True, 'custom': False}}
+    meta['graph_empty'] = {}
+    return meta
+
+
+def test_round_trip(tmp_path):
+    meta = irregular_meta()
+    path = tmp_path / "meta.snapshot"
+    assert MetaSnapshot.write(path, meta.items(), "v1", "http://source/meta.json") == path.stat().st_size
+
+    opened = MetaSnapshot.open(path)
+    assert opened.version == "v1"
+    assert opened.source == "http://source/meta.json"
+    assert list(opened.meta_data) == list(meta)
+    assert {name: record.to_dict() for name, record in opened.meta_data.items()} == meta
+    opened.close()
+
+
+def test_service_starts_from_snapshot(standin, make_service, meta):
+    service = make_service(snapshot=True)
+    assert service.download_meta()
+    assert service.wait_snapshot(10)
+
+    restarted = make_service(snapshot=True)
+    assert restarted._load_snapshot(restarted._read_cache_info().get('version'))
+    assert isinstance(restarted.meta_data, SnapshotMeta)
+    assert snapshot(restarted) == meta
+    for expr in ['author = "Автор 3"', 'directed AND NOT weighted', 'vertices >= 100 OR edges < 50']:
+        assert restarted.search_expr(expr) == service.search_expr(expr)
+
+
+@pytest.mark.parametrize('damage', ['magic', 'truncated', 'header'])
+def test_corrupt_snapshot_rejected(standin, make_service, meta, damage):
+    service = make_service(snapshot=True)
+    assert service.download_meta()
+    assert service.wait_snapshot(10)
+
+    path = service.meta_snapshot_path
+    raw = path.read_bytes()
+    if damage == 'magic':
+        raw = b'X' * len(MAGIC) + raw[len(MAGIC):]
+    elif damage == 'truncated':
+        raw = raw[:len(raw) // 2]
+    else:
+        raw = raw[:len(MAGIC) + 8] + b'}' + raw[len(MAGIC) + 9:]
+    path.write_bytes(raw)
+    with pytest.raises(SnapshotError):
+        MetaSnapshot.open(path)
+
+    restarted = make_service(snapshot=True)
+    assert not restarted._load_snapshot(restarted._read_cache_info().get('version'))
+    assert restarted.load_meta_cache()
+    assert snapshot(restarted) == meta
+
+
+def test_stale_snapshot_rejected(standin, make_service, meta):
+    service = make_service(snapshot=True)
+    assert service.download_meta()
+    assert service.wait_snapshot(10)
+    version = service._read_cache_info().get('version')
+
+    restarted = make_service(snapshot=True)
+    assert not restarted._load_snapshot(f"{version}-другая")
+    # Снимок чужого каталога с той же версией тоже не подходит
+    other = make_service(snapshot=True, meta_url=f"{standin.url}/other/meta.json")
+    assert not other._load_snapshot(version)
+    assert restarted._load_snapshot(version)
+
+
+def test_journal_after_snapshot(standin, make_service, mirror, meta):
+    """Дельта, записанная в журнал после снимка, не теряется при запуске со снимка"""
+    def client():
+        return make_service("client", snapshot=True, meta_url=f"{mirror.url}/meta.json",
+                            repo_url=f"{mirror.url}/data", delta_url=f"{mirror.url}/delta")
+
+    service = client()
+    assert service.download_meta()
+    assert service.wait_snapshot(10)
+    old_snapshot = service.meta_snapshot_path.read_bytes()
+
+    names = list(meta)
+    meta = {name: graph_data for name, graph_data in meta.items() if name not in names[:5]}
+    meta[names[50]] = dict(meta[names[50]], author='Новый автор')
+    standin.publish(meta)
+    assert mirror.sync()
+    assert service.sync_meta()
+    assert service.meta_cache_journal_path.exists()
+    assert service.wait_snapshot(10)
+
+    # Снимок переписан по новой версии: запуск с него видит дельту
+    restarted = client()
+    version = restarted._read_cache_info().get('version')
+    assert version == mirror.version
+    assert restarted._load_snapshot(version)
+    assert snapshot(restarted) == meta
+
+    # Процесс завершился до записи нового снимка: старый снимок отвергается, журнал применяется к кэшу
+    service.meta_snapshot_path.write_bytes(old_snapshot)
+    restarted = client()
+    assert not restarted._load_snapshot(version)
+    assert restarted.load_meta_cache()
+    assert restarted.meta_version == version
+    assert snapshot(restarted) == meta
+    assert restarted.search_expr('author = "Новый автор"') == [names[50]]